@@ -1,26 +1,50 @@
 """Feature API endpoints"""
 
+import math
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, Hashable, Iterator, List, Literal, Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Body, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from app.core.config import get_db
+from app.core.config import get_feature_store, get_response_cache, get_vote_buffer
 from app.core.exceptions import ApiError
-from app.schemas.feature import Feature, FeatureCreate, FeatureUpdate
+from app.core.json_codec import get_json_codec
+from app.core.records import feature_json
+from app.core.response_cache import CachedBody
+from app.repositories.base import PriceRange
+from app.schemas.feature import (
+    BulkItemResult,
+    Feature,
+    FeatureBulkUpdate,
+    FeatureCreate,
+    FeatureUpdate,
+)
 
 router = APIRouter(prefix="/feature", tags=["features"])
 
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+MAX_TOP_SIZE = 100
+MAX_BULK_SIZE = 1000
 
-@router.post("", response_model=Feature, status_code=201)
-def create_feature(feature: FeatureCreate, user_id: int = 1):
-    """Создать новую фичу"""
-    db = get_db()
-    new_id = max([w["id"] for w in db["features"]], default=0) + 1
-    now = datetime.now()
 
-    feature_data = {
-        "id": new_id,
+def _not_found() -> ApiError:
+    return ApiError(code="not_found", message="Feature not found", status=404)
+
+
+def _bulk_result(index: int, feature_id: int, found: bool) -> BulkItemResult:
+    if found:
+        return BulkItemResult(index=index, id=feature_id, status=200)
+    return BulkItemResult(
+        index=index, id=feature_id, status=404, error="Feature not found"
+    )
+
+
+def _new_feature_data(feature: FeatureCreate, user_id: int, now: datetime) -> dict:
+    return {
         "user_id": user_id,
         "title": feature.title,
         "link": feature.link,
@@ -30,64 +54,299 @@ def create_feature(feature: FeatureCreate, user_id: int = 1):
         "updated_at": now,
     }
 
-    db["features"].append(feature_data)
-    return feature_data
+
+@router.post("", response_model=Feature, status_code=201)
+def create_feature(request: Request, feature: FeatureCreate, user_id: int = 1):
+    """Создать новую фичу"""
+    feature_data = _new_feature_data(feature, user_id, datetime.now())
+    return _row_response(request, get_feature_store().insert(feature_data), 201)
+
+
+@router.post("/bulk", response_model=List[BulkItemResult], status_code=201)
+def create_features_bulk(
+    features: List[FeatureCreate] = Body(..., min_length=1, max_length=MAX_BULK_SIZE),
+    user_id: int = 1,
+):
+    """Создать несколько фич одной транзакцией"""
+    now = datetime.now()
+    created = get_feature_store().insert_many(
+        [_new_feature_data(feature, user_id, now) for feature in features]
+    )
+    return [
+        BulkItemResult(index=i, id=row["id"], status=201)
+        for i, row in enumerate(created)
+    ]
+
+
+@router.patch("/bulk", response_model=List[BulkItemResult])
+def update_features_bulk(
+    updates: List[FeatureBulkUpdate] = Body(
+        ..., min_length=1, max_length=MAX_BULK_SIZE
+    ),
+):
+    """Обновить несколько фич одной транзакцией"""
+    now = datetime.now()
+    changes = []
+    for update in updates:
+        update_data = update.model_dump(exclude_unset=True, exclude={"id"})
+        update_data["updated_at"] = now
+        changes.append((update.id, update_data))
+
+    get_vote_buffer().flush()
+    updated = get_feature_store().update_many(changes)
+    return [
+        _bulk_result(i, update.id, row is not None)
+        for i, (update, row) in enumerate(zip(updates, updated))
+    ]
+
+
+@router.delete("/bulk", response_model=List[BulkItemResult])
+def delete_features_bulk(
+    ids: List[int] = Query(..., min_length=1, max_length=MAX_BULK_SIZE),
+):
+    """Удалить несколько фич одной транзакцией"""
+    get_vote_buffer().flush()
+    deleted = get_feature_store().delete_many(ids)
+    return [
+        _bulk_result(i, feature_id, found)
+        for i, (feature_id, found) in enumerate(zip(ids, deleted))
+    ]
+
+
+def _parse_price_between(value: str) -> PriceRange:
+    """Parse `min,max` into an inclusive price range"""
+    try:
+        low, high = (float(part) for part in value.split(","))
+    except ValueError:
+        low = high = math.nan
+    if not (math.isfinite(low) and math.isfinite(high)):
+        raise ApiError(
+            code="validation-error",
+            message="price_between must be formatted as 'min,max'",
+            status=422,
+        )
+    if low > high:
+        raise ApiError(
+            code="validation-error",
+            message="price_between lower bound exceeds upper bound",
+            status=422,
+        )
+    return PriceRange(low=low, high=high)
+
+
+def _dump_row(row: dict) -> bytes:
+    return get_json_codec().dumps_sanitized(feature_json(row))
+
+
+def _row_response(request: Request, row: dict, status_code: int = 200) -> Response:
+    """Serve a store row as is; response_model then only documents the schema"""
+    request.state.xss_sanitized = True
+    return Response(
+        _dump_row(row), status_code=status_code, media_type="application/json"
+    )
+
+
+def _dump_escaped(row: dict) -> bytes:
+    """Serialize a row the store already escaped on write"""
+    return get_json_codec().dumps(row)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of If-None-Match against an ETag, as RFC 9110 requires"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _versioned_response(
+    request: Request,
+    key: Hashable,
+    version: Optional[str],
+    render: Callable[[], CachedBody],
+) -> Response:
+    """Serve a rendered JSON body, 304 if the client already has this version
+
+    The version must be read before the data `render` serializes: a racing
+    mutation then leaves a cached body newer than its ETag, never older.
+    """
+    # Bodies come out of _dump_row or the store already escaped
+    request.state.xss_sanitized = True
+    if version is None:
+        body, headers = render()
+        return Response(body, media_type="application/json", headers=headers)
+
+    etag = f'"{version}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cache = get_response_cache()
+    entry = cache.get((key, version))
+    if entry is None:
+        entry = render()
+        cache.put((key, version), entry)
+    body, headers = entry
+    return Response(
+        body, media_type="application/json", headers={**headers, "ETag": etag}
+    )
+
+
+def _stream_features(
+    batches: Iterator[List[dict]], ndjson: bool, limit: Optional[int]
+) -> Iterator[bytes]:
+    """Serialize and sanitize rows batch by batch"""
+    remaining = limit
+    first = True
+
+    if not ndjson:
+        yield b"["
+    for batch in batches:
+        if remaining is not None:
+            batch = batch[:remaining]
+            remaining -= len(batch)
+        if batch:
+            if ndjson:
+                yield b"".join(_dump_row(row) + b"\n" for row in batch)
+            else:
+                chunk = b",".join(_dump_row(row) for row in batch)
+                yield chunk if first else b"," + chunk
+            first = False
+        if remaining == 0:
+            break
+    if not ndjson:
+        yield b"]"
 
 
 @router.get("", response_model=List[Feature])
 def get_features(
-    price_lt: Optional[float] = Query(None, description="Фильтр по максимальной цене")
+    request: Request,
+    price_lt: Optional[float] = Query(None, description="Фильтр по максимальной цене"),
+    price_gt: Optional[float] = Query(None, description="Фильтр по минимальной цене"),
+    price_between: Optional[str] = Query(
+        None,
+        description="Диапазон цен 'min,max' включительно",
+        max_length=64,
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"
+    ),
+    after: Optional[int] = Query(
+        None, ge=0, description="Курсор: вернуть фичи с id больше указанного"
+    ),
+    stream: Optional[Literal["json", "ndjson"]] = Query(
+        None, description="Потоковая выдача JSON-массивом или NDJSON"
+    ),
 ):
     """Получить все фичи с опциональной фильтрацией по цене"""
-    db = get_db()
-    features = db["features"]
+    get_vote_buffer().flush()
+    store = get_feature_store()
 
+    price = None
     if price_lt is not None:
-        features = [
-            f
-            for f in features
-            if f["price_estimate"] is not None and f["price_estimate"] < price_lt
-        ]
+        price = PriceRange(high=price_lt, include_high=False)
+    if price_gt is not None:
+        price = (price or PriceRange()).intersect(
+            PriceRange(low=price_gt, include_low=False)
+        )
+    if price_between is not None:
+        price = (price or PriceRange()).intersect(_parse_price_between(price_between))
+
+    if stream is not None:
+        request.state.xss_sanitized = True
+        ndjson = stream == "ndjson"
+        batches = store.iter_batches(
+            price, after, min(limit or STREAM_BATCH_SIZE, STREAM_BATCH_SIZE)
+        )
+        return StreamingResponse(
+            _stream_features(batches, ndjson, limit),
+            media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json",
+        )
+
+    if store.escape_once:
+        select, dump = store.select_escaped, _dump_escaped
+    else:
+        select, dump = store.select, _dump_row
 
-    return features
+    def render() -> CachedBody:
+        headers = {}
+        if limit is None:
+            page = select(price, after)
+        else:
+            page = select(price, after, limit + 1)
+            if len(page) > limit:
+                page = page[:limit]
+                headers[NEXT_CURSOR_HEADER] = str(page[-1]["id"])
+        return b"[" + b",".join(dump(row) for row in page) + b"]", headers
+
+    key = ("list", price, after, limit)
+    return _versioned_response(request, key, store.version(), render)
+
+
+@router.get("/top", response_model=List[Feature])
+def get_top_features(
+    request: Request,
+    n: int = Query(10, ge=1, le=MAX_TOP_SIZE, description="Размер рейтинга"),
+):
+    """Получить фичи с наибольшим числом голосов"""
+    get_vote_buffer().flush()
+    request.state.xss_sanitized = True
+    rows = get_feature_store().top(n)
+    body = b"[" + b",".join(_dump_row(row) for row in rows) + b"]"
+    return Response(body, media_type="application/json")
 
 
 @router.get("/{feature_id}", response_model=Feature)
-def get_feature(feature_id: int):
+def get_feature(request: Request, feature_id: int):
     """Получить фичу по ID"""
-    db = get_db()
-    for feature in db["features"]:
-        if feature["id"] == feature_id:
-            return feature
+    votes = get_vote_buffer()
+    if votes.has_pending(feature_id):
+        votes.flush()
+    store = get_feature_store()
+
+    if store.escape_once:
+        get, dump = store.get_escaped, _dump_escaped
+    else:
+        get, dump = store.get, _dump_row
 
-    from app.core.exceptions import ApiError
+    def render() -> CachedBody:
+        feature = get(feature_id)
+        if feature is None:
+            raise _not_found()
+        return dump(feature), {}
 
-    raise ApiError(code="not_found", message="Feature not found", status=404)
+    key = ("row", feature_id)
+    return _versioned_response(request, key, store.row_version(feature_id), render)
 
 
 @router.put("/{feature_id}", response_model=Feature)
-def update_feature(feature_id: int, feature_update: FeatureUpdate):
+def update_feature(request: Request, feature_id: int, feature_update: FeatureUpdate):
     """Обновить фичу"""
-    db = get_db()
-    for i, feature in enumerate(db["features"]):
-        if feature["id"] == feature_id:
-            update_data = feature_update.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                feature[field] = value
-            feature["updated_at"] = datetime.now()
-            db["features"][i] = feature
-            return feature
+    update_data = feature_update.model_dump(exclude_unset=True)
+    update_data["updated_at"] = datetime.now()
+    get_vote_buffer().flush()
 
-    raise ApiError(code="not_found", message="Feature not found", status=404)
+    feature = get_feature_store().update(feature_id, update_data)
+    if feature is None:
+        raise _not_found()
+    return _row_response(request, feature)
 
 
 @router.delete("/{feature_id}")
 def delete_feature(feature_id: int):
     """Удалить фичу"""
-    db = get_db()
-    for i, feature in enumerate(db["features"]):
-        if feature["id"] == feature_id:
-            del db["features"][i]
-            return {"message": "feature deleted successfully"}
+    get_vote_buffer().flush()
+    if not get_feature_store().delete(feature_id):
+        raise _not_found()
+    return {"message": "feature deleted successfully"}
+
 
-    raise ApiError(code="not_found", message="Feature not found", status=404)
+@router.post("/{feature_id}/vote", response_model=Feature)
+def vote_feature(request: Request, feature_id: int):
+    """Проголосовать за фичу"""
+    feature = get_vote_buffer().vote(feature_id)
+    if feature is None:
+        raise _not_found()
+    return _row_response(request, feature)
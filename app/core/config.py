@@ -1,26 +1,75 @@
 """Core configuration settings"""
 
+import os
 from datetime import datetime
-from typing import Any, Dict
-
-# In-memory storage
-_DB: Dict[str, Any] = {
-    "users": [{"id": 1, "username": "admin", "email": "admin@example.com"}],
-    "features": [
-        {
-            "id": 1,
-            "user_id": 1,
-            "title": "СуперФича",
-            "link": "https://www.reddit.com/",
-            "price_estimate": 1000.99,
-            "votes": 10,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now(),
-        }
-    ],
-}
-
-
-def get_db():
-    """Get in-memory database"""
-    return _DB
+from typing import Optional
+
+from app.core.persistence import WriteAheadLog
+from app.core.response_cache import ResponseCache
+from app.core.store import FeatureStore
+from app.core.votes import VoteBuffer
+from app.repositories.base import FeatureRepository
+from app.repositories.sql import PostgresFeatureRepository, SQLiteFeatureRepository
+
+_SEED_FEATURES = [
+    {
+        "id": 1,
+        "user_id": 1,
+        "title": "СуперФича",
+        "link": "https://www.reddit.com/",
+        "price_estimate": 1000.99,
+        "votes": 10,
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+    }
+]
+
+
+def create_feature_repository(database_url: Optional[str]) -> FeatureRepository:
+    """Pick storage backend from DATABASE_URL; in-memory store when unset
+
+    The in-memory store is journaled to FEATURE_DATA_DIR when that is set, and
+    escapes title and link once on write when FEATURE_ESCAPE_ONCE is set.
+    """
+    if not database_url:
+        escape_once = os.getenv("FEATURE_ESCAPE_ONCE", "0") != "0"
+        data_dir = os.getenv("FEATURE_DATA_DIR")
+        if not data_dir:
+            return FeatureStore(_SEED_FEATURES, escape_once=escape_once)
+        journal = WriteAheadLog(
+            data_dir, sync=os.getenv("FEATURE_WAL_SYNC", "1") != "0"
+        )
+        return journal.recover(_SEED_FEATURES, escape_once=escape_once)
+    if database_url.startswith(("postgresql://", "postgres://")):
+        pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        return PostgresFeatureRepository(database_url, pool_size=pool_size)
+    if database_url.startswith("sqlite:///"):
+        return SQLiteFeatureRepository(database_url[len("sqlite:///") :])
+    raise ValueError("Unsupported DATABASE_URL scheme")
+
+
+_FEATURES = create_feature_repository(os.getenv("DATABASE_URL"))
+
+
+def get_feature_store() -> FeatureRepository:
+    """Get configured feature repository"""
+    return _FEATURES
+
+
+_VOTES = VoteBuffer(_FEATURES)
+
+
+def get_vote_buffer() -> VoteBuffer:
+    """Get vote buffer bound to the feature repository"""
+    return _VOTES
+
+
+_RESPONSE_CACHE = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_BYTES", str(32 * 2**20))),
+)
+
+
+def get_response_cache() -> ResponseCache:
+    """Get cache of rendered feature responses"""
+    return _RESPONSE_CACHE
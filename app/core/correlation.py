@@ -0,0 +1,108 @@
+"""Correlation ID propagation (ADR-001)
+
+The ID of the request being served lives in a context variable, so it
+follows the request into log records, thread pools and background tasks
+without being passed around explicitly.
+"""
+
+import itertools
+import logging
+import os
+import re
+from concurrent.futures import Executor, Future
+from contextvars import ContextVar, Token, copy_context
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+# Incoming IDs end up in headers, problem details and logs, so keep them short
+# and free of anything that could split a line or a header
+_VALID_ID = re.compile(r"[A-Za-z0-9][A-Za-z0-9._:-]{0,127}")
+
+
+def get_correlation_id() -> Optional[str]:
+    """Correlation ID of the current request, None outside of one"""
+    return _correlation_id.get()
+
+
+def set_correlation_id(correlation_id: Optional[str]) -> Token:
+    """Bind a correlation ID to the current context"""
+    return _correlation_id.set(correlation_id)
+
+
+def reset_correlation_id(token: Token) -> None:
+    """Restore the correlation ID that was bound before set_correlation_id"""
+    _correlation_id.reset(token)
+
+
+def valid_correlation_id(value: Optional[str]) -> Optional[str]:
+    """Value if it is acceptable as a client-supplied ID, else None"""
+    if value and _VALID_ID.fullmatch(value):
+        return value
+    return None
+
+
+class _IdGenerator:
+    """UUID-formatted IDs from a random per-process prefix and a counter
+
+    The prefix carries the version 4 nibble and the counter half carries the
+    RFC 4122 variant bits, so IDs parse as UUIDs. Costs one counter step and
+    one format instead of reading 16 bytes from the OS per ID.
+    """
+
+    def __init__(self):
+        self._reseed()
+
+    def _reseed(self) -> None:
+        high = int.from_bytes(os.urandom(8), "big")
+        high = (high & ~(0xF << 12)) | (0x4 << 12)
+        text = f"{high:016x}"
+        self._prefix = f"{text[:8]}-{text[8:12]}-{text[12:]}-"
+        # itertools.count steps atomically under the GIL
+        self._counter = itertools.count(int.from_bytes(os.urandom(8), "big") >> 2)
+
+    def __call__(self) -> str:
+        low = f"{0x8000000000000000 | (next(self._counter) & 0x3FFFFFFFFFFFFFFF):016x}"
+        return f"{self._prefix}{low[:4]}-{low[4:]}"
+
+
+new_correlation_id = _IdGenerator()
+if hasattr(os, "register_at_fork"):
+    # Forked workers must not continue the parent's sequence
+    os.register_at_fork(after_in_child=new_correlation_id._reseed)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Add the current correlation ID to log records as `correlation_id`"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "correlation_id", None) is None:
+            record.correlation_id = _correlation_id.get() or "-"
+        return True
+
+
+def install_correlation_filter(logger: Optional[logging.Logger] = None) -> None:
+    """Attach CorrelationIdFilter to the handlers of a logger, root by default"""
+    for handler in (logger or logging.getLogger()).handlers:
+        if not any(isinstance(f, CorrelationIdFilter) for f in handler.filters):
+            handler.addFilter(CorrelationIdFilter())
+
+
+def bind_context(func: Callable[..., T]) -> Callable[..., T]:
+    """Wrap func to run in a copy of the caller's context, e.g. in a new thread"""
+    context = copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        # A context can only be entered once at a time, so each call gets a copy
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+def submit_with_context(
+    executor: Executor, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> Future:
+    """Submit func to an executor so it sees the caller's correlation ID"""
+    return executor.submit(copy_context().run, func, *args, **kwargs)
@@ -1,9 +1,12 @@
 """Data masking utilities for error messages and logs (S06-05)"""
 
+import json
 import re
-from typing import Any, Dict
+import threading
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
-from app.core.secrets import SecretsManager
+from app.core.secrets import SecretsManager, alternation
 
 secrets_manager = SecretsManager()
 
@@ -30,10 +33,13 @@ def mask_secret_value(text: str) -> str:
     return secrets_manager.mask_secret(text)
 
 
+_NON_DIGITS = re.compile(r"\D")
+
+
 def mask_credit_card(text: str) -> str:
     """Mask credit card number: ****-****-****-1234"""
     # Remove non-digits
-    digits = re.sub(r"\D", "", text)
+    digits = _NON_DIGITS.sub("", text)
     if len(digits) < 4:
         return "****"
     return "****-****-****-" + digits[-4:]
@@ -41,95 +47,268 @@ def mask_credit_card(text: str) -> str:
 
 def mask_phone(text: str) -> str:
     """Mask phone number: +7 *** *** 1234"""
-    digits = re.sub(r"\D", "", text)
+    digits = _NON_DIGITS.sub("", text)
     if len(digits) < 4:
         return "***"
     return "+" + digits[0] + " *** *** " + digits[-4:]
 
 
+Mask = Callable[["re.Match[str]", int], str]
+
+
+class Detector(NamedTuple):
+    """One kind of sensitive data: a pattern and how to mask a match
+
+    `mask` gets the match and the index of the detector's own group in the
+    combined pattern. `may_match` is a cheap check that must be true for
+    any text the pattern can match in; None means always try the pattern.
+    """
+
+    name: str
+    pattern: str
+    mask: Mask
+    may_match: Optional[Callable[[str], bool]] = None
+
+
+_KEYWORDS = ("password", "token", "secret", "key")
+_DIGITS = b"0123456789"
+
+
+def _has_keyword(text: str) -> bool:
+    if ":" not in text and "=" not in text:
+        return False
+    if not text.isascii():
+        # IGNORECASE also folds e.g. U+017F to "s", which lower() does not
+        return True
+    lowered = text.lower()
+    for keyword in _KEYWORDS:
+        if keyword in lowered:
+            return True
+    return False
+
+
+def _has_card_digits(text: str) -> bool:
+    # \d also matches non-ASCII digits, those are left to the regex
+    if not text.isascii():
+        return True
+    return len(text) - len(text.encode().translate(None, _DIGITS)) >= 16
+
+
+def _mask_assignment(match: "re.Match[str]", group: int) -> str:
+    # Cut the value out by offsets; str.replace would also hit copies of
+    # the value inside the key, e.g. "password=d"
+    start = match.start(group)
+    value_start = match.start(group + 1) - start
+    value_end = match.end(group + 1) - start
+    text = match.group(group)
+    return text[:value_start] + "***" + text[value_end:]
+
+
+EMAIL = Detector(
+    "email",
+    r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b",
+    lambda m, g: mask_email(m.group(g)),
+    lambda text: "@" in text,
+)
+ASSIGNMENT = Detector(
+    "assignment",
+    r"\b(?i:password|token|secret|api[_-]?key|auth[_-]?token)"
+    r"['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
+    _mask_assignment,
+    _has_keyword,
+)
+CREDIT_CARD = Detector(
+    "credit_card",
+    r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b",
+    lambda m, g: mask_credit_card(m.group(g)),
+    _has_card_digits,
+)
+FILE_LOCATION = Detector(
+    "file_location",
+    r'File "[^"]+", line \d+',
+    lambda m, g: "File ***, line ***",
+    lambda text: 'File "' in text,
+)
+TRACEBACK = Detector(
+    "traceback",
+    r"Traceback\s*\(most recent call last\):(?s:.*?)(?=\n\n|\Z)",
+    lambda m, g: "Traceback removed",
+    lambda text: "Traceback" in text,
+)
+
+
+class _Combined:
+    """Alternation of several detectors' patterns, one group per detector"""
+
+    def __init__(self, detectors: List[Detector]):
+        regex, index_of_group = alternation([d.pattern for d in detectors])
+        self._masks: Dict[int, Mask] = {
+            group: detectors[index].mask for group, index in index_of_group.items()
+        }
+        self.sub = partial(regex.sub, self._replace)
+
+    def _replace(self, match: "re.Match[str]") -> str:
+        group = match.lastindex
+        return self._masks[group](match, group)
+
+
+class MaskingEngine:
+    """Masks the matches of several detectors in a single scan
+
+    The detectors are compiled into one alternation, so each call is one
+    regex pass instead of one per detector. Where matches of two detectors
+    would overlap, the one starting first wins, then the one listed first.
+
+    Each detector's prefilter runs first. Detectors that cannot match are
+    left out of the alternation (one compiled pattern per combination, built
+    on first use) and text no detector can match is returned untouched.
+    """
+
+    def __init__(self, detectors: List[Detector]):
+        self._detectors = tuple(detectors)
+        self._combined: Dict[Tuple[int, ...], _Combined] = {}
+        self._lock = threading.Lock()
+
+    def _active(self, text: str) -> Tuple[int, ...]:
+        active = []
+        for index, detector in enumerate(self._detectors):
+            if detector.may_match is None or detector.may_match(text):
+                active.append(index)
+        return tuple(active)
+
+    def mask(self, text: str) -> str:
+        """Text with every detected match masked"""
+        active = self._active(text)
+        if not active:
+            return text
+        combined = self._combined.get(active)
+        if combined is None:
+            with self._lock:
+                combined = self._combined.get(active)
+                if combined is None:
+                    combined = _Combined([self._detectors[i] for i in active])
+                    self._combined[active] = combined
+        return combined.sub(text)
+
+
+_SENSITIVE_DATA = MaskingEngine([EMAIL, ASSIGNMENT, CREDIT_CARD])
+_ERROR_DETAIL = MaskingEngine(
+    [FILE_LOCATION, TRACEBACK, EMAIL, ASSIGNMENT, CREDIT_CARD]
+)
+
+
 def mask_sensitive_data(text: str) -> str:
     """Automatically detect and mask sensitive data in text"""
-    # Email pattern
-    email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-    text = re.sub(email_pattern, lambda m: mask_email(m.group()), text)
-
-    # Password/token patterns (common keywords)
-    password_keywords = [
-        r"\bpassword['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
-        r"\btoken['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
-        r"\bsecret['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
-        r"\bapi[_-]?key['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
-        r"\bauth[_-]?token['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
-    ]
-    for pattern in password_keywords:
-        text = re.sub(
-            pattern,
-            lambda m: m.group(0).replace(m.group(1), "***"),
-            text,
-            flags=re.IGNORECASE,
-        )
-
-    # Credit card pattern
-    cc_pattern = r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"
-    text = re.sub(cc_pattern, lambda m: mask_credit_card(m.group()), text)
-
-    return text
+    return _SENSITIVE_DATA.mask(text)
 
 
 def sanitize_error_detail(detail: str) -> str:
     """Sanitize error detail message to prevent information leakage"""
-    sanitized = mask_sensitive_data(detail)
+    return _ERROR_DETAIL.mask(detail)
+
+
+_SENSITIVE_KEYS = (
+    "password",
+    "token",
+    "secret",
+    "api_key",
+    "auth_token",
+    "credit_card",
+    "ssn",
+    "email",
+)
+_LOG_ENCODER = json.JSONEncoder(ensure_ascii=False, default=str)
 
-    sanitized = re.sub(r'File "[^"]+", line \d+', "File ***, line ***", sanitized)
-    sanitized = re.sub(
-        r"Traceback\s*\(most recent call last\):.*?(?=\n\n|\Z)",
-        "Traceback removed",
-        sanitized,
-        flags=re.DOTALL,
-    )
 
-    return sanitized
+@lru_cache(maxsize=4096)
+def classify_key(key: Any) -> Optional[Callable[[str], str]]:
+    """Masking function for values under key, None if the key is not sensitive"""
+    if not isinstance(key, str):
+        return None
+    key_lower = key.lower()
+    if not any(sensitive in key_lower for sensitive in _SENSITIVE_KEYS):
+        return None
+    if "email" in key_lower:
+        return mask_email
+    if "card" in key_lower:
+        return mask_credit_card
+    return mask_password
 
 
 def sanitize_dict_for_logging(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Recursively sanitize dictionary for safe logging"""
-    sanitized = {}
-    sensitive_keys = [
-        "password",
-        "token",
-        "secret",
-        "api_key",
-        "auth_token",
-        "credit_card",
-        "ssn",
-        "email",
-    ]
-
-    for key, value in data.items():
-        key_lower = key.lower()
-        if any(sensitive in key_lower for sensitive in sensitive_keys):
-            if isinstance(value, str):
-                if "email" in key_lower:
-                    sanitized[key] = mask_email(value)
-                elif "credit_card" in key_lower or "card" in key_lower:
-                    sanitized[key] = mask_credit_card(value)
+    """Sanitize dictionary for safe logging
+
+    Values under sensitive keys are masked whatever their type, strings
+    that look like emails are masked anywhere, and dicts nested in dicts or
+    lists are walked. Only branches with a masked value are copied; a clean
+    payload comes back as the same object. Walks with an explicit stack, so
+    deep nesting cannot hit the recursion limit; a container nested in
+    itself raises ValueError.
+    """
+    # Frame: [container, items iterator, copy or None, key in parent]
+    stack: List[List[Any]] = [[data, iter(data.items()), None, None]]
+    on_path = {id(data)}
+    while True:
+        frame = stack[-1]
+        container = frame[0]
+        in_dict = isinstance(container, dict)
+        for key, value in frame[1]:
+            if in_dict:
+                mask = classify_key(key)
+                if mask is not None:
+                    masked = mask(value) if isinstance(value, str) else "***"
+                elif isinstance(value, str):
+                    if "@" not in value or "." not in value:
+                        continue
+                    masked = mask_email(value)
+                elif isinstance(value, (dict, list)):
+                    push = value
+                    break
                 else:
-                    sanitized[key] = mask_password(value)
-            else:
-                sanitized[key] = "***"
-        elif isinstance(value, dict):
-            sanitized[key] = sanitize_dict_for_logging(value)
-        elif isinstance(value, list):
-            sanitized[key] = [
-                sanitize_dict_for_logging(item) if isinstance(item, dict) else item
-                for item in value
-            ]
-        elif isinstance(value, str):
-            if "@" in value and "." in value:
-                sanitized[key] = mask_email(value)
+                    continue
+            elif isinstance(value, dict):
+                # Lists are walked inside dicts only, like before
+                push = value
+                break
             else:
-                sanitized[key] = value
+                continue
+            if masked is not value:
+                if frame[2] is None:
+                    frame[2] = container.copy()
+                frame[2][key] = masked
         else:
-            sanitized[key] = value
+            stack.pop()
+            on_path.discard(id(container))
+            result = container if frame[2] is None else frame[2]
+            if not stack:
+                return result
+            if result is not container:
+                parent = stack[-1]
+                if parent[2] is None:
+                    parent[2] = parent[0].copy()
+                parent[2][frame[3]] = result
+            continue
+        if id(push) in on_path:
+            raise ValueError("Circular reference detected")
+        on_path.add(id(push))
+        items = push.items() if isinstance(push, dict) else enumerate(push)
+        stack.append([push, iter(items), None, key])
+
+
+def iter_sanitized_json(data: Dict[str, Any], chunk_size: int = 65536) -> Iterator[str]:
+    """Sanitized data as JSON text in chunks of about chunk_size characters
 
-    return sanitized
+    For writing large payloads to a log without building the whole text;
+    the sanitized copy shares every unmasked branch with data.
+    """
+    buffer: List[str] = []
+    size = 0
+    for part in _LOG_ENCODER.iterencode(sanitize_dict_for_logging(data)):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer)
@@ -1,15 +1,19 @@
 """Enhanced exception handling with RFC 7807 support (ADR-001)"""
 
-import uuid
+import logging
 from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from app.core.correlation import get_correlation_id, new_correlation_id
 from app.core.data_masking import sanitize_error_detail
+from app.core.responses import SanitizedJSONResponse
+from app.core.security_headers import security_headers
+
+logger = logging.getLogger(__name__)
 
 
 class ProblemDetail(BaseModel):
@@ -43,7 +47,11 @@ def create_problem_detail(
     instance: Optional[str] = None,
 ) -> ProblemDetail:
     """Create RFC 7807 Problem Detail with sanitized error details (S06-05)"""
-    correlation_id = getattr(request.state, "correlation_id", str(uuid.uuid4()))
+    correlation_id = (
+        getattr(request.state, "correlation_id", None)
+        or get_correlation_id()
+        or new_correlation_id()
+    )
 
     sanitized_detail = sanitize_error_detail(detail)
 
@@ -68,7 +76,7 @@ async def api_error_handler(request: Request, exc: ApiError):
         request=request,
     )
 
-    response = JSONResponse(
+    response = SanitizedJSONResponse(
         status_code=exc.status,
         content=problem_detail.model_dump(),
         headers={"Content-Type": "application/problem+json"},
@@ -91,7 +99,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         request=request,
     )
 
-    response = JSONResponse(
+    response = SanitizedJSONResponse(
         status_code=422,
         content=problem_detail.model_dump(),
         headers={"Content-Type": "application/problem+json"},
@@ -111,7 +119,7 @@ async def http_exception_handler(request: Request, exc):
         request=request,
     )
 
-    response = JSONResponse(
+    response = SanitizedJSONResponse(
         status_code=exc.status_code,
         content=problem_detail.model_dump(),
         headers={"Content-Type": "application/problem+json"},
@@ -119,3 +127,31 @@ async def http_exception_handler(request: Request, exc):
 
     response.headers["X-Correlation-ID"] = problem_detail.correlation_id
     return response
+
+
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Handle uncaught exceptions with RFC 7807 format
+
+    Starlette runs this handler outside the middleware stack, so the response
+    carries the correlation ID and security headers itself.
+    """
+    logger.error(
+        f"Unhandled {type(exc).__name__} on {request.method} {request.url.path}"
+    )
+    problem_detail = create_problem_detail(
+        error_type="internal-error",
+        title="Internal Server Error",
+        status=500,
+        detail="Internal server error",
+        request=request,
+    )
+
+    response = SanitizedJSONResponse(
+        status_code=500,
+        content=problem_detail.model_dump(),
+        headers={"Content-Type": "application/problem+json"},
+    )
+
+    response.headers["X-Correlation-ID"] = problem_detail.correlation_id
+    response.raw_headers.extend(security_headers(request.url.scheme))
+    return response
@@ -0,0 +1,142 @@
+"""JSON encoders for API responses
+
+The encoder is picked once at startup from JSON_ENCODER: `orjson` when that
+package is installed, otherwise the stdlib `json` module. Both produce
+compact UTF-8 JSON, serialize datetime/date/time as ISO 8601 and Decimal as
+a string so amounts keep their exact value.
+"""
+
+import json
+import logging
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Optional, Protocol
+
+from app.core.xss_protection import (
+    SanitizingJSONEncoder,
+    sanitize_response_data,
+    sanitizing_default,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _may_need_escape(encoded: bytes) -> bool:
+    """Whether an encoded document can hold a string needing HTML escaping
+
+    orjson never writes these characters as \\u escapes. Separate substring
+    searches run at memchr speed, far ahead of a regex alternation.
+    """
+    return (
+        b"<" in encoded
+        or b">" in encoded
+        or b"&" in encoded
+        or b"'" in encoded
+        or b'\\"' in encoded
+    )
+
+
+class JSONCodec(Protocol):
+    """Compact UTF-8 JSON encoder"""
+
+    name: str
+
+    def dumps(self, data: Any) -> bytes: ...
+
+    def dumps_sanitized(self, data: Any) -> bytes: ...
+
+
+def json_default(value: Any) -> Any:
+    """Encode the non-JSON types the app uses"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StdlibCodec:
+    """Encoder built on the json module"""
+
+    name = "stdlib"
+
+    def __init__(self):
+        self._plain = json.JSONEncoder(
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=json_default,
+        )
+        self._sanitizing = SanitizingJSONEncoder(default=json_default)
+
+    def dumps(self, data: Any) -> bytes:
+        """Compact JSON"""
+        return self._plain.encode(data).encode("utf-8")
+
+    def dumps_sanitized(self, data: Any) -> bytes:
+        """Compact JSON with string values HTML-escaped, keys left as they are"""
+        return self._sanitizing.encode(data).encode("utf-8")
+
+
+class OrjsonCodec:
+    """Encoder built on orjson, falling back to stdlib for what it rejects"""
+
+    name = "orjson"
+
+    def __init__(self):
+        self._fallback = StdlibCodec()
+        self._option = orjson.OPT_NON_STR_KEYS
+        self._sanitizing_default = sanitizing_default(json_default)
+
+    def _dumps(self, data: Any, default=json_default) -> Optional[bytes]:
+        try:
+            return orjson.dumps(data, default=default, option=self._option)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits
+            return None
+
+    def dumps(self, data: Any) -> bytes:
+        """Compact JSON"""
+        encoded = self._dumps(data)
+        return self._fallback.dumps(data) if encoded is None else encoded
+
+    def dumps_sanitized(self, data: Any) -> bytes:
+        """Compact JSON with string values HTML-escaped
+
+        Clean documents are encoded once. Otherwise the data is sanitized
+        copy-on-write and encoded again, with what json_default returns
+        sanitized as well; object keys are left as they are.
+        """
+        encoded = self._dumps(data)
+        if encoded is None:
+            return self._fallback.dumps_sanitized(data)
+        if not _may_need_escape(encoded):
+            return encoded
+        return self._dumps(sanitize_response_data(data), self._sanitizing_default)
+
+
+def load_codec(name: str = "auto") -> JSONCodec:
+    """Encoder by name: auto, orjson or stdlib"""
+    name = (name or "auto").lower()
+    if name not in ("auto", "orjson", "stdlib"):
+        raise ValueError(f"Unknown JSON encoder: {name}")
+    if name == "stdlib" or (name == "auto" and orjson is None):
+        return StdlibCodec()
+    if orjson is None:
+        logger.warning("orjson is not installed, using the stdlib JSON encoder")
+        return StdlibCodec()
+    return OrjsonCodec()
+
+
+_CODEC = load_codec(os.getenv("JSON_ENCODER", "auto"))
+
+
+def get_json_codec() -> JSONCodec:
+    """Get the JSON encoder selected at startup"""
+    return _CODEC
@@ -0,0 +1,225 @@
+"""Compressed, rotated log segments with a correlation_id index
+
+A segment is a gzip file made of independent members (blocks) of JSON
+lines, so it still reads with zcat. Next to it, a `.idx` sidecar holds
+one JSON line per block: its offset and length in the segment and the
+correlation IDs it contains. A lookup reads the sidecars and decompresses
+only the blocks that mention the ID.
+"""
+
+import gzip
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+SEGMENT_SUFFIX = ".log.gz"
+INDEX_SUFFIX = ".idx"
+BLOCK_BYTES = 64 * 1024
+BLOCK_SECONDS = 1.0
+SEGMENT_BYTES = 64 * 2**20
+SEGMENT_SECONDS = 3600.0
+
+_CORRELATION_ID = re.compile(rb'"correlation_id":\s*"([^"\\]*)"')
+
+
+class SegmentedLogWriter:
+    """Binary log sink writing rotated gzip segments and their index
+
+    Lines are buffered into blocks of about `block_bytes`, written once
+    the buffer is full or older than `block_seconds` when flush() is
+    called. A new segment starts after `segment_bytes` of compressed data
+    or `segment_seconds`. Meant for a single writer thread, such as the
+    one of AsyncBatchHandler.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "app",
+        block_bytes: int = BLOCK_BYTES,
+        block_seconds: float = BLOCK_SECONDS,
+        segment_bytes: int = SEGMENT_BYTES,
+        segment_seconds: float = SEGMENT_SECONDS,
+        clock=time.time,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._prefix = prefix
+        self._block_bytes = block_bytes
+        self._block_seconds = block_seconds
+        self._segment_bytes = segment_bytes
+        self._segment_seconds = segment_seconds
+        self._clock = clock
+        self._sequence = 0
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._buffered_since = 0.0
+        self._segment = None
+        self._index = None
+        self._offset = 0
+        self._opened_at = 0.0
+        self.closed = False
+
+    @property
+    def segment_path(self) -> Optional[str]:
+        """Path of the segment being written, None before the first block"""
+        return None if self._segment is None else self._segment.name
+
+    def write(self, data: bytes) -> int:
+        """Buffer complete lines; a block is cut on flush() or when full"""
+        if not data:
+            return 0
+        if not self._buffer:
+            self._buffered_since = self._clock()
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self._block_bytes:
+            self._write_block()
+        return len(data)
+
+    def flush(self, force: bool = False) -> None:
+        """Write the buffered lines as a block if it is due, or always with force"""
+        if self._buffer and (
+            force or self._clock() - self._buffered_since >= self._block_seconds
+        ):
+            self._write_block()
+
+    def close(self) -> None:
+        """Write what is buffered and close the current segment"""
+        if self.closed:
+            return
+        self.flush(force=True)
+        self._close_segment()
+        self.closed = True
+
+    def _open_segment(self) -> None:
+        now = self._clock()
+        self._sequence += 1
+        stamp = datetime.fromtimestamp(now).strftime("%Y%m%dT%H%M%S")
+        name = f"{self._prefix}-{stamp}-{os.getpid()}-{self._sequence:04d}"
+        path = os.path.join(self.directory, name + SEGMENT_SUFFIX)
+        self._segment = open(path, "xb")
+        self._index = open(path + INDEX_SUFFIX, "xb")
+        self._offset = 0
+        self._opened_at = now
+
+    def _close_segment(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._index.close()
+            self._segment = self._index = None
+
+    def _write_block(self) -> None:
+        data = b"".join(self._buffer)
+        self._buffer, self._buffered = [], 0
+        if self._segment is not None and (
+            self._offset >= self._segment_bytes
+            or self._clock() - self._opened_at >= self._segment_seconds
+        ):
+            self._close_segment()
+        if self._segment is None:
+            self._open_segment()
+
+        block = gzip.compress(data, mtime=0)
+        ids = sorted({m.decode() for m in _CORRELATION_ID.findall(data) if m != b"-"})
+        self._segment.write(block)
+        self._segment.flush()
+        # The block is on disk before the index points at it
+        entry = {"offset": self._offset, "length": len(block), "ids": ids}
+        self._index.write(json.dumps(entry, separators=(",", ":")).encode() + b"\n")
+        self._index.flush()
+        self._offset += len(block)
+
+
+def iter_segments(directory: str) -> List[str]:
+    """Segment paths in a directory, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+def _index_lines(segment: str) -> List[bytes]:
+    try:
+        with open(segment + INDEX_SUFFIX, "rb") as handle:
+            return handle.read().splitlines()
+    except FileNotFoundError:
+        return []
+
+
+def _parse_index(lines: Iterable[bytes], needle: bytes) -> List[Dict[str, Any]]:
+    entries = []
+    for line in lines:
+        if needle in line:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Torn last line of a crashed writer
+                break
+    return entries
+
+
+def read_index(segment: str) -> List[Dict[str, Any]]:
+    """Block entries of a segment; a torn last line is ignored"""
+    return _parse_index(_index_lines(segment), b"")
+
+
+def _matching_lines(
+    lines: Iterable[bytes], correlation_id: str
+) -> Iterator[Dict[str, Any]]:
+    needle = correlation_id.encode()
+    for line in lines:
+        if needle in line:
+            entry = json.loads(line)
+            if entry.get("correlation_id") == correlation_id:
+                yield entry
+
+
+class LookupStats:
+    """What a lookup read, to show it skipped the rest"""
+
+    def __init__(self):
+        self.segments = 0
+        self.blocks = 0
+        self.blocks_read = 0
+        self.bytes_read = 0
+
+
+def find_by_correlation_id(
+    directory: str, correlation_id: str, stats: Optional[LookupStats] = None
+) -> Iterator[Dict[str, Any]]:
+    """Log entries with a correlation ID, reading only the indexed blocks"""
+    stats = stats or LookupStats()
+    # Only index lines naming the ID as a JSON string are parsed
+    needle = json.dumps(correlation_id).encode()
+    for segment in iter_segments(directory):
+        stats.segments += 1
+        lines = _index_lines(segment)
+        stats.blocks += len(lines)
+        entries = _parse_index(lines, needle)
+        wanted = [e for e in entries if correlation_id in e["ids"]]
+        if not wanted:
+            continue
+        with open(segment, "rb") as handle:
+            for entry in wanted:
+                handle.seek(entry["offset"])
+                compressed = handle.read(entry["length"])
+                stats.blocks_read += 1
+                stats.bytes_read += len(compressed)
+                block = gzip.decompress(compressed).splitlines()
+                yield from _matching_lines(block, correlation_id)
+
+
+def scan_by_correlation_id(
+    directory: str, correlation_id: str
+) -> Iterator[Dict[str, Any]]:
+    """Log entries with a correlation ID, decompressing every segment"""
+    for segment in iter_segments(directory):
+        with gzip.open(segment, "rb") as handle:
+            yield from _matching_lines(handle, correlation_id)
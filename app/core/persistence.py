@@ -0,0 +1,306 @@
+"""Write-ahead log and snapshots for the in-memory feature store"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.records import FeatureRecord
+from app.core.store import FeatureStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+_SEGMENT_PREFIX = "wal-"
+_SEGMENT_SUFFIX = ".log"
+_DATETIME_FIELDS = ("created_at", "updated_at")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, FeatureRecord):
+        return value.to_dict()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot journal value of type {type(value).__name__}")
+
+
+def _encode(record: Dict[str, Any]) -> str:
+    return json.dumps(
+        record, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    )
+
+
+def _decode_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    for field in _DATETIME_FIELDS:
+        if isinstance(row.get(field), str):
+            row[field] = datetime.fromisoformat(row[field])
+    return row
+
+
+def _decode_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore types lost in JSON: datetimes and integer dict keys"""
+    op = record["op"]
+    if op == "insert":
+        record["rows"] = [_decode_row(row) for row in record["rows"]]
+    elif op == "update":
+        record["updates"] = [
+            [i, _decode_row(changes)] for i, changes in record["updates"]
+        ]
+    elif op == "votes":
+        record["deltas"] = {int(i): delta for i, delta in record["deltas"].items()}
+    return record
+
+
+class _Rotate:
+    """Journal marker: close the current segment and start the next one"""
+
+    __slots__ = ("segment",)
+
+    def __init__(self, segment: int):
+        self.segment = segment
+
+
+class WriteAheadLog:
+    """Append-only mutation journal with group commit and snapshot compaction
+
+    Writers enqueue records and get a sequence number back. One background
+    thread writes everything queued so far and issues a single fsync for the
+    whole group, so concurrent writers share the cost of each fsync.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sync: bool = True,
+        snapshot_threshold: int = 50_000,
+        snapshot_interval: float = 5.0,
+    ):
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._sync = sync
+        self._snapshot_threshold = snapshot_threshold
+        self._snapshot_interval = snapshot_interval
+
+        self._cond = threading.Condition()
+        self._queue: List[Any] = []
+        self._seq = 0
+        self._durable = 0
+        self._since_snapshot = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+        self._store: Optional[FeatureStore] = None
+        self._segment = 0
+        self._next_segment = 0
+        self._file = None
+        self._writer: Optional[threading.Thread] = None
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._snapshot_lock = threading.Lock()
+
+    def _segment_path(self, segment: int) -> Path:
+        return self._dir / f"{_SEGMENT_PREFIX}{segment:08d}{_SEGMENT_SUFFIX}"
+
+    def _segments(self) -> List[int]:
+        numbers = []
+        for path in self._dir.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}"):
+            try:
+                numbers.append(
+                    int(path.name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)])
+                )
+            except ValueError:
+                continue
+        return sorted(numbers)
+
+    def recover(
+        self, seed_rows: Iterable[Dict[str, Any]] = (), escape_once: bool = False
+    ) -> FeatureStore:
+        """Rebuild the store from snapshot plus journal and start journaling it"""
+        snapshot_path = self._dir / SNAPSHOT_FILE
+        first_segment = 0
+        if snapshot_path.exists():
+            header, rows = self._read_snapshot(snapshot_path)
+            store = FeatureStore(rows, header["last_id"], escape_once)
+            first_segment = header["segment"]
+        elif not self._segments():
+            store = FeatureStore(seed_rows, escape_once=escape_once)
+        else:
+            store = FeatureStore(escape_once=escape_once)
+
+        replayed = 0
+        segments = [s for s in self._segments() if s >= first_segment]
+        for segment in segments:
+            for record in self._read_segment(self._segment_path(segment)):
+                store.replay(record)
+                replayed += 1
+        logger.info(
+            f"Recovered {len(store)} features, replayed {replayed} journal records"
+        )
+
+        self._segment = (segments[-1] + 1) if segments else max(first_segment, 1)
+        self._next_segment = self._segment
+        self._file = open(self._segment_path(self._segment), "a", encoding="utf-8")
+        self._store = store
+        store.attach_journal(self)
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name="wal-writer", daemon=True
+        )
+        self._writer.start()
+        self._compactor = threading.Thread(
+            target=self._compact_loop, name="wal-compactor", daemon=True
+        )
+        self._compactor.start()
+
+        if replayed or not snapshot_path.exists():
+            self.snapshot()
+        return store
+
+    def _read_snapshot(self, path: Path) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        with path.open("r", encoding="utf-8") as handle:
+            header = json.loads(handle.readline())
+            rows = [_decode_row(json.loads(line)) for line in handle if line.strip()]
+        return header, rows
+
+    def _read_segment(self, path: Path) -> Iterator[Dict[str, Any]]:
+        with path.open("r", encoding="utf-8") as handle:
+            for line_number, line in enumerate(handle, start=1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves a torn tail; nothing after it was acknowledged
+                    logger.warning(
+                        f"Ignoring torn journal tail in {path.name}:{line_number}"
+                    )
+                    return
+                yield _decode_record(record)
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Queue a mutation record, returns its sequence number"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write-ahead log is closed")
+            self._seq += 1
+            self._since_snapshot += 1
+            self._queue.append(record)
+            self._cond.notify_all()
+            return self._seq
+
+    def wait(self, seq: int) -> None:
+        """Block until the record is fsynced; no-op in async mode"""
+        if not self._sync:
+            return
+        with self._cond:
+            while self._durable < seq and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise RuntimeError("Write-ahead log failed") from self._error
+
+    def rotate(self) -> Tuple[int, int]:
+        """Switch to a new segment, returns (marker seq, new segment number)"""
+        with self._cond:
+            self._seq += 1
+            self._next_segment += 1
+            self._since_snapshot = 0
+            self._queue.append(_Rotate(self._next_segment))
+            self._cond.notify_all()
+            return self._seq, self._next_segment
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                batch, self._queue = self._queue, []
+                last_seq = self._seq
+
+            try:
+                lines = []
+                for item in batch:
+                    if isinstance(item, _Rotate):
+                        self._write(lines)
+                        lines = []
+                        self._file.close()
+                        self._segment = item.segment
+                        self._file = open(
+                            self._segment_path(self._segment), "a", encoding="utf-8"
+                        )
+                    else:
+                        lines.append(_encode(item))
+                self._write(lines)
+            except Exception as e:
+                logger.error(f"Write-ahead log write failed: {type(e).__name__}")
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self._durable = last_seq
+                self._cond.notify_all()
+
+    def _write(self, lines: List[str]) -> None:
+        """Write a group of records with one flush and one fsync"""
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _compact_loop(self) -> None:
+        while not self._stop.wait(self._snapshot_interval):
+            if self._since_snapshot >= self._snapshot_threshold:
+                try:
+                    self.snapshot()
+                except Exception as e:
+                    logger.error(f"Snapshot failed: {type(e).__name__}")
+
+    def snapshot(self) -> None:
+        """Write a compacted snapshot and drop the journal segments it covers"""
+        with self._snapshot_lock:
+            rows, last_id, (marker_seq, segment) = self._store.checkpoint()
+
+            tmp_path = self._dir / (SNAPSHOT_FILE + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                handle.write(_encode({"last_id": last_id, "segment": segment}) + "\n")
+                for row in rows:
+                    handle.write(_encode(row) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self._dir / SNAPSHOT_FILE)
+            self._fsync_dir()
+
+            # Older segments may be deleted only once the writer has left them
+            with self._cond:
+                while self._durable < marker_seq and self._error is None:
+                    self._cond.wait()
+            for old in self._segments():
+                if old < segment:
+                    self._segment_path(old).unlink(missing_ok=True)
+
+    def _fsync_dir(self) -> None:
+        try:
+            fd = os.open(self._dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self) -> None:
+        """Write out everything queued and stop background threads"""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+        if self._file is not None:
+            self._file.close()
@@ -0,0 +1,207 @@
+"""Compact feature record layout"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from app.core.xss_protection import escape_html
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: Optional[datetime]) -> Optional[int]:
+    """Datetime as microseconds since epoch; aware values are normalized to UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: Optional[int]) -> Optional[datetime]:
+    """Naive datetime from microseconds since epoch"""
+    if value is None:
+        return None
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _isoformat(value: Optional[int]) -> Optional[str]:
+    return None if value is None else from_epoch_us(value).isoformat()
+
+
+def _json_datetime(value: Optional[datetime]) -> Optional[str]:
+    # Same text as pydantic's JSON mode, which writes a zero UTC offset as Z
+    if value is None:
+        return None
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def feature_json(row: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-ready row as the Feature schema dumps it, without validating it
+
+    For rows the store produced: they were validated on the way in, so
+    revalidating them on every read only costs time.
+    """
+    price = row["price_estimate"]
+    return {
+        "title": row["title"],
+        "link": row["link"],
+        "price_estimate": None if price is None else float(price),
+        "votes": row["votes"],
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "created_at": _json_datetime(row["created_at"]),
+        "updated_at": _json_datetime(row["updated_at"]),
+    }
+
+
+def _intern(value: Any) -> Any:
+    # sys.intern rejects str subclasses, str() hands back a plain str
+    return sys.intern(str(value)) if isinstance(value, str) else value
+
+
+_FIELDS = (
+    "id",
+    "user_id",
+    "title",
+    "link",
+    "price_estimate",
+    "votes",
+    "created_us",
+    "updated_us",
+)
+
+
+class FeatureRecord:
+    """Immutable feature row stored without a per-row dict
+
+    Timestamps are kept as epoch microseconds and strings are interned, so
+    a record costs a fixed slot array instead of a dict plus two datetimes.
+    `version`, and the HTML-escaped `title_html` and `link_html` when the
+    store escapes on write, are set by the store before the record is
+    published and are not part of the row.
+    """
+
+    __slots__ = _FIELDS + ("version", "title_html", "link_html")
+
+    def __init__(
+        self,
+        id: int,
+        user_id: Optional[int],
+        title: Optional[str],
+        link: Optional[str],
+        price_estimate: Optional[float],
+        votes: int,
+        created_us: Optional[int],
+        updated_us: Optional[int],
+        version: int = 0,
+        title_html: Optional[str] = None,
+        link_html: Optional[str] = None,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.title = _intern(title)
+        self.link = _intern(link)
+        self.price_estimate = price_estimate
+        self.votes = votes
+        self.created_us = created_us
+        self.updated_us = updated_us
+        self.version = version
+        self.title_html = title_html
+        self.link_html = link_html
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any]) -> "FeatureRecord":
+        """Build a record from a row dict; keys outside the schema are dropped"""
+        return cls(
+            row["id"],
+            row.get("user_id"),
+            row.get("title"),
+            row.get("link"),
+            row.get("price_estimate"),
+            row.get("votes") or 0,
+            to_epoch_us(row.get("created_at")),
+            to_epoch_us(row.get("updated_at")),
+        )
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        return from_epoch_us(self.created_us)
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        return from_epoch_us(self.updated_us)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Row dict in the shape the API and repositories use"""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "title": self.title,
+            "link": self.link,
+            "price_estimate": self.price_estimate,
+            "votes": self.votes,
+            "created_at": from_epoch_us(self.created_us),
+            "updated_at": from_epoch_us(self.updated_us),
+        }
+
+    def replace(self, changes: Dict[str, Any]) -> "FeatureRecord":
+        """Copy of the record with row-dict style changes applied"""
+        row = self.to_dict()
+        row.update(changes)
+        row["id"] = self.id
+        return FeatureRecord.from_dict(row)
+
+    def with_votes(self, votes: int) -> "FeatureRecord":
+        return FeatureRecord(
+            self.id,
+            self.user_id,
+            self.title,
+            self.link,
+            self.price_estimate,
+            votes,
+            self.created_us,
+            self.updated_us,
+            title_html=self.title_html,
+            link_html=self.link_html,
+        )
+
+    def escape(self) -> None:
+        """Cache the HTML-escaped title and link, if not done yet"""
+        if self.title_html is None and self.title is not None:
+            self.title_html = escape_html(self.title)
+        if self.link_html is None and self.link is not None:
+            self.link_html = escape_html(self.link)
+
+    def to_escaped_dict(self) -> Dict[str, Any]:
+        """JSON-ready row as the Feature schema dumps it, strings already escaped
+
+        Needs escape() to have run. Timestamps and numbers contain nothing to
+        escape, so serializing this without further escaping matches
+        sanitizing the Feature dump.
+        """
+        price = self.price_estimate
+        return {
+            "title": self.title_html,
+            "link": self.link_html,
+            "price_estimate": None if price is None else float(price),
+            "votes": self.votes,
+            "id": self.id,
+            "user_id": self.user_id,
+            "created_at": _isoformat(self.created_us),
+            "updated_at": _isoformat(self.updated_us),
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FeatureRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in _FIELDS)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"FeatureRecord(id={self.id!r}, title={self.title!r}, votes={self.votes})"
+        )
@@ -0,0 +1,56 @@
+"""Bounded LRU cache of rendered response bodies"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+CachedBody = Tuple[bytes, Dict[str, str]]
+
+
+class ResponseCache:
+    """Rendered bodies plus extra headers, keyed by request key and data version
+
+    Entries are never invalidated explicitly: a mutation changes the version,
+    so stale entries stop being looked up and age out through LRU eviction.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 2**20):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[CachedBody]:
+        """Cached body for key, marking it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: CachedBody) -> None:
+        """Cache a body, evicting least recently used entries over the limits"""
+        size = len(entry[0])
+        if size > self._max_bytes or self._max_entries <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = entry
+            self._bytes += size
+            while (
+                len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
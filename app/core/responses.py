@@ -0,0 +1,24 @@
+"""Response classes"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.json_codec import get_json_codec
+
+
+class SanitizedJSONResponse(JSONResponse):
+    """JSON response whose strings are HTML-escaped during serialization
+
+    Encodes with the encoder selected by JSON_ENCODER. Marks the request as
+    sanitized so the XSS middleware passes the body through instead of
+    decoding and re-encoding it.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return get_json_codec().dumps_sanitized(content)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        scope.setdefault("state", {})["xss_sanitized"] = True
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,314 @@
+"""Parallel, incremental secret scanning of a source tree (ADR-002)
+
+Runs the SecretsManager patterns over every text file of a tree in a
+process pool. Files are scanned as bytes, large ones through mmap, so
+nothing is decoded or read into memory whole. Results are cached by the
+SHA-256 of the file content, so unchanged files are never rescanned.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.secrets import SecretsManager
+
+CACHE_VERSION = 1
+MMAP_THRESHOLD = 1 << 20
+BINARY_SNIFF_BYTES = 8192
+SKIP_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        "__pycache__",
+        ".pytest_cache",
+        ".mypy_cache",
+        ".ruff_cache",
+        ".tox",
+        ".venv",
+        "venv",
+        "node_modules",
+    }
+)
+
+
+class Finding(NamedTuple):
+    """Secret-looking assignment found in a file; `snippet` is masked"""
+
+    path: str
+    rule: str
+    line: int
+    column: int
+    snippet: str
+
+
+class ScanResult(NamedTuple):
+    """Findings of a scan plus what it cost"""
+
+    findings: List[Finding]
+    scanned: int
+    cached: int
+    skipped: int
+
+
+def rule_ids(manager: SecretsManager) -> List[str]:
+    """Rule ID per pattern, in pattern order"""
+    return [f"hardcoded-{keyword}" for keyword in manager.matcher.keywords]
+
+
+def rules_fingerprint(manager: SecretsManager) -> str:
+    """Hash of the patterns; cached results are only valid for the same rules"""
+    return hashlib.sha256("\n".join(manager.matcher.patterns).encode()).hexdigest()
+
+
+class _FileScanner:
+    """Per-process scanning state: one bytes regex over all patterns"""
+
+    def __init__(self, manager: SecretsManager, mmap_threshold: int):
+        self._manager = manager
+        self._rules = rule_ids(manager)
+        self._keywords = [k.encode() for k in manager.matcher.keywords]
+        self._mmap_threshold = mmap_threshold
+
+    def _findings(self, path: str, data) -> List[Finding]:
+        findings = []
+        line, line_start, counted = 1, 0, 0
+        for index, match in self._manager.matcher.finditer_bytes(data):
+            start = match.start()
+            newlines = data[counted:start].count(b"\n")
+            if newlines:
+                line += newlines
+                line_start = data.rfind(b"\n", counted, start) + 1
+            counted = start
+            text = match.group().decode("utf-8", "replace")
+            findings.append(
+                Finding(
+                    path,
+                    self._rules[index],
+                    line,
+                    start - line_start + 1,
+                    self._manager.mask_secret(text),
+                )
+            )
+        return findings
+
+    def scan(
+        self, path: str, known: Dict[str, list]
+    ) -> Tuple[str, Optional[str], list]:
+        """(path, content digest or None if skipped, findings as lists)"""
+        try:
+            with open(path, "rb") as handle:
+                size = os.fstat(handle.fileno()).st_size
+                if size == 0:
+                    return path, None, []
+                if b"\0" in handle.read(BINARY_SNIFF_BYTES):
+                    return path, None, []
+                if size >= self._mmap_threshold:
+                    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        return self._scan_data(path, data, known)
+                handle.seek(0)
+                return self._scan_data(path, handle.read(), known)
+        except OSError:
+            return path, None, []
+
+    def _scan_data(self, path: str, data, known: Dict[str, list]):
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in known:
+            return path, digest, known[digest]
+        if isinstance(data, bytes):
+            # Same keyword prefilter as SecretMatcher; bytes patterns only fold
+            # ASCII case, so lower() is exact here. Large files skip it rather
+            # than copy the map
+            lowered = data.lower()
+            if not any(keyword in lowered for keyword in self._keywords):
+                return path, digest, []
+        findings = self._findings(path, data)
+        return path, digest, [list(finding[1:]) for finding in findings]
+
+
+_worker: Optional[_FileScanner] = None
+_worker_known: Dict[str, list] = {}
+
+
+def _init_worker(
+    manager_class: type, mmap_threshold: int, known: Dict[str, list]
+) -> None:
+    global _worker, _worker_known
+    _worker = _FileScanner(manager_class(), mmap_threshold)
+    _worker_known = known
+
+
+def _scan_in_worker(path: str):
+    return _worker.scan(path, _worker_known)
+
+
+def iter_files(roots: Iterable[str]) -> Iterator[str]:
+    """Regular files under roots, skipping VCS, cache and virtualenv dirs"""
+    for root in roots:
+        if os.path.isfile(root):
+            yield root
+            continue
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for name in sorted(filenames):
+                path = os.path.join(directory, name)
+                if os.path.isfile(path) and not os.path.islink(path):
+                    yield path
+
+
+def changed_files(since: str, cwd: str = ".") -> List[str]:
+    """Files added, copied, modified or renamed since a git revision"""
+    output = subprocess.run(
+        ["git", "diff", "--name-only", "--diff-filter=ACMR", "-z", since, "--"],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    ).stdout
+    paths = (os.path.join(cwd, name) for name in output.decode().split("\0") if name)
+    return [path for path in paths if os.path.isfile(path)]
+
+
+class SecretScanner:
+    """Scans files for secrets in parallel with a content-hash result cache"""
+
+    def __init__(
+        self,
+        manager: Optional[SecretsManager] = None,
+        cache_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        mmap_threshold: int = MMAP_THRESHOLD,
+    ):
+        self._manager = manager or SecretsManager()
+        self._cache_path = cache_path
+        self._workers = workers if workers is not None else os.cpu_count() or 1
+        self._mmap_threshold = mmap_threshold
+        self._fingerprint = rules_fingerprint(self._manager)
+
+    @property
+    def rules(self) -> List[Tuple[str, str]]:
+        """(rule ID, pattern) pairs"""
+        return list(zip(rule_ids(self._manager), self._manager.matcher.patterns))
+
+    def _load_cache(self) -> Dict[str, list]:
+        if not self._cache_path or not os.path.exists(self._cache_path):
+            return {}
+        try:
+            with open(self._cache_path, "r", encoding="utf-8") as handle:
+                cache = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        if (
+            cache.get("version") != CACHE_VERSION
+            or cache.get("rules") != self._fingerprint
+        ):
+            return {}
+        return cache.get("files", {})
+
+    def _save_cache(self, files: Dict[str, list]) -> None:
+        if not self._cache_path:
+            return
+        tmp_path = f"{self._cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {"version": CACHE_VERSION, "rules": self._fingerprint, "files": files},
+                handle,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self._cache_path)
+
+    def scan(self, paths: Sequence[str], prune_cache: bool = False) -> ScanResult:
+        """Scan files; with prune_cache, drop cache entries for content not seen"""
+        known = self._load_cache()
+        if self._workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(
+                self._workers,
+                initializer=_init_worker,
+                initargs=(type(self._manager), self._mmap_threshold, known),
+            ) as pool:
+                results = list(
+                    pool.map(
+                        _scan_in_worker,
+                        paths,
+                        chunksize=max(1, len(paths) // (self._workers * 8)),
+                    )
+                )
+        else:
+            scanner = _FileScanner(self._manager, self._mmap_threshold)
+            results = [scanner.scan(path, known) for path in paths]
+
+        findings: List[Finding] = []
+        seen: Dict[str, list] = {}
+        scanned = cached = skipped = 0
+        for path, digest, rows in results:
+            if digest is None:
+                skipped += 1
+                continue
+            if digest in known:
+                cached += 1
+            else:
+                scanned += 1
+            seen[digest] = rows
+            findings.extend(Finding(path, *row) for row in rows)
+
+        self._save_cache(seen if prune_cache else {**known, **seen})
+        return ScanResult(findings, scanned, cached, skipped)
+
+
+def to_sarif(
+    result: ScanResult, rules: Sequence[Tuple[str, str]], base: str = "."
+) -> dict:
+    """SARIF 2.1.0 log of a scan, paths relative to base"""
+    return {
+        "version": "2.1.0",
+        "$schema": (
+            "https://docs.oasis-open.org/sarif/sarif/v2.1.0/os/schemas/"
+            "sarif-schema-2.1.0.json"
+        ),
+        "runs": [
+            {
+                "tool": {
+                    "driver": {
+                        "name": "secret-scanner",
+                        "rules": [
+                            {
+                                "id": rule,
+                                "shortDescription": {
+                                    "text": f"Hardcoded secret: {rule}"
+                                },
+                                "properties": {"pattern": pattern},
+                            }
+                            for rule, pattern in rules
+                        ],
+                    }
+                },
+                "results": [
+                    {
+                        "ruleId": finding.rule,
+                        "level": "error",
+                        "message": {"text": f"Possible secret: {finding.snippet}"},
+                        "locations": [
+                            {
+                                "physicalLocation": {
+                                    "artifactLocation": {
+                                        "uri": Path(
+                                            os.path.relpath(finding.path, base)
+                                        ).as_posix()
+                                    },
+                                    "region": {
+                                        "startLine": finding.line,
+                                        "startColumn": finding.column,
+                                    },
+                                }
+                            }
+                        ],
+                    }
+                    for finding in result.findings
+                ],
+            }
+        ],
+    }
@@ -3,31 +3,276 @@
 import logging
 import os
 import re
-from typing import Any, Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 logger = logging.getLogger(__name__)
 
+# Each pattern can only match text containing its keyword, in any case
+FORBIDDEN_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    ("password", r'password\s*[:=]\s*["\']?([^"\'\s]+)["\']?'),
+    ("secret", r'secret\s*[:=]\s*["\']?([^"\'\s]+)["\']?'),
+    ("token", r'token\s*[:=]\s*["\']?([^"\'\s]+)["\']?'),
+    ("api", r'api[_-]?key\s*[:=]\s*["\']?([^"\'\s]+)["\']?'),
+    ("jwt", r'jwt\s*[:=]\s*["\']?([^"\'\s]+)["\']?'),
+)
+
+
+def alternation(
+    patterns: Sequence[str], flags: int = 0, binary: bool = False
+) -> Tuple["re.Pattern", Dict[int, int]]:
+    """One regex matching any of patterns, and pattern index by group number
+
+    Each pattern is wrapped in its own group. That group closes after any
+    group nested in it, so match.lastindex names the pattern that matched.
+    With binary=True the regex is compiled for bytes.
+    """
+    parts = []
+    index_of_group: Dict[int, int] = {}
+    group = 1
+    for index, pattern in enumerate(patterns):
+        parts.append(f"({pattern})")
+        index_of_group[group] = index
+        group += 1 + re.compile(pattern).groups
+    source = "|".join(parts)
+    return re.compile(source.encode() if binary else source, flags), index_of_group
+
+
+class SecretMatcher:
+    """Secret patterns compiled once, behind a keyword prefilter
+
+    The prefilter lowercases the text once and looks for each pattern's
+    keyword, so text mentioning none of them never reaches the regex
+    engine. Patterns whose keyword is present are scanned together as one
+    alternation, compiled once per combination.
+    """
+
+    def __init__(self, patterns: Sequence[Tuple[str, str]] = FORBIDDEN_PATTERNS):
+        self.keywords = tuple(keyword for keyword, _ in patterns)
+        self.patterns = tuple(pattern for _, pattern in patterns)
+        self._compiled = tuple(re.compile(p, re.IGNORECASE) for p in self.patterns)
+        self._all = tuple(range(len(self.patterns)))
+        self._combined: Dict[Tuple[int, ...], "re.Pattern[str]"] = {}
+        self._binary: Optional[Tuple["re.Pattern[bytes]", Dict[int, int]]] = None
+        self._lock = threading.Lock()
+
+    def candidates(self, text: str) -> Tuple[int, ...]:
+        """Indices of the patterns that can match in text"""
+        if not text.isascii():
+            # IGNORECASE also folds e.g. U+017F to "s", which lower() does not
+            return self._all
+        lowered = text.lower()
+        return tuple(
+            index for index, keyword in enumerate(self.keywords) if keyword in lowered
+        )
+
+    def _combine(self, indices: Tuple[int, ...]) -> "re.Pattern[str]":
+        combined = self._combined.get(indices)
+        if combined is None:
+            with self._lock:
+                combined = self._combined.get(indices)
+                if combined is None:
+                    combined, _ = alternation(
+                        [self.patterns[i] for i in indices], re.IGNORECASE
+                    )
+                    self._combined[indices] = combined
+        return combined
+
+    def sub(self, repl: Callable[["re.Match[str]"], str], text: str) -> str:
+        """Replace every match in one scan; text without candidates is returned as is"""
+        indices = self.candidates(text)
+        if not indices:
+            return text
+        return self._combine(indices).sub(repl, text)
+
+    def finditer_bytes(self, data) -> Iterator[Tuple[int, "re.Match[bytes]"]]:
+        """(pattern index, match) for every match in bytes-like data, one scan"""
+        if self._binary is None:
+            self._binary = alternation(self.patterns, re.IGNORECASE, binary=True)
+        regex, index_of_group = self._binary
+        for match in regex.finditer(data):
+            yield index_of_group[match.lastindex], match
+
+    def count(self, text: str) -> List[Tuple[str, int]]:
+        """(pattern, number of matches) for each pattern matching in text"""
+        counts = []
+        for index in self.candidates(text):
+            matches = sum(1 for _ in self._compiled[index].finditer(text))
+            if matches:
+                counts.append((self.patterns[index], matches))
+        return counts
+
+
+_RECORD_SEPARATOR = "\n'\n"
+
+
+class SecretProvider(Protocol):
+    """Source of secret values; returns None for keys it does not hold"""
+
+    name: str
+
+    def get(self, key: str) -> Optional[str]: ...
+
+
+class EnvProvider:
+    """Secrets from environment variables"""
+
+    name = "env"
+
+    def get(self, key: str) -> Optional[str]:
+        return os.getenv(key)
+
+
+class FileProvider:
+    """Secrets mounted as files, one per key (e.g. /run/secrets/<key>)
+
+    The file named after the key is tried first, then its lowercase form,
+    as Docker and Kubernetes secret names usually are. Trailing newlines
+    are stripped.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def get(self, key: str) -> Optional[str]:
+        if not key or key.startswith(".") or "/" in key or os.sep in key:
+            return None
+        for name in dict.fromkeys((key, key.lower())):
+            try:
+                with open(
+                    os.path.join(self.directory, name), "r", encoding="utf-8"
+                ) as handle:
+                    return handle.read().rstrip("\r\n")
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"Cannot read secret in {self.directory}: {e.strerror}")
+                return None
+        return None
+
+
+def default_providers() -> List[SecretProvider]:
+    """Environment variables, then files in SECRETS_DIR if it is set"""
+    providers: List[SecretProvider] = [EnvProvider()]
+    directory = os.getenv("SECRETS_DIR")
+    if directory:
+        providers.append(FileProvider(directory))
+    return providers
+
+
+def default_ttl() -> Optional[float]:
+    """Cache lifetime from SECRETS_TTL in seconds; unset caches forever"""
+    ttl = os.getenv("SECRETS_TTL")
+    return float(ttl) if ttl else None
+
+
+class _CachedSecret(NamedTuple):
+    value: str
+    expires_at: float  # time.monotonic(); infinity when cached forever
+
 
 class SecretsManager:
     """Centralized secrets management with security controls"""
 
-    def __init__(self):
-        self._cache: Dict[str, str] = {}
+    def __init__(
+        self,
+        providers: Optional[Sequence[SecretProvider]] = None,
+        ttl: Optional[float] = None,
+        key_ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._providers = list(providers) if providers is not None else [EnvProvider()]
+        self._ttl = ttl
+        self._key_ttls = dict(key_ttls or {})
+        self._clock = clock
+        # Entries are replaced, never mutated, so readers need no lock
+        self._cache: Dict[str, _CachedSecret] = {}
+        self._lock = threading.Lock()
+        self._refreshing: Set[str] = set()
+        self._refresher: Optional[ThreadPoolExecutor] = None
         self._secrets_logged = False
-        self._forbidden_patterns = [
-            r'password\s*[:=]\s*["\']?([^"\'\s]+)["\']?',
-            r'secret\s*[:=]\s*["\']?([^"\'\s]+)["\']?',
-            r'token\s*[:=]\s*["\']?([^"\'\s]+)["\']?',
-            r'api[_-]?key\s*[:=]\s*["\']?([^"\'\s]+)["\']?',
-            r'jwt\s*[:=]\s*["\']?([^"\'\s]+)["\']?',
-        ]
+        self._matcher = SecretMatcher()
+        self._forbidden_patterns = list(self._matcher.patterns)
+
+    @property
+    def matcher(self) -> SecretMatcher:
+        """Compiled patterns used for masking and detection"""
+        return self._matcher
 
     def get_secret(self, key: str, default: Optional[str] = None) -> str:
-        """Get secret from environment variables with security checks"""
-        if key in self._cache:
-            return self._cache[key]
+        """Get secret from the providers with security checks
+
+        Values are cached for their TTL. An expired value is still returned
+        while a background refresh fetches the new one.
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry.expires_at > self._clock():
+                return entry.value
+            self._schedule_refresh(key, default)
+            return entry.value
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                entry = self._load(key, default)
+                self._cache[key] = entry
+        return entry.value
 
-        value = os.getenv(key)
+    def refresh(self, key: str, default: Optional[str] = None) -> str:
+        """Re-read a secret from the providers now
+
+        If it can no longer be found, the cached value is kept.
+        """
+        try:
+            entry = self._load(key, default)
+        except ValueError:
+            cached = self._cache.get(key)
+            if cached is None:
+                raise
+            logger.warning(f"Secret '{self._mask_key(key)}' vanished, keeping cached")
+            entry = cached._replace(expires_at=self._expires_at(key))
+        previous = self._cache.get(key)
+        if previous is not None and previous.value != entry.value:
+            self._log_secret_access(key, "rotated")
+        self._cache[key] = entry
+        return entry.value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one cached secret, or all of them"""
+        with self._lock:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+    def _expires_at(self, key: str) -> float:
+        ttl = self._key_ttls.get(key, self._ttl)
+        return float("inf") if ttl is None else self._clock() + ttl
+
+    def _load(self, key: str, default: Optional[str]) -> _CachedSecret:
+        value = None
+        for provider in self._providers:
+            value = provider.get(key)
+            if value is not None:
+                break
 
         if value is None:
             if default is not None:
@@ -35,17 +280,38 @@ class SecretsManager:
                 self._log_secret_access(key, "used_default")
             else:
                 self._log_secret_access(key, "not_found")
-                raise ValueError(
-                    f"Secret '{self._mask_key(key)}' not found in environment"
-                )
+                raise ValueError(f"Secret '{self._mask_key(key)}' not found")
         else:
             self._log_secret_access(key, "found")
 
         self._validate_secret(key, value)
+        return _CachedSecret(value, self._expires_at(key))
 
-        self._cache[key] = value
+    def _schedule_refresh(self, key: str, default: Optional[str]) -> None:
+        if key in self._refreshing:
+            return
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="secret-refresh"
+                )
+        self._refresher.submit(self._refresh_in_background, key, default)
 
-        return value
+    def _refresh_in_background(self, key: str, default: Optional[str]) -> None:
+        try:
+            self.refresh(key, default)
+        except Exception as e:
+            logger.error(f"Refreshing secret '{self._mask_key(key)}' failed: {e}")
+            cached = self._cache.get(key)
+            if cached is not None:
+                # Retry after another TTL rather than on every lookup
+                self._cache[key] = cached._replace(expires_at=self._expires_at(key))
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
 
     def get_jwt_secret(self) -> str:
         """Get JWT signing key with length validation"""
@@ -76,16 +342,62 @@ class SecretsManager:
         return secret[:visible_chars] + "***" + secret[-visible_chars:]
 
     def mask_data_for_logs(self, data: Any) -> Any:
-        """Recursively mask secrets in any data structure for logging"""
+        """Recursively mask secrets in any data structure for logging
+
+        Containers are copied only when something inside them is masked, so
+        data without secrets is returned as the same object.
+        """
         if isinstance(data, str):
             return self._mask_string(data)
         elif isinstance(data, dict):
-            return {k: self.mask_data_for_logs(v) for k, v in data.items()}
+            masked = None
+            for key, value in data.items():
+                new = self.mask_data_for_logs(value)
+                if new is not value:
+                    if masked is None:
+                        masked = data.copy()
+                    masked[key] = new
+            return data if masked is None else masked
         elif isinstance(data, list):
-            return [self.mask_data_for_logs(item) for item in data]
+            masked = None
+            for index, item in enumerate(data):
+                new = self.mask_data_for_logs(item)
+                if new is not item:
+                    if masked is None:
+                        masked = data.copy()
+                    masked[index] = new
+            return data if masked is None else masked
         else:
             return data
 
+    def mask_records(self, records: Iterable[Any]) -> List[Any]:
+        """Mask secrets in many log records at once
+
+        String records are scanned together: they are joined with a
+        separator no pattern can match across, masked in one pass and split
+        again.
+        """
+        records = list(records)
+        strings = [i for i, record in enumerate(records) if isinstance(record, str)]
+        masked = self._mask_strings([records[i] for i in strings])
+        for index, text in zip(strings, masked):
+            records[index] = text
+        for index, record in enumerate(records):
+            if not isinstance(record, str):
+                records[index] = self.mask_data_for_logs(record)
+        return records
+
+    def _mask_strings(self, texts: List[str]) -> List[str]:
+        # A value stops at whitespace or a quote and a keyword must be
+        # followed by whitespace, ":" or "=", so no match spans "\n'\n"
+        joined = _RECORD_SEPARATOR.join(texts)
+        if len(texts) < 2 or joined.count(_RECORD_SEPARATOR) != len(texts) - 1:
+            return [self._mask_string(text) for text in texts]
+        masked = self._mask_string(joined)
+        if masked is joined:
+            return texts
+        return masked.split(_RECORD_SEPARATOR)
+
     def _mask_key(self, key: str) -> str:
         """Mask secret key name for logging"""
         parts = key.split("_")
@@ -95,15 +407,10 @@ class SecretsManager:
 
     def _mask_string(self, text: str) -> str:
         """Mask any secrets found in string"""
-        masked = text
-        for pattern in self._forbidden_patterns:
-            masked = re.sub(
-                pattern,
-                lambda m: self.mask_secret(m.group(0)),
-                masked,
-                flags=re.IGNORECASE,
-            )
-        return masked
+        return self._matcher.sub(self._mask_match, text)
+
+    def _mask_match(self, match: "re.Match[str]") -> str:
+        return self.mask_secret(match.group(0))
 
     def _log_secret_access(self, key: str, status: str):
         """Log secret access without exposing the value"""
@@ -132,20 +439,18 @@ class SecretsManager:
             with open(filepath, "r") as f:
                 content = f.read()
 
-                for pattern in self._forbidden_patterns:
-                    matches = re.findall(pattern, content, re.IGNORECASE)
-                    if matches:
-                        detected.append(
-                            {
-                                "file": filepath,
-                                "pattern": pattern,
-                                "matches": len(matches),
-                            }
-                        )
+                for pattern, matches in self._matcher.count(content):
+                    detected.append(
+                        {
+                            "file": filepath,
+                            "pattern": pattern,
+                            "matches": matches,
+                        }
+                    )
         except Exception as e:
             logger.error(f"Error scanning {filepath}: {e}")
 
         return detected
 
 
-secrets_manager = SecretsManager()
+secrets_manager = SecretsManager(providers=default_providers(), ttl=default_ttl())
@@ -0,0 +1,52 @@
+"""Precomputed security response headers (S06-06)
+
+The header block is built once at import time from the environment and
+handed out as raw ASGI header pairs, ready to append to a response.
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+DEFAULT_CSP = (
+    "default-src 'self'; script-src 'none'; style-src 'none'; "
+    "img-src 'self' data:; font-src 'self'; connect-src 'self';"
+)
+DEFAULT_HSTS = "max-age=31536000; includeSubDomains"
+
+
+def _header_value(name: str, value: str) -> bytes:
+    if "\r" in value or "\n" in value:
+        raise ValueError(f"{name} must not contain line breaks")
+    return value.encode("latin-1")
+
+
+def build_security_headers(
+    csp: str = DEFAULT_CSP, hsts: str = DEFAULT_HSTS
+) -> Dict[str, RawHeaders]:
+    """Raw header blocks by URL scheme; HSTS only for https"""
+    base: RawHeaders = [
+        (b"x-frame-options", b"DENY"),
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin"),
+        (b"content-security-policy", _header_value("CSP", csp)),
+        (
+            b"permissions-policy",
+            b"geolocation=(), microphone=(), camera=(), payment=()",
+        ),
+    ]
+    https = base + [(b"strict-transport-security", _header_value("HSTS", hsts))]
+    return {"http": base, "https": https}
+
+
+_HEADERS = build_security_headers(
+    os.getenv("CONTENT_SECURITY_POLICY") or DEFAULT_CSP,
+    os.getenv("HSTS_POLICY") or DEFAULT_HSTS,
+)
+
+
+def security_headers(scheme: str) -> RawHeaders:
+    """Security header block for a request scheme; callers must not mutate it"""
+    return _HEADERS["https"] if scheme == "https" else _HEADERS["http"]
@@ -0,0 +1,398 @@
+"""Indexed in-memory feature store"""
+
+import bisect
+import heapq
+import secrets
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from app.core.records import FeatureRecord
+from app.repositories.base import FeatureRepository, PriceRange
+
+
+class Journal(Protocol):
+    """Mutation log a FeatureStore writes through"""
+
+    def append(self, record: Dict[str, Any]) -> int: ...
+
+    def wait(self, seq: int) -> None: ...
+
+    def rotate(self) -> Any: ...
+
+    def close(self) -> None: ...
+
+
+_ID_MIN = float("-inf")
+_ID_MAX = float("inf")
+
+
+class FeatureStore(FeatureRepository):
+    """Feature rows indexed by id with a monotonic id allocator
+
+    Rows are kept as immutable FeatureRecord objects: updates publish a new
+    record, so snapshots can hold rows without copying them. Reads hand out
+    plain row dicts built from the record. With `escape_once` the store also
+    HTML-escapes title and link when a record is written, and serves them
+    through get_escaped/select_escaped.
+
+    Price, vote and id orders are kept in sorted Python lists. Lookups
+    bisect in O(log n), but every insert, delete or vote re-rank shifts the
+    list tail with insort/del: O(n) element moves per change, done as one
+    memmove, which stays fast for the in-memory store's sizes.
+    """
+
+    def __init__(
+        self,
+        rows: Optional[Iterable[Dict[str, Any]]] = None,
+        last_id: int = 0,
+        escape_once: bool = False,
+    ):
+        self._rows: Dict[int, FeatureRecord] = {}
+        self._by_price: List[Tuple[float, int]] = []
+        # Leaderboard order: most votes first, ties broken by id
+        self._by_votes: List[Tuple[int, int]] = []
+        # Sorted ids for keyset scans; deleted ids stay as tombstones until compaction
+        self._ids: List[int] = []
+        self._tombstones = 0
+        self._last_id = last_id
+        # Bumped on every mutation; rows carry the version that last touched them.
+        # The epoch keeps tokens from one process lifetime distinct from the next.
+        self._version = 0
+        self._epoch = secrets.token_hex(4)
+        self.escape_once = escape_once
+        self._lock = threading.RLock()
+        self._journal: Optional["Journal"] = None
+        for row in rows or ():
+            self._load(row)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, feature_id: object) -> bool:
+        return feature_id in self._rows
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.all())
+
+    def _load(self, row: Dict[str, Any]) -> None:
+        """Insert a row that already carries its id"""
+        record = FeatureRecord.from_dict(row)
+        if self.escape_once:
+            record.escape()
+        self._rows[record.id] = record
+        self._index(record)
+        if record.id > self._last_id:
+            self._ids.append(record.id)
+            self._last_id = record.id
+        else:
+            bisect.insort(self._ids, record.id)
+
+    def _index(self, record: FeatureRecord) -> None:
+        if record.price_estimate is not None:
+            bisect.insort(self._by_price, (record.price_estimate, record.id))
+        bisect.insort(self._by_votes, (-record.votes, record.id))
+
+    def _unindex(self, record: FeatureRecord) -> None:
+        if record.price_estimate is not None:
+            _remove_sorted(self._by_price, (record.price_estimate, record.id))
+        _remove_sorted(self._by_votes, (-record.votes, record.id))
+
+    def _log(self, record: Dict[str, Any]) -> int:
+        """Journal a mutation; caller holds the lock so log order matches apply order"""
+        if self._journal is None:
+            return 0
+        return self._journal.append(record)
+
+    def _sync(self, seq: int) -> None:
+        """Wait for journaled mutations to become durable, outside the lock"""
+        if self._journal is not None and seq:
+            self._journal.wait(seq)
+
+    def _stamp(self, record: FeatureRecord) -> FeatureRecord:
+        """Assign the next version to a record that is about to be published"""
+        self._version += 1
+        record.version = self._version
+        if self.escape_once:
+            record.escape()
+        return record
+
+    def _insert(self, data: Dict[str, Any]) -> FeatureRecord:
+        self._last_id += 1
+        record = self._stamp(FeatureRecord.from_dict({**data, "id": self._last_id}))
+        self._rows[record.id] = record
+        self._ids.append(record.id)
+        self._index(record)
+        return record
+
+    def _update(
+        self, feature_id: int, changes: Dict[str, Any]
+    ) -> Optional[FeatureRecord]:
+        old = self._rows.get(feature_id)
+        if old is None:
+            return None
+        record = self._stamp(old.replace(changes))
+        reindex = (
+            old.price_estimate != record.price_estimate or old.votes != record.votes
+        )
+        if reindex:
+            self._unindex(old)
+            self._index(record)
+        self._rows[feature_id] = record
+        return record
+
+    def _delete(self, feature_id: int) -> bool:
+        record = self._rows.pop(feature_id, None)
+        if record is None:
+            return False
+        self._unindex(record)
+        self._version += 1
+        self._tombstones += 1
+        if self._tombstones > len(self._rows):
+            self._ids = [i for i in self._ids if i in self._rows]
+            self._tombstones = 0
+        return True
+
+    def _apply_votes(self, deltas: Dict[int, int]) -> None:
+        for feature_id, delta in deltas.items():
+            old = self._rows.get(feature_id)
+            if old is None or not delta:
+                continue
+            record = self._stamp(old.with_votes(old.votes + delta))
+            _remove_sorted(self._by_votes, (-old.votes, feature_id))
+            bisect.insort(self._by_votes, (-record.votes, feature_id))
+            self._rows[feature_id] = record
+
+    def insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new row and assign it an id"""
+        return self.insert_many([data])[0]
+
+    def insert_many(self, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store several rows under one lock acquisition"""
+        with self._lock:
+            created = [self._insert(data) for data in rows]
+            seq = self._log({"op": "insert", "rows": created})
+        self._sync(seq)
+        return [record.to_dict() for record in created]
+
+    def get(self, feature_id: int) -> Optional[Dict[str, Any]]:
+        """Get row by id"""
+        record = self._rows.get(feature_id)
+        return None if record is None else record.to_dict()
+
+    def update(
+        self, feature_id: int, changes: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Apply field changes to a row, returns None if it does not exist"""
+        return self.update_many([(feature_id, changes)])[0]
+
+    def update_many(
+        self, updates: Sequence[Tuple[int, Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Apply several updates under one lock acquisition"""
+        with self._lock:
+            results = [
+                self._update(feature_id, changes) for feature_id, changes in updates
+            ]
+            applied = [
+                [feature_id, changes]
+                for (feature_id, changes), row in zip(updates, results)
+                if row is not None
+            ]
+            seq = self._log({"op": "update", "updates": applied}) if applied else 0
+        self._sync(seq)
+        return [None if record is None else record.to_dict() for record in results]
+
+    def delete(self, feature_id: int) -> bool:
+        """Remove row by id, returns False if it does not exist"""
+        return self.delete_many([feature_id])[0]
+
+    def delete_many(self, feature_ids: Sequence[int]) -> List[bool]:
+        """Remove several rows under one lock acquisition"""
+        with self._lock:
+            results = [self._delete(feature_id) for feature_id in feature_ids]
+            deleted = [i for i, found in zip(feature_ids, results) if found]
+            seq = self._log({"op": "delete", "ids": deleted}) if deleted else 0
+        self._sync(seq)
+        return results
+
+    def apply_votes(self, deltas: Dict[int, int]) -> None:
+        """Atomically add vote deltas; unknown ids are ignored"""
+        with self._lock:
+            self._apply_votes(deltas)
+            seq = self._log({"op": "votes", "deltas": deltas}) if deltas else 0
+        self._sync(seq)
+
+    def version(self) -> Optional[str]:
+        """Token that changes on every mutation"""
+        return f"{self._epoch}-{self._version}"
+
+    def row_version(self, feature_id: int) -> Optional[str]:
+        """Token that changes whenever the row does, None if it does not exist"""
+        record = self._rows.get(feature_id)
+        if record is None:
+            return None
+        return f"{self._epoch}-{record.version}"
+
+    def attach_journal(self, journal: "Journal") -> None:
+        """Journal every later mutation"""
+        with self._lock:
+            self._journal = journal
+
+    def replay(self, record: Dict[str, Any]) -> None:
+        """Re-apply a journaled mutation without journaling it again"""
+        with self._lock:
+            op = record["op"]
+            if op == "insert":
+                for row in record["rows"]:
+                    self._load(row)
+            elif op == "update":
+                for feature_id, changes in record["updates"]:
+                    self._update(feature_id, changes)
+            elif op == "delete":
+                for feature_id in record["ids"]:
+                    self._delete(feature_id)
+            elif op == "votes":
+                self._apply_votes(record["deltas"])
+            else:
+                raise ValueError(f"Unknown journal operation: {op}")
+
+    def checkpoint(self) -> Tuple[List[FeatureRecord], int, Any]:
+        """Consistent rows snapshot plus the journal position it covers"""
+        with self._lock:
+            marker = self._journal.rotate() if self._journal is not None else None
+            return list(self._rows.values()), self._last_id, marker
+
+    def close(self) -> None:
+        """Flush and close the journal, if any"""
+        if self._journal is not None:
+            self._journal.close()
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        """Rows with the most votes, ties broken by id"""
+        with self._lock:
+            return [self._rows[i].to_dict() for _, i in self._by_votes[:n]]
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Snapshot of all rows in id order"""
+        with self._lock:
+            records = list(self._rows.values())
+        return [record.to_dict() for record in records]
+
+    def _price_ids(
+        self,
+        price: PriceRange,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Sorted ids greater than `after` of rows whose price lies in the range
+
+        The price index is ordered by price, so the range is one bisected
+        slice but its ids are unordered. With a limit only the `limit`
+        smallest ids are kept in a bounded heap: a page costs O(k log limit)
+        for k rows in the range rather than sorting all k, though the scan
+        of the range stays linear in k.
+        """
+        with self._lock:
+            index = self._by_price
+            if price.low is None:
+                start = 0
+            elif price.include_low:
+                start = bisect.bisect_left(index, (price.low, _ID_MIN))
+            else:
+                start = bisect.bisect_right(index, (price.low, _ID_MAX))
+
+            if price.high is None:
+                end = len(index)
+            elif price.include_high:
+                end = bisect.bisect_right(index, (price.high, _ID_MAX))
+            else:
+                end = bisect.bisect_left(index, (price.high, _ID_MIN))
+
+            ids = (index[pos][1] for pos in range(start, end))
+            if after is not None:
+                ids = (feature_id for feature_id in ids if feature_id > after)
+            if limit is None:
+                return sorted(ids)
+            return heapq.nsmallest(limit, ids)
+
+    def _select_records(
+        self,
+        price: Optional[PriceRange],
+        after: Optional[int],
+        limit: Optional[int],
+    ) -> List[FeatureRecord]:
+        with self._lock:
+            if price is not None:
+                return [self._rows[i] for i in self._price_ids(price, after, limit)]
+
+            ids = self._ids
+            start = 0 if after is None else bisect.bisect_right(ids, after)
+            page = []
+            for pos in range(start, len(ids)):
+                record = self._rows.get(ids[pos])
+                if record is None:
+                    continue
+                page.append(record)
+                if len(page) == limit:
+                    break
+            return page
+
+    def select(
+        self,
+        price: Optional[PriceRange] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page of rows with id greater than `after`, in id order"""
+        return [
+            record.to_dict() for record in self._select_records(price, after, limit)
+        ]
+
+    def get_escaped(self, feature_id: int) -> Optional[Dict[str, Any]]:
+        """Response-ready row with pre-escaped strings; needs escape_once"""
+        record = self._rows.get(feature_id)
+        return None if record is None else record.to_escaped_dict()
+
+    def select_escaped(
+        self,
+        price: Optional[PriceRange] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page like select, as response-ready rows; needs escape_once"""
+        records = self._select_records(price, after, limit)
+        return [record.to_escaped_dict() for record in records]
+
+    def iter_batches(
+        self,
+        price: Optional[PriceRange] = None,
+        after: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield rows in id order, taking the lock only per batch
+
+        With a price filter the ids in range are sorted once per stream,
+        O(k log k) for k matching rows, then served in batches.
+        """
+        if price is None:
+            yield from super().iter_batches(price, after, batch_size)
+            return
+
+        ids = self._price_ids(price, after)
+        for start in range(0, len(ids), batch_size):
+            with self._lock:
+                batch = [
+                    self._rows[i]
+                    for i in ids[start : start + batch_size]
+                    if i in self._rows
+                ]
+            if batch:
+                yield [record.to_dict() for record in batch]
+
+
+def _remove_sorted(index: List[Tuple[Any, int]], key: Tuple[Any, int]) -> None:
+    """Remove key from a sorted index if present; O(log n) search, O(n) shift"""
+    pos = bisect.bisect_left(index, key)
+    if pos < len(index) and index[pos] == key:
+        del index[pos]
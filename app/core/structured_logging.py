@@ -0,0 +1,323 @@
+"""JSON-lines logging through a bounded queue and a background writer
+
+Request threads only interpolate the message and enqueue the record.
+Masking (data_masking), JSON encoding and file writes happen in one
+writer thread, in batches. When the queue fills up, records are sampled
+and then dropped rather than blocking the request.
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from typing import IO, Any, Dict, List, Optional
+
+from app.core.correlation import CorrelationIdFilter
+from app.core.data_masking import (
+    mask_sensitive_data,
+    sanitize_dict_for_logging,
+    sanitize_error_detail,
+)
+from app.core.json_codec import get_json_codec
+from app.core.log_segments import SEGMENT_BYTES, SEGMENT_SECONDS, SegmentedLogWriter
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+REPORT_INTERVAL = 10.0
+IDLE_FLUSH = 1.0
+_STOP = object()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One masked JSON object per record, in the logs/app.log layout
+
+    A dict passed as `extra={"data": ...}` is added under "data" after
+    sanitize_dict_for_logging; exceptions go under "exception".
+    """
+
+    def __init__(self):
+        super().__init__(datefmt=TIMESTAMP_FORMAT)
+        self._codec = get_json_codec()
+
+    def to_dict(self, record: logging.LogRecord) -> Dict[str, Any]:
+        """Masked fields of a record"""
+        entry = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": mask_sensitive_data(record.getMessage()),
+            "correlation_id": getattr(record, "correlation_id", None) or "-",
+            "module": record.module,
+            "function": record.funcName,
+        }
+        data = getattr(record, "data", None)
+        if isinstance(data, dict):
+            entry["data"] = sanitize_dict_for_logging(data)
+        if record.exc_info:
+            entry["exception"] = sanitize_error_detail(
+                self.formatException(record.exc_info)
+            )
+        elif record.exc_text:
+            entry["exception"] = sanitize_error_detail(record.exc_text)
+        return entry
+
+    def encode(self, record: logging.LogRecord) -> bytes:
+        """Record as one UTF-8 JSON line without the newline"""
+        entry = self.to_dict(record)
+        try:
+            return self._codec.dumps(entry)
+        except (TypeError, ValueError):
+            return json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8")
+
+    def format(self, record: logging.LogRecord) -> str:
+        return self.encode(record).decode("utf-8")
+
+
+class AsyncBatchHandler(logging.Handler):
+    """Queue records and write them as JSON lines from a background thread
+
+    Once the queue is `sample_above` full, only every `sample_every`-th
+    record below WARNING is kept; when it is completely full new records
+    are dropped. Both are counted in metrics(), and the writer adds a
+    WARNING line with the metrics to the log, at most every
+    `report_interval` seconds, while records are being lost.
+    """
+
+    def __init__(
+        self,
+        sink: IO[bytes],
+        queue_size: int = 10000,
+        batch_size: int = 512,
+        sample_above: float = 0.8,
+        sample_every: int = 10,
+        close_sink: bool = False,
+        report_interval: float = REPORT_INTERVAL,
+        idle_flush: float = IDLE_FLUSH,
+    ):
+        super().__init__()
+        self.setFormatter(JsonLineFormatter())
+        self.addFilter(CorrelationIdFilter())
+        self._sink = sink
+        self._close_sink = close_sink
+        self._idle_flush = idle_flush
+        self._queue: "queue.Queue[Any]" = queue.Queue(queue_size)
+        self._batch_size = batch_size
+        self._sample_depth = max(1, int(queue_size * sample_above))
+        self._sample_every = max(1, sample_every)
+        self._counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "sampled_out": 0,
+            "batches": 0,
+            "write_errors": 0,
+            "max_queue_depth": 0,
+        }
+        self._sampled = 0
+        self._report_interval = report_interval
+        self._reported_lost = 0
+        self._reported_at = float("-inf")
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Enqueue a record without blocking; never raises
+
+        Runs under the handler lock, so the counters need no lock of their own.
+        """
+        try:
+            # Args may be mutated by the caller once we return
+            if record.args:
+                record.msg = record.getMessage()
+                record.args = None
+            depth = self._queue.qsize()
+            counters = self._counters
+            if depth > counters["max_queue_depth"]:
+                counters["max_queue_depth"] = depth
+            if depth >= self._sample_depth and record.levelno < logging.WARNING:
+                self._sampled += 1
+                if self._sampled % self._sample_every:
+                    counters["sampled_out"] += 1
+                    return
+            self._queue.put_nowait(record)
+            counters["enqueued"] += 1
+        except queue.Full:
+            self._counters["dropped"] += 1
+        except Exception:
+            self.handleError(record)
+
+    def metrics(self) -> Dict[str, int]:
+        """Counters plus the current queue depth"""
+        return {**self._counters, "queue_depth": self._queue.qsize()}
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything enqueued so far is written"""
+        if not self._thread.is_alive():
+            return False
+        written = threading.Event()
+        try:
+            self._queue.put(written, timeout=timeout)
+        except queue.Full:
+            return False
+        return written.wait(timeout)
+
+    def close(self) -> None:
+        """Write what is queued, stop the writer and release the sink"""
+        if self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=5)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=10)
+        if self._close_sink:
+            self._sink.close()
+        super().close()
+
+    def _run(self) -> None:
+        formatter: JsonLineFormatter = self.formatter  # type: ignore[assignment]
+        stopping = False
+        while not stopping:
+            # Whatever queued up while the last batch was written is the next
+            try:
+                item = self._queue.get(timeout=self._idle_flush)
+            except queue.Empty:
+                # Lets buffering sinks write out what they hold
+                self._flush_sink()
+                continue
+            batch: List[logging.LogRecord] = []
+            flushed: List[threading.Event] = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    flushed.append(item)
+                else:
+                    batch.append(item)
+                if stopping or flushed or len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(formatter, batch)
+            self._report_losses(formatter)
+            for event in flushed:
+                event.set()
+
+    def _write(self, formatter: "JsonLineFormatter", batch: List[logging.LogRecord]):
+        lines = []
+        failed = 0
+        for record in batch:
+            try:
+                lines.append(formatter.encode(record))
+            except Exception:
+                failed += 1
+        try:
+            if lines:
+                self._sink.write(b"\n".join(lines) + b"\n")
+                self._sink.flush()
+            written = len(lines)
+        except Exception:
+            written, failed = 0, len(batch)
+        # Only this thread updates these counters
+        self._counters["written"] += written
+        self._counters["write_errors"] += failed
+        self._counters["batches"] += 1
+
+    def _flush_sink(self) -> None:
+        try:
+            self._sink.flush()
+        except Exception:
+            self._counters["write_errors"] += 1
+
+    def _report_losses(self, formatter: "JsonLineFormatter") -> None:
+        lost = self._counters["dropped"] + self._counters["sampled_out"]
+        now = time.monotonic()
+        if (
+            lost == self._reported_lost
+            or now - self._reported_at < self._report_interval
+        ):
+            return
+        self._reported_lost, self._reported_at = lost, now
+        record = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0, "Log queue overflow", None, None
+        )
+        record.funcName = "_report_losses"
+        record.data = self.metrics()
+        self._write(formatter, [record])
+
+
+_HANDLER: Optional[AsyncBatchHandler] = None
+
+
+def configure_logging(
+    path: Optional[str] = None, level: Optional[str] = None
+) -> AsyncBatchHandler:
+    """Send root logging as JSON lines through AsyncBatchHandler
+
+    Defaults come from LOG_FILE (- for stdout), LOG_LEVEL (info) and
+    LOG_QUEUE_SIZE (10000). A LOG_FILE that cannot be opened, e.g. on a
+    read-only root filesystem, logs to stdout instead. With
+    LOG_SEGMENT_DIR set, logs go to compressed, indexed segments there
+    (rotated after LOG_SEGMENT_BYTES or LOG_SEGMENT_SECONDS) instead of
+    LOG_FILE. Calling it again returns the installed handler.
+    """
+    global _HANDLER
+    if _HANDLER is not None:
+        return _HANDLER
+    segment_dir = None if path else os.getenv("LOG_SEGMENT_DIR")
+    path = path or os.getenv("LOG_FILE", "-")
+    sink, error = sys.stdout.buffer, None
+    if segment_dir:
+        try:
+            sink = SegmentedLogWriter(
+                segment_dir,
+                segment_bytes=int(os.getenv("LOG_SEGMENT_BYTES", str(SEGMENT_BYTES))),
+                segment_seconds=float(
+                    os.getenv("LOG_SEGMENT_SECONDS", str(SEGMENT_SECONDS))
+                ),
+            )
+        except OSError as e:
+            error = e
+    elif path != "-":
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            sink = open(path, "ab")
+        except OSError as e:
+            error = e
+    handler = AsyncBatchHandler(
+        sink,
+        queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        close_sink=sink is not sys.stdout.buffer,
+    )
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel((level or os.getenv("LOG_LEVEL", "info")).upper())
+    _HANDLER = handler
+    if error is not None:
+        logging.getLogger(__name__).warning(
+            f"Cannot open log file, logging to stdout: {error.strerror}"
+        )
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Detach and close the handler installed by configure_logging"""
+    global _HANDLER
+    if _HANDLER is None:
+        return
+    logging.getLogger().removeHandler(_HANDLER)
+    _HANDLER.close()
+    _HANDLER = None
+
+
+def get_logging_metrics() -> Optional[Dict[str, int]]:
+    """Metrics of the installed handler, None if logging is not configured"""
+    return None if _HANDLER is None else _HANDLER.metrics()
@@ -0,0 +1,128 @@
+"""Striped vote counters with batched write-back"""
+
+import logging
+import threading
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional
+
+from app.repositories.base import FeatureRepository
+
+logger = logging.getLogger(__name__)
+
+
+class _Stripe:
+    """Pending vote deltas for the feature ids hashed to one lock"""
+
+    __slots__ = ("lock", "pending", "count")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending: Dict[int, int] = {}
+        self.count = 0
+
+
+class VoteBuffer:
+    """Coalesce vote increments and fold them into the repository in batches
+
+    Reads that flush first see every vote buffered in this process only.
+    With several workers sharing one SQL database, votes still buffered in
+    another worker stay invisible until that worker flushes, i.e. for up
+    to its flush interval or batch size.
+    """
+
+    def __init__(
+        self,
+        repository: FeatureRepository,
+        stripes: int = 16,
+        batch_size: int = 256,
+    ):
+        self._repository = repository
+        self._stripes: List[_Stripe] = [_Stripe() for _ in range(stripes)]
+        self._batch_size = batch_size
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stripe(self, feature_id: int) -> _Stripe:
+        return self._stripes[feature_id % len(self._stripes)]
+
+    def vote(self, feature_id: int, delta: int = 1) -> Optional[Dict[str, Any]]:
+        """Add votes to a feature, returns the row with the new count or None"""
+        stripe = self._stripe(feature_id)
+        with stripe.lock:
+            row = self._repository.get(feature_id)
+            if row is None:
+                return None
+
+            pending = stripe.pending.get(feature_id, 0) + delta
+            stripe.pending[feature_id] = pending
+            stripe.count += 1
+            self._dirty = True
+
+            if stripe.count >= self._batch_size:
+                self._flush_stripe(stripe)
+                row = self._repository.get(feature_id)
+                pending = 0
+
+            if row is None:
+                return None
+            return {**row, "votes": row["votes"] + pending}
+
+    def _flush_stripe(self, stripe: _Stripe) -> None:
+        """Apply one stripe's deltas; caller holds the stripe lock"""
+        if not stripe.pending:
+            return
+        pending, stripe.pending, stripe.count = stripe.pending, {}, 0
+        self._repository.apply_votes(pending)
+
+    def has_pending(self, feature_id: int) -> bool:
+        """Whether a feature has votes not yet written to the repository"""
+        stripe = self._stripe(feature_id)
+        with stripe.lock:
+            return feature_id in stripe.pending
+
+    def flush(self) -> None:
+        """Write all pending votes to the repository in one apply_votes call
+
+        Every stripe lock is held until the batch is applied, so voters and
+        has_pending() never observe deltas taken out of a stripe but not yet
+        in the repository.
+        """
+        if not self._dirty:
+            return
+        with ExitStack() as locks:
+            for stripe in self._stripes:
+                locks.enter_context(stripe.lock)
+            self._dirty = False
+            pending: Dict[int, int] = {}
+            for stripe in self._stripes:
+                if stripe.pending:
+                    pending.update(stripe.pending)
+                    stripe.pending, stripe.count = {}, 0
+            if pending:
+                self._repository.apply_votes(pending)
+
+    def start(self, interval: float = 1.0) -> None:
+        """Flush periodically from a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="vote-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and flush what is left"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Vote flush failed: {type(e).__name__}")
@@ -1,12 +1,21 @@
 """XSS protection utilities (S06-03)"""
 
 import html
-from typing import Any, Dict, List, Union
+import json
+from json.encoder import INFINITY, _make_iterencode, c_make_encoder, encode_basestring
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+# Types sanitization never changes; skipped without further checks
+_SCALARS = frozenset((int, float, bool, type(None)))
 
 
 def escape_html(text: str) -> str:
     """Escape HTML special characters to prevent XSS"""
-    return html.escape(text, quote=True)
+    # Plain substring checks beat both a regex and html.escape itself on clean
+    # text, which is returned without allocating a new string
+    if "&" in text or "<" in text or ">" in text or '"' in text or "'" in text:
+        return html.escape(text, quote=True)
+    return text
 
 
 def sanitize_string(value: Any) -> str:
@@ -16,45 +25,198 @@ def sanitize_string(value: Any) -> str:
     return escape_html(str(value))
 
 
+def _sanitize_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return escape_html(value)
+    if isinstance(value, dict):
+        return sanitize_dict(value)
+    if isinstance(value, (list, tuple)):
+        return sanitize_list(value)
+    return value
+
+
 def sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Recursively sanitize dictionary values"""
-    sanitized = {}
+    """Recursively sanitize dictionary values
+
+    Copy-on-write: `data` itself is returned when nothing needed escaping.
+    """
+    sanitized = None
     for key, value in data.items():
-        if isinstance(value, str):
-            sanitized[key] = escape_html(value)
-        elif isinstance(value, dict):
-            sanitized[key] = sanitize_dict(value)
-        elif isinstance(value, list):
-            sanitized[key] = sanitize_list(value)
-        else:
-            sanitized[key] = value
-    return sanitized
+        if value.__class__ in _SCALARS:
+            continue
+        clean = _sanitize_value(value)
+        if clean is not value:
+            if sanitized is None:
+                sanitized = dict(data)
+            sanitized[key] = clean
+    return data if sanitized is None else sanitized
 
 
-def sanitize_list(data: List[Any]) -> List[Any]:
-    """Recursively sanitize list values"""
-    sanitized = []
-    for item in data:
-        if isinstance(item, str):
-            sanitized.append(escape_html(item))
-        elif isinstance(item, dict):
-            sanitized.append(sanitize_dict(item))
-        elif isinstance(item, list):
-            sanitized.append(sanitize_list(item))
-        else:
-            sanitized.append(item)
-    return sanitized
+def sanitize_list(data: Sequence[Any]) -> Sequence[Any]:
+    """Recursively sanitize list or tuple values
+
+    Copy-on-write: `data` itself is returned when nothing needed escaping,
+    otherwise a list (JSON encodes tuples as arrays anyway).
+    """
+    sanitized = None
+    for index, item in enumerate(data):
+        if item.__class__ in _SCALARS:
+            continue
+        clean = _sanitize_value(item)
+        if clean is not item:
+            if sanitized is None:
+                sanitized = list(data)
+            sanitized[index] = clean
+    return data if sanitized is None else sanitized
+
+
+def sanitize_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sanitize a batch of row dicts, copy-on-write per row and for the list"""
+    sanitized = None
+    for index, row in enumerate(records):
+        clean = sanitize_dict(row)
+        if clean is not row:
+            if sanitized is None:
+                sanitized = list(records)
+            sanitized[index] = clean
+    return records if sanitized is None else sanitized
 
 
 def sanitize_response_data(
     data: Union[Dict, List, str, Any],
 ) -> Union[Dict, List, str, Any]:
-    """Sanitize response data to prevent XSS in JSON responses"""
-    if isinstance(data, dict):
-        return sanitize_dict(data)
-    elif isinstance(data, list):
-        return sanitize_list(data)
-    elif isinstance(data, str):
-        return escape_html(data)
-    else:
-        return data
+    """Sanitize response data to prevent XSS in JSON responses
+
+    Containers are copied only where a value changes; clean data is returned
+    as is.
+    """
+    return _sanitize_value(data)
+
+
+def sanitizing_default(default: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a JSON encoder `default` hook so what it returns is sanitized too"""
+
+    def sanitized(value: Any) -> Any:
+        return _sanitize_value(default(value))
+
+    return sanitized
+
+
+def _encode_escaped(value: str) -> str:
+    return encode_basestring(escape_html(value))
+
+
+def _has_unsafe_key(value: Any) -> bool:
+    """Whether any object key in value would change under HTML escaping"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(key, str) and escape_html(key) is not key:
+                return True
+            if _has_unsafe_key(item):
+                return True
+    elif isinstance(value, (list, tuple)):
+        return any(_has_unsafe_key(item) for item in value)
+    return False
+
+
+class SanitizingJSONEncoder(json.JSONEncoder):
+    """JSON encoder that HTML-escapes string values while serializing
+
+    Produces the same document as json.dumps(sanitize_response_data(data)),
+    so object keys are written as they are. The C encoder escapes keys and
+    values with one function; in the rare document where a key needed it,
+    the data is sanitized first and encoded again.
+    """
+
+    def __init__(self, **kwargs: Any):
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("allow_nan", False)
+        kwargs.setdefault("separators", (",", ":"))
+        super().__init__(**kwargs)
+
+    def encode(self, o: Any) -> str:
+        if isinstance(o, str):
+            return _encode_escaped(o)
+        escaped = False
+
+        def encode_string(value: str) -> str:
+            nonlocal escaped
+            clean = escape_html(value)
+            if clean is not value:
+                escaped = True
+            return encode_basestring(clean)
+
+        text = "".join(self._iterencode(o, encode_string, self.default, True))
+        if escaped and _has_unsafe_key(o):
+            sanitized = sanitize_response_data(o)
+            default = sanitizing_default(self.default)
+            return "".join(
+                self._iterencode(sanitized, encode_basestring, default, True)
+            )
+        return text
+
+    def iterencode(self, o: Any, _one_shot: bool = False):
+        yield self.encode(o)
+
+    def _iterencode(
+        self,
+        o: Any,
+        encode_string: Callable[[str], str],
+        default: Callable[[Any], Any],
+        _one_shot: bool = False,
+    ):
+        markers = {} if self.check_circular else None
+
+        def floatstr(
+            o: float,
+            allow_nan: bool = self.allow_nan,
+            _repr=float.__repr__,
+        ) -> str:
+            if o != o:
+                text = "NaN"
+            elif o == INFINITY:
+                text = "Infinity"
+            elif o == -INFINITY:
+                text = "-Infinity"
+            else:
+                return _repr(o)
+            if not allow_nan:
+                raise ValueError(
+                    "Out of range float values are not JSON compliant: " + repr(o)
+                )
+            return text
+
+        if _one_shot and c_make_encoder is not None and self.indent is None:
+            _iterencode = c_make_encoder(
+                markers,
+                default,
+                encode_string,
+                self.indent,
+                self.key_separator,
+                self.item_separator,
+                self.sort_keys,
+                self.skipkeys,
+                self.allow_nan,
+            )
+        else:
+            _iterencode = _make_iterencode(
+                markers,
+                default,
+                encode_string,
+                self.indent,
+                floatstr,
+                self.key_separator,
+                self.item_separator,
+                self.sort_keys,
+                self.skipkeys,
+                _one_shot,
+            )
+        return _iterencode(o, 0)
+
+
+_SANITIZING_ENCODER = SanitizingJSONEncoder()
+
+
+def dumps_sanitized(data: Any) -> str:
+    """Compact JSON for data with every string HTML-escaped"""
+    return _SANITIZING_ENCODER.encode(data)
@@ -1,34 +1,57 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 
 from app.api.features import router as features_router
+from app.core.config import get_feature_store, get_vote_buffer
+from app.core.correlation import install_correlation_filter
 from app.core.exceptions import (
     ApiError,
     api_error_handler,
     http_exception_handler,
+    unhandled_exception_handler,
     validation_exception_handler,
 )
-from app.middleware.correlation import CorrelationMiddleware
-from app.middleware.security_headers import SecurityHeadersMiddleware
-from app.middleware.xss_sanitizer import XSSSanitizerMiddleware
+from app.core.responses import SanitizedJSONResponse
+from app.core.structured_logging import (
+    configure_logging,
+    get_logging_metrics,
+    shutdown_logging,
+)
+from app.middleware.security import SecurityMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background vote flushing and log writing for the lifetime of the app"""
+    configure_logging()
+    install_correlation_filter()
+    get_vote_buffer().start()
+    yield
+    get_vote_buffer().stop()
+    get_feature_store().close()
+    shutdown_logging()
+
 
 app = FastAPI(
     title="Feature Votes API",
     description="API для голосования за фичи",
+    lifespan=lifespan,
+    default_response_class=SanitizedJSONResponse,
 )
 
-app.add_middleware(CorrelationMiddleware)
-app.add_middleware(XSSSanitizerMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(SecurityMiddleware)
 
 app.add_exception_handler(ApiError, api_error_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_exception_handler(Exception, unhandled_exception_handler)
 
 app.include_router(features_router)
 
 
 @app.get("/health")
 def health():
-    """Health check endpoint"""
-    return {"status": "ok"}
+    """Health check endpoint with log queue metrics"""
+    return {"status": "ok", "logging": get_logging_metrics()}
@@ -1,19 +1,60 @@
 """Correlation ID middleware for request tracing (ADR-001)"""
 
-import uuid
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.correlation import (
+    new_correlation_id,
+    reset_correlation_id,
+    set_correlation_id,
+    valid_correlation_id,
+)
 
+CORRELATION_HEADER = b"x-correlation-id"
 
-class CorrelationMiddleware(BaseHTTPMiddleware):
+
+def assign_correlation_id(scope: Scope) -> str:
+    """Pick the request's correlation ID and store it in request state
+
+    A valid incoming X-Correlation-ID is kept, otherwise a new one is generated.
+    """
+    incoming = None
+    for name, value in scope.get("headers", ()):
+        if name == CORRELATION_HEADER:
+            incoming = valid_correlation_id(value.decode("latin-1"))
+            break
+    correlation_id = incoming or new_correlation_id()
+    scope.setdefault("state", {})["correlation_id"] = correlation_id
+    return correlation_id
+
+
+def _set_header(message: Message, name: bytes, value: bytes) -> None:
+    """Replace a header on an http.response.start message"""
+    headers = [(k, v) for k, v in message.get("headers", ()) if k.lower() != name]
+    headers.append((name, value))
+    message["headers"] = headers
+
+
+class CorrelationMiddleware:
     """Middleware to add correlation ID to requests"""
 
-    async def dispatch(self, request: Request, call_next):
-        request.state.correlation_id = str(uuid.uuid4())
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        response = await call_next(request)
+        correlation_id = assign_correlation_id(scope)
+        header_value = correlation_id.encode()
 
-        response.headers["X-Correlation-ID"] = request.state.correlation_id
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                _set_header(message, CORRELATION_HEADER, header_value)
+            await send(message)
 
-        return response
+        token = set_correlation_id(correlation_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            reset_correlation_id(token)
@@ -0,0 +1,60 @@
+"""Fused correlation, security headers and XSS sanitization middleware
+
+One pure-ASGI layer doing the work of CorrelationMiddleware,
+SecurityHeadersMiddleware and XSSSanitizerMiddleware in a single pass over
+the send channel, without a task or stream wrapper per request.
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.correlation import reset_correlation_id, set_correlation_id
+from app.core.security_headers import security_headers
+from app.middleware.correlation import CORRELATION_HEADER, assign_correlation_id
+from app.middleware.xss_sanitizer import SanitizingSend
+
+
+class SecurityMiddleware:
+    """Correlation IDs, security headers and JSON body sanitization"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        correlation: bool = True,
+        headers: bool = True,
+        sanitize: bool = True,
+    ):
+        self.app = app
+        self.correlation = correlation
+        self.headers = headers
+        self.sanitize = sanitize
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = None
+        if self.correlation:
+            correlation_id = assign_correlation_id(scope)
+            header_value = correlation_id.encode()
+        block = security_headers(scope.get("scheme", "http")) if self.headers else ()
+        forward = SanitizingSend(scope, send) if self.sanitize else send
+
+        async def send_secured(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", ())
+                if correlation_id is not None:
+                    # Error handlers set the same ID; replace rather than repeat it
+                    headers = [(k, v) for k, v in headers if k != CORRELATION_HEADER]
+                    headers.append((CORRELATION_HEADER, header_value))
+                message["headers"] = [*headers, *block]
+            await forward(message)
+
+        if correlation_id is None:
+            await self.app(scope, receive, send_secured)
+            return
+        token = set_correlation_id(correlation_id)
+        try:
+            await self.app(scope, receive, send_secured)
+        finally:
+            reset_correlation_id(token)
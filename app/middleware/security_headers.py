@@ -1,36 +1,35 @@
 """Security headers middleware (S06-06)"""
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.security_headers import RawHeaders, security_headers
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all HTTP responses"""
 
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
+def append_headers(message: Message, block: RawHeaders) -> None:
+    """Append a header block to an http.response.start message
 
-        response.headers["X-Frame-Options"] = "DENY"
+    The block is appended as is, without looking for existing headers of the
+    same name, so endpoints must not set security headers themselves.
+    """
+    message["headers"] = [*message.get("headers", ()), *block]
 
-        response.headers["X-Content-Type-Options"] = "nosniff"
 
-        response.headers["X-XSS-Protection"] = "1; mode=block"
+class SecurityHeadersMiddleware:
+    """Add security headers to all HTTP responses"""
 
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        csp_policy = (
-            "default-src 'self'; script-src 'none'; style-src 'none'; "
-            "img-src 'self' data:; font-src 'self'; connect-src 'self';"
-        )
-        response.headers["Content-Security-Policy"] = csp_policy
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        if request.url.scheme == "https":
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains"
-            )
+        block = security_headers(scope.get("scheme", "http"))
 
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), microphone=(), camera=(), payment=()"
-        )
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                append_headers(message, block)
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_headers)
@@ -1,47 +1,104 @@
 """XSS sanitization middleware (S06-03)
 
-Note: FastAPI serializes Pydantic models automatically, so we need to intercept
-at the response level. This middleware works with JSONResponse by reading
-the rendered body and sanitizing it.
+The app renders through SanitizedJSONResponse, which escapes strings while
+serializing and flags the request state with `xss_sanitized`; flagged
+responses pass through as is. Any other single-message JSON body is decoded
+and re-encoded with escaping, and its Content-Length recomputed. Streamed
+bodies are not buffered.
 """
 
 import json
+import re
+from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.xss_protection import sanitize_response_data
+from app.core.json_codec import get_json_codec
 
+JSON_MEDIA_TYPES = (b"application/json", b"application/problem+json")
 
-class XSSSanitizerMiddleware(BaseHTTPMiddleware):
+
+def already_sanitized(scope: Scope) -> bool:
+    """Whether the endpoint marked its response body as sanitized"""
+    return bool(scope.get("state", {}).get("xss_sanitized"))
+
+
+def is_json(message: Message) -> bool:
+    """Whether an http.response.start message declares a JSON body"""
+    for name, value in message.get("headers", ()):
+        if name.lower() == b"content-type":
+            return value.split(b";", 1)[0].strip().lower() in JSON_MEDIA_TYPES
+    return False
+
+
+# A decoded JSON string can only contain a character that needs escaping if
+# the raw body has it literally or behind a \" or \u escape
+_may_need_escape = re.compile(rb"[<>&']|\\[\"u]").search
+
+
+def sanitize_body(body: bytes) -> Optional[bytes]:
+    """Sanitized copy of a JSON body, None if it is not valid JSON
+
+    Bodies that cannot contain anything to escape are returned unparsed.
+    """
+    if _may_need_escape(body) is None:
+        return body
+    try:
+        data = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return get_json_codec().dumps_sanitized(data)
+
+
+def with_content_length(message: Message, length: int) -> Message:
+    """Copy of a start message with its Content-Length replaced"""
+    headers = [
+        (k, v) for k, v in message.get("headers", ()) if k.lower() != b"content-length"
+    ]
+    headers.append((b"content-length", str(length).encode()))
+    return {**message, "headers": headers}
+
+
+class SanitizingSend:
+    """ASGI send wrapper that sanitizes single-message JSON bodies
+
+    The start message of a JSON response is held back until its body
+    arrives, so Content-Length can be replaced once the body is escaped.
+    """
+
+    __slots__ = ("_scope", "_send", "_start")
+
+    def __init__(self, scope: Scope, send: Send):
+        self._scope = scope
+        self._send = send
+        self._start: Optional[Message] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if is_json(message) and not already_sanitized(self._scope):
+                self._start = message
+                return
+        elif message["type"] == "http.response.body" and self._start is not None:
+            held, self._start = self._start, None
+            body = message.get("body", b"")
+            if body and not message.get("more_body", False):
+                sanitized = sanitize_body(body)
+                if sanitized is not None:
+                    await self._send(with_content_length(held, len(sanitized)))
+                    await self._send({**message, "body": sanitized})
+                    return
+            await self._send(held)
+        await self._send(message)
+
+
+class XSSSanitizerMiddleware:
     """Sanitize JSON responses to prevent XSS attacks"""
 
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-
-        if isinstance(response, JSONResponse):
-            try:
-                await response.render()
-
-                if hasattr(response, "body") and response.body:
-                    body_str = response.body.decode("utf-8")
-                    data = json.loads(body_str)
-
-                    sanitized_data = sanitize_response_data(data)
-
-                    return JSONResponse(
-                        content=sanitized_data,
-                        status_code=response.status_code,
-                        headers=dict(response.headers),
-                        media_type=response.media_type,
-                    )
-            except (
-                json.JSONDecodeError,
-                UnicodeDecodeError,
-                AttributeError,
-                TypeError,
-            ):
-                pass
-
-        return response
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, SanitizingSend(scope, send))
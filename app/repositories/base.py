@@ -0,0 +1,130 @@
+"""Feature repository interface"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+FEATURE_COLUMNS = (
+    "id",
+    "user_id",
+    "title",
+    "link",
+    "price_estimate",
+    "votes",
+    "created_at",
+    "updated_at",
+)
+
+
+class PriceRange(NamedTuple):
+    """Price interval; a bound of None means unbounded"""
+
+    low: Optional[float] = None
+    high: Optional[float] = None
+    include_low: bool = True
+    include_high: bool = True
+
+    def intersect(self, other: "PriceRange") -> "PriceRange":
+        """Narrowest range satisfying both intervals"""
+        low, include_low = self.low, self.include_low
+        if other.low is not None and (low is None or other.low >= low):
+            if low is not None and other.low == low:
+                include_low = include_low and other.include_low
+            else:
+                include_low = other.include_low
+            low = other.low
+
+        high, include_high = self.high, self.include_high
+        if other.high is not None and (high is None or other.high <= high):
+            if high is not None and other.high == high:
+                include_high = include_high and other.include_high
+            else:
+                include_high = other.include_high
+            high = other.high
+
+        return PriceRange(low, high, include_low, include_high)
+
+
+class FeatureRepository(ABC):
+    """Storage backend for feature rows"""
+
+    # Backends that HTML-escape on write also provide get_escaped/select_escaped
+    escape_once = False
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored rows"""
+
+    @abstractmethod
+    def insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new row and assign it an id"""
+
+    @abstractmethod
+    def insert_many(self, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store several rows in one transaction"""
+
+    @abstractmethod
+    def get(self, feature_id: int) -> Optional[Dict[str, Any]]:
+        """Get row by id"""
+
+    @abstractmethod
+    def update(
+        self, feature_id: int, changes: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Apply field changes to a row, returns None if it does not exist"""
+
+    @abstractmethod
+    def update_many(
+        self, updates: Sequence[Tuple[int, Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Apply several updates in one transaction; None marks a missing row"""
+
+    @abstractmethod
+    def delete(self, feature_id: int) -> bool:
+        """Remove row by id, returns False if it does not exist"""
+
+    @abstractmethod
+    def delete_many(self, feature_ids: Sequence[int]) -> List[bool]:
+        """Remove several rows in one transaction"""
+
+    @abstractmethod
+    def select(
+        self,
+        price: Optional[PriceRange] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page of rows with id greater than `after`, in id order"""
+
+    @abstractmethod
+    def apply_votes(self, deltas: Dict[int, int]) -> None:
+        """Atomically add vote deltas; unknown ids are ignored"""
+
+    @abstractmethod
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        """Rows with the most votes, ties broken by id"""
+
+    def iter_batches(
+        self,
+        price: Optional[PriceRange] = None,
+        after: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield rows in id order, one keyset page at a time"""
+        while True:
+            batch = self.select(price, after, batch_size)
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            after = batch[-1]["id"]
+
+    def version(self) -> Optional[str]:
+        """Token that changes on every mutation, None if the backend cannot track it"""
+        return None
+
+    def row_version(self, feature_id: int) -> Optional[str]:
+        """Token that changes whenever the row does, None if untracked or missing"""
+        return None
+
+    def close(self) -> None:
+        """Release backend resources"""
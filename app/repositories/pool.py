@@ -0,0 +1,75 @@
+"""Bounded DB-API connection pool"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List
+
+from app.core.exceptions import ApiError
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """Thread-safe pool that never opens more than `max_size` connections"""
+
+    def __init__(
+        self, connect: Callable[[], Any], max_size: int = 10, timeout: float = 30.0
+    ):
+        if max_size < 1:
+            raise ValueError("Pool size must be positive")
+        self._connect = connect
+        self._timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        self.max_size = max_size
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection; commits on success and rolls back on error"""
+        if not self._slots.acquire(timeout=self._timeout):
+            raise ApiError(
+                code="service-unavailable",
+                message="Database connection pool exhausted",
+                status=503,
+            )
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                self._discard_on_failure(conn)
+                raise
+
+            with self._lock:
+                self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def _discard_on_failure(self, conn: Any) -> None:
+        """Roll back, keeping the connection only if it is still usable"""
+        try:
+            conn.rollback()
+        except Exception as e:
+            logger.warning(f"Dropping broken database connection: {type(e).__name__}")
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+
+        with self._lock:
+            self._idle.append(conn)
+
+    def close(self) -> None:
+        """Close idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
@@ -0,0 +1,293 @@
+"""SQL feature repositories (PostgreSQL, SQLite)"""
+
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.repositories.base import FEATURE_COLUMNS, FeatureRepository, PriceRange
+from app.repositories.pool import ConnectionPool
+
+_COLUMNS = ", ".join(FEATURE_COLUMNS)
+_INSERT_COLUMNS = tuple(c for c in FEATURE_COLUMNS if c != "id")
+_UPDATABLE_COLUMNS = frozenset(_INSERT_COLUMNS)
+
+# Point statements; PostgreSQL prepares these once per pooled connection
+STATEMENTS: Dict[str, str] = {
+    "get": f"SELECT {_COLUMNS} FROM features WHERE id = %s",
+    "insert": (
+        f"INSERT INTO features ({', '.join(_INSERT_COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(_INSERT_COLUMNS))}) RETURNING {_COLUMNS}"
+    ),
+    "delete": "DELETE FROM features WHERE id = %s",
+    "count": "SELECT COUNT(*) FROM features",
+    "vote": "UPDATE features SET votes = votes + %s WHERE id = %s",
+    "top": f"SELECT {_COLUMNS} FROM features ORDER BY votes DESC, id LIMIT %s",
+}
+
+
+class SQLFeatureRepository(FeatureRepository):
+    """Feature repository over a pooled DB-API connection"""
+
+    placeholder = "%s"
+    schema: Tuple[str, ...] = ()
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    def _sql(self, sql: str) -> str:
+        if self.placeholder == "%s":
+            return sql
+        return sql.replace("%s", self.placeholder)
+
+    def _execute(self, cur: Any, name: str, params: Sequence[Any] = ()) -> None:
+        """Run one of the named point statements"""
+        cur.execute(self._sql(STATEMENTS[name]), tuple(params))
+
+    def _decode(self, row: Optional[Sequence[Any]]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        return dict(zip(FEATURE_COLUMNS, row))
+
+    def _encode(self, column: str, value: Any) -> Any:
+        return value
+
+    def create_schema(self, conn: Any) -> None:
+        """Create table and indexes if missing"""
+        cur = conn.cursor()
+        for statement in self.schema:
+            cur.execute(statement)
+
+    def __len__(self) -> int:
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            self._execute(cur, "count")
+            return cur.fetchone()[0]
+
+    def insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self.insert_many([data])[0]
+
+    def insert_many(self, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        created = []
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            for data in rows:
+                params = [self._encode(c, data.get(c)) for c in _INSERT_COLUMNS]
+                self._execute(cur, "insert", params)
+                created.append(self._decode(cur.fetchone()))
+        return created
+
+    def get(self, feature_id: int) -> Optional[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            self._execute(cur, "get", (feature_id,))
+            return self._decode(cur.fetchone())
+
+    def update(
+        self, feature_id: int, changes: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        return self.update_many([(feature_id, changes)])[0]
+
+    def update_many(
+        self, updates: Sequence[Tuple[int, Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        for _, changes in updates:
+            unknown = set(changes) - _UPDATABLE_COLUMNS
+            if unknown:
+                raise ValueError(f"Unknown feature columns: {sorted(unknown)}")
+
+        results = []
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            for feature_id, changes in updates:
+                if not changes:
+                    self._execute(cur, "get", (feature_id,))
+                else:
+                    assignments = ", ".join(f"{column} = %s" for column in changes)
+                    params = [self._encode(c, v) for c, v in changes.items()]
+                    sql = (
+                        f"UPDATE features SET {assignments} WHERE id = %s "
+                        f"RETURNING {_COLUMNS}"
+                    )
+                    cur.execute(self._sql(sql), params + [feature_id])
+                results.append(self._decode(cur.fetchone()))
+        return results
+
+    def delete(self, feature_id: int) -> bool:
+        return self.delete_many([feature_id])[0]
+
+    def delete_many(self, feature_ids: Sequence[int]) -> List[bool]:
+        results = []
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            for feature_id in feature_ids:
+                self._execute(cur, "delete", (feature_id,))
+                results.append(cur.rowcount > 0)
+        return results
+
+    def apply_votes(self, deltas: Dict[int, int]) -> None:
+        if not deltas:
+            return
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            # Fixed id order keeps concurrent batches from deadlocking on row locks
+            for feature_id in sorted(deltas):
+                self._execute(cur, "vote", (deltas[feature_id], feature_id))
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            self._execute(cur, "top", (n,))
+            return [self._decode(row) for row in cur.fetchall()]
+
+    def select(
+        self,
+        price: Optional[PriceRange] = None,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if price is not None:
+            clauses.append("price_estimate IS NOT NULL")
+            if price.low is not None:
+                clauses.append(
+                    "price_estimate >= %s"
+                    if price.include_low
+                    else "price_estimate > %s"
+                )
+                params.append(price.low)
+            if price.high is not None:
+                clauses.append(
+                    "price_estimate <= %s"
+                    if price.include_high
+                    else "price_estimate < %s"
+                )
+                params.append(price.high)
+        if after is not None:
+            clauses.append("id > %s")
+            params.append(after)
+
+        sql = f"SELECT {_COLUMNS} FROM features"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(self._sql(sql), params)
+            return [self._decode(row) for row in cur.fetchall()]
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+class SQLiteFeatureRepository(SQLFeatureRepository):
+    """SQLite stand-in for offline runs and tests"""
+
+    placeholder = "?"
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS features (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            link TEXT,
+            price_estimate REAL,
+            votes INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS features_price_idx ON features (price_estimate, id)",
+        "CREATE INDEX IF NOT EXISTS features_votes_idx ON features (votes DESC, id)",
+    )
+
+    def __init__(self, path: str, pool_size: int = 5):
+        self._path = path
+        # Every connection to ":memory:" is a separate database
+        if path == ":memory:":
+            pool_size = 1
+        super().__init__(ConnectionPool(self._connect, max_size=pool_size))
+        with self._pool.connection() as conn:
+            self.create_schema(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 keeps compiled statements in a per-connection cache
+        conn = sqlite3.connect(self._path, check_same_thread=False, timeout=30.0)
+        if self._path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _encode(self, column: str, value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def _decode(self, row: Optional[Sequence[Any]]) -> Optional[Dict[str, Any]]:
+        data = super()._decode(row)
+        if data is not None:
+            for column in ("created_at", "updated_at"):
+                data[column] = datetime.fromisoformat(data[column])
+        return data
+
+
+class PostgresFeatureRepository(SQLFeatureRepository):
+    """PostgreSQL repository with pooled connections and prepared statements"""
+
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS features (
+            id BIGSERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            title TEXT NOT NULL,
+            link TEXT,
+            price_estimate DOUBLE PRECISION,
+            votes BIGINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS features_price_idx ON features (price_estimate, id)",
+        "CREATE INDEX IF NOT EXISTS features_votes_idx ON features (votes DESC, id)",
+    )
+
+    def __init__(self, dsn: str, pool_size: int = 10):
+        import psycopg2
+
+        self._psycopg2 = psycopg2
+        self._dsn = dsn
+
+        conn = psycopg2.connect(dsn)
+        try:
+            # Workers start concurrently; serialize DDL across them
+            conn.cursor().execute("SELECT pg_advisory_xact_lock(hashtext('features'))")
+            self.create_schema(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+        super().__init__(ConnectionPool(self._connect, max_size=pool_size))
+
+    def _connect(self) -> Any:
+        conn = self._psycopg2.connect(self._dsn)
+        cur = conn.cursor()
+        for name, sql in STATEMENTS.items():
+            cur.execute(f"PREPARE feature_{name} AS {_numbered_params(sql)}")
+        conn.commit()
+        return conn
+
+    def _execute(self, cur: Any, name: str, params: Sequence[Any] = ()) -> None:
+        args = f" ({', '.join(['%s'] * len(params))})" if params else ""
+        cur.execute(f"EXECUTE feature_{name}{args}", tuple(params))
+
+
+def _numbered_params(sql: str) -> str:
+    """Rewrite %s placeholders as PostgreSQL $1, $2, ..."""
+    parts = sql.split("%s")
+    numbered = [parts[0]]
+    for index, part in enumerate(parts[1:], start=1):
+        numbered.append(f"${index}{part}")
+    return "".join(numbered)
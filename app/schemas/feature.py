@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class FeatureBase(BaseModel):
@@ -29,6 +29,14 @@ class FeatureUpdate(BaseModel):
     price_estimate: Optional[float] = Field(None, ge=0)
     votes: int = Field(None, ge=0)
 
+    @field_validator("title", "votes", mode="before")
+    @classmethod
+    def reject_null(cls, v):
+        """Omitting a field keeps it, null would clear a required column"""
+        if v is None:
+            raise ValueError("Field cannot be null")
+        return v
+
 
 class Feature(FeatureBase):
     """Complete wish model with all fields"""
@@ -37,3 +45,18 @@ class Feature(FeatureBase):
     user_id: int
     created_at: datetime
     updated_at: datetime
+
+
+class FeatureBulkUpdate(FeatureUpdate):
+    """Schema for one item of a bulk update"""
+
+    id: int
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of one item in a bulk operation"""
+
+    index: int
+    id: Optional[int] = None
+    status: int
+    error: Optional[str] = None
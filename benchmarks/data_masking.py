@@ -0,0 +1,101 @@
+"""Cost of masking error details, pass-per-pattern vs one combined scan
+
+Runs sanitize_error_detail over error payloads shaped like the ones the
+exception handlers see and compares it with the regex-per-detector version
+it replaced, which is kept inline here.
+
+Usage: python -m benchmarks.data_masking [repeat]
+"""
+
+import re
+import sys
+import timeit
+
+from app.core.data_masking import mask_credit_card, mask_email, sanitize_error_detail
+
+
+def legacy_mask_sensitive_data(text: str) -> str:
+    email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+    text = re.sub(email_pattern, lambda m: mask_email(m.group()), text)
+    password_keywords = [
+        r"\bpassword['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
+        r"\btoken['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
+        r"\bsecret['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
+        r"\bapi[_-]?key['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
+        r"\bauth[_-]?token['\"]?\s*[:=]\s*['\"]?([^'\"]+)['\"]?",
+    ]
+    for pattern in password_keywords:
+        text = re.sub(
+            pattern,
+            lambda m: m.group(0).replace(m.group(1), "***"),
+            text,
+            flags=re.IGNORECASE,
+        )
+    cc_pattern = r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"
+    return re.sub(cc_pattern, lambda m: mask_credit_card(m.group()), text)
+
+
+def legacy_sanitize_error_detail(detail: str) -> str:
+    sanitized = legacy_mask_sensitive_data(detail)
+    sanitized = re.sub(r'File "[^"]+", line \d+', "File ***, line ***", sanitized)
+    return re.sub(
+        r"Traceback\s*\(most recent call last\):.*?(?=\n\n|\Z)",
+        "Traceback removed",
+        sanitized,
+        flags=re.DOTALL,
+    )
+
+
+PAYLOADS = {
+    "not found": "Feature not found",
+    "validation errors": str(
+        [
+            {
+                "type": "string_too_short",
+                "loc": ("body", "title"),
+                "msg": "String should have at least 1 character",
+                "input": "",
+                "ctx": {"min_length": 1},
+                "url": "https://errors.pydantic.dev/2.5/v/string_too_short",
+            },
+            {
+                "type": "missing",
+                "loc": ("body", "price_estimate"),
+                "msg": "Field required",
+                "input": {"title": "x", "password": "hunter2"},
+                "url": "https://errors.pydantic.dev/2.5/v/missing",
+            },
+        ]
+    ),
+    "database error": (
+        "could not connect to server: user=app password=s3cr3t host=db "
+        "contact admin@example.com, card 4111 1111 1111 1111"
+    ),
+    "traceback": (
+        "Unhandled error\n\nTraceback (most recent call last):\n"
+        '  File "/srv/app/api/features.py", line 120, in get_feature\n'
+        "    feature = store.get(feature_id)\n"
+        '  File "/srv/app/core/store.py", line 88, in get\n'
+        "    raise KeyError(feature_id)\n"
+        "KeyError: 42\n\nrequest_id abc"
+    ),
+}
+
+
+def main(repeat: int) -> None:
+    number = 20_000
+    for name, payload in PAYLOADS.items():
+        assert sanitize_error_detail(payload) == legacy_sanitize_error_detail(payload)
+        print(f"{name} ({len(payload)} chars)")
+        for label, func in (
+            ("per-pattern passes", legacy_sanitize_error_detail),
+            ("combined scan", sanitize_error_detail),
+        ):
+            seconds = min(
+                timeit.repeat(lambda: func(payload), number=number, repeat=repeat)
+            )
+            print(f"  {label:20s} {seconds / number * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
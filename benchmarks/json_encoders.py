@@ -0,0 +1,70 @@
+"""Serialization throughput of the JSON response encoders
+
+Encodes a list of feature rows with each available encoder, plain and
+sanitized, and reports MB/s of JSON produced.
+
+Usage: python -m benchmarks.json_encoders [rows] [repeat]
+"""
+
+import sys
+import timeit
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.core import json_codec
+from app.core.json_codec import OrjsonCodec, StdlibCodec
+
+
+def make_rows(count: int, dirty_every: int = 0):
+    created = datetime(2025, 10, 13, 15, 30, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "title": (
+                f"<b>Feature {i}</b>"
+                if dirty_every and i % dirty_every == 0
+                else f"Feature {i}"
+            ),
+            "link": "https://example.com/features?id=1",
+            "price_estimate": i + 0.99,
+            "amount": Decimal(i) / 100,
+            "votes": i % 50,
+            "created_at": created,
+            "updated_at": created,
+        }
+        for i in range(count)
+    ]
+
+
+def main(count: int, repeat: int) -> None:
+    codecs = [StdlibCodec()]
+    if json_codec.orjson is not None:
+        codecs.append(OrjsonCodec())
+    else:
+        print("orjson is not installed, benchmarking stdlib only")
+
+    for label, rows in (
+        ("clean", make_rows(count)),
+        ("10% dirty", make_rows(count, dirty_every=10)),
+    ):
+        print(f"{count} rows, {label}")
+        for codec in codecs:
+            for method in ("dumps", "dumps_sanitized"):
+                func = getattr(codec, method)
+                size = len(func(rows))
+                seconds = min(
+                    timeit.repeat(lambda: func(rows), number=1, repeat=repeat)
+                )
+                name = f"{codec.name}.{method}"
+                print(
+                    f"  {name:24s} {seconds * 1000:8.2f} ms "
+                    f"{size / seconds / 2**20:8.1f} MB/s"
+                )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
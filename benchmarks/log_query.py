@@ -0,0 +1,71 @@
+"""Cost of finding one request's log lines by correlation ID
+
+Writes app.log-style JSON lines for many requests into indexed gzip
+segments, then looks one request up through the index and by
+decompressing every segment.
+
+Usage: python -m benchmarks.log_query [lines] [repeat]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+from app.core.log_segments import (
+    LookupStats,
+    SegmentedLogWriter,
+    find_by_correlation_id,
+    scan_by_correlation_id,
+)
+
+
+def write_logs(directory: str, count: int) -> None:
+    writer = SegmentedLogWriter(directory, segment_bytes=4 * 2**20)
+    for i in range(count):
+        entry = {
+            "timestamp": "2025-11-09 16:23:00",
+            "level": "INFO",
+            "logger": "app",
+            "message": f"Operation completed: step {i % 7}",
+            "correlation_id": f"req-{i // 5:08d}",
+            "module": "features",
+            "function": "vote",
+        }
+        writer.write(json.dumps(entry, separators=(",", ":")).encode() + b"\n")
+    writer.close()
+
+
+def main(count: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        write_logs(directory, count)
+        size = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)
+        )
+        target = f"req-{count // 10:08d}"
+        stats = LookupStats()
+        indexed = list(find_by_correlation_id(directory, target, stats))
+        assert indexed == list(scan_by_correlation_id(directory, target))
+        print(
+            f"{count} lines, {size / 2**20:.1f} MiB on disk; lookup read "
+            f"{stats.blocks_read} of {stats.blocks} blocks in {stats.segments} segments"
+        )
+        for name, func in (
+            ("index", find_by_correlation_id),
+            ("decompress all", scan_by_correlation_id),
+        ):
+            seconds = min(
+                timeit.repeat(
+                    lambda: list(func(directory, target)), number=1, repeat=repeat
+                )
+            )
+            print(f"{name:16s} {seconds * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
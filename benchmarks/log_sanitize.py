@@ -0,0 +1,105 @@
+"""Cost of sanitizing log payloads with sanitize_dict_for_logging
+
+Compares the recursive version that rebuilt every container and scanned
+the sensitive keywords for every key with the cached-classifier,
+copy-on-write walker, on a clean and a dirty request log payload.
+
+Usage: python -m benchmarks.log_sanitize [repeat]
+"""
+
+import sys
+import timeit
+
+from app.core.data_masking import (
+    mask_credit_card,
+    mask_email,
+    mask_password,
+    sanitize_dict_for_logging,
+)
+
+SENSITIVE_KEYS = [
+    "password",
+    "token",
+    "secret",
+    "api_key",
+    "auth_token",
+    "credit_card",
+    "ssn",
+    "email",
+]
+
+
+def legacy_sanitize(data):
+    sanitized = {}
+    for key, value in data.items():
+        key_lower = key.lower()
+        if any(sensitive in key_lower for sensitive in SENSITIVE_KEYS):
+            if isinstance(value, str):
+                if "email" in key_lower:
+                    sanitized[key] = mask_email(value)
+                elif "credit_card" in key_lower or "card" in key_lower:
+                    sanitized[key] = mask_credit_card(value)
+                else:
+                    sanitized[key] = mask_password(value)
+            else:
+                sanitized[key] = "***"
+        elif isinstance(value, dict):
+            sanitized[key] = legacy_sanitize(value)
+        elif isinstance(value, list):
+            sanitized[key] = [
+                legacy_sanitize(item) if isinstance(item, dict) else item
+                for item in value
+            ]
+        elif isinstance(value, str):
+            if "@" in value and "." in value:
+                sanitized[key] = mask_email(value)
+            else:
+                sanitized[key] = value
+        else:
+            sanitized[key] = value
+    return sanitized
+
+
+def make_payload(dirty: bool):
+    rows = [
+        {
+            "id": i,
+            "title": f"Feature {i}",
+            "link": "https://example.com/",
+            "price_estimate": 9.99,
+            "votes": i,
+        }
+        for i in range(50)
+    ]
+    payload = {
+        "method": "GET",
+        "path": "/feature",
+        "status": 200,
+        "duration_ms": 3.2,
+        "request": {"headers": {"accept": "application/json", "host": "api"}},
+        "response": {"rows": rows, "count": len(rows)},
+    }
+    if dirty:
+        payload["request"]["headers"]["authorization_token"] = "Bearer abc"
+        payload["user"] = {"email": "user@example.com", "password": "hunter2"}
+    return payload
+
+
+def main(repeat: int) -> None:
+    number = 2000
+    for label, dirty in (("clean", False), ("dirty", True)):
+        payload = make_payload(dirty)
+        assert sanitize_dict_for_logging(payload) == legacy_sanitize(payload)
+        print(label)
+        for name, func in (
+            ("recursive, full copy", legacy_sanitize),
+            ("cached keys, copy-on-write", sanitize_dict_for_logging),
+        ):
+            seconds = min(
+                timeit.repeat(lambda: func(payload), number=number, repeat=repeat)
+            )
+            print(f"  {name:28s} {seconds / number * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,159 @@
+"""Requests per second through the middleware stack, before and after
+
+Drives the ASGI app in-process, so the numbers measure framework and
+middleware overhead without a server or network in the way.
+
+Usage: python -m benchmarks.middleware_rps [requests] [concurrency]
+"""
+
+import asyncio
+import json
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.security_headers import DEFAULT_CSP
+from app.core.xss_protection import sanitize_response_data
+from app.middleware.security import SecurityMiddleware
+
+ROWS = [
+    {"id": i, "title": f"Feature <{i}>", "link": "https://example.com/?a=1&b=2"}
+    for i in range(20)
+]
+
+
+class LegacyCorrelationMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware correlation layer this repo used to run"""
+
+    async def dispatch(self, request: Request, call_next):
+        request.state.correlation_id = str(uuid.uuid4())
+        response = await call_next(request)
+        response.headers["X-Correlation-ID"] = request.state.correlation_id
+        return response
+
+
+class LegacyXSSSanitizerMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware sanitizer; call_next never yields a JSONResponse"""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if isinstance(response, JSONResponse):
+            data = json.loads(response.body)
+            return JSONResponse(sanitize_response_data(data), response.status_code)
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware security headers layer"""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Content-Security-Policy"] = DEFAULT_CSP
+        if request.url.scheme == "https":
+            response.headers["Strict-Transport-Security"] = (
+                "max-age=31536000; includeSubDomains"
+            )
+        response.headers["Permissions-Policy"] = (
+            "geolocation=(), microphone=(), camera=(), payment=()"
+        )
+        return response
+
+
+def make_app(middleware: List[Any]) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @bench_app.get("/rows")
+    def rows():
+        return ROWS
+
+    for cls in middleware:
+        bench_app.add_middleware(cls)
+    return bench_app
+
+
+STACKS: Dict[str, Callable[[], FastAPI]] = {
+    "none": lambda: make_app([]),
+    "before (3x BaseHTTPMiddleware)": lambda: make_app(
+        [
+            LegacyCorrelationMiddleware,
+            LegacyXSSSanitizerMiddleware,
+            LegacySecurityHeadersMiddleware,
+        ]
+    ),
+    "after (fused ASGI)": lambda: make_app([SecurityMiddleware]),
+}
+
+
+async def call(app: FastAPI, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    # Like a server: one request message, then disconnect once the response is done
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            done.set()
+
+    await app(scope, receive, send)
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            await call(app, path)
+
+    per_worker = requests // concurrency
+    await asyncio.gather(*(worker(20) for _ in range(concurrency)))  # warm up
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - started)
+
+
+def main(requests: int, concurrency: int) -> None:
+    for path in ("/health", "/rows"):
+        print(f"GET {path}  ({requests} requests, concurrency {concurrency})")
+        for name, factory in STACKS.items():
+            rps = asyncio.run(run(factory(), path, requests, concurrency))
+            print(f"  {name:34s} {rps:10.0f} req/s")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+    )
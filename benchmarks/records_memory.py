@@ -0,0 +1,71 @@
+"""Memory footprint of dict rows vs FeatureRecord
+
+Usage: python -m benchmarks.records_memory [rows]
+"""
+
+import gc
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from app.core.records import FeatureRecord
+
+TITLES = ["СуперФича", "Dark mode", "Export to CSV", "Offline sync"]
+LINKS = ["https://www.reddit.com/", "https://example.com/roadmap", None]
+
+
+def make_rows(count: int) -> List[Dict[str, Any]]:
+    """Rows shaped like the seed features in app/core/config.py"""
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(1, count + 1):
+        created = start + timedelta(seconds=i)
+        rows.append(
+            {
+                "id": i,
+                "user_id": i % 1000,
+                "title": "".join(TITLES[i % len(TITLES)]),
+                "link": LINKS[i % len(LINKS)],
+                "price_estimate": float(i % 5000) + 0.99,
+                "votes": i % 100,
+                "created_at": created,
+                "updated_at": created + timedelta(minutes=1),
+            }
+        )
+    return rows
+
+
+def measure(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by build() once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main(count: int) -> None:
+    # Titles are rebuilt per row so dict rows pay for their own string copies,
+    # the way rows decoded from requests or JSON do
+    dict_bytes = measure(lambda: make_rows(count))
+    # Source rows are built inside the measurement and freed, so only what the
+    # records themselves retain is counted
+    record_bytes = measure(
+        lambda: [FeatureRecord.from_dict(row) for row in make_rows(count)]
+    )
+
+    print(f"rows:           {count}")
+    print(
+        f"dict layout:    {dict_bytes / count:8.1f} B/row  {dict_bytes / 2**20:8.1f} MiB"
+    )
+    print(
+        f"FeatureRecord:  {record_bytes / count:8.1f} B/row  {record_bytes / 2**20:8.1f} MiB"
+    )
+    print(f"saved:          {100 * (1 - record_bytes / dict_bytes):8.1f} %")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
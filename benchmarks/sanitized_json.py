@@ -0,0 +1,59 @@
+"""Cost of sanitizing a large JSON list response
+
+Compares the old middleware path (render, json.loads, sanitize_response_data,
+re-render) with SanitizedJSONResponse, which escapes during the one encode.
+
+Usage: python -m benchmarks.sanitized_json [rows] [repeat]
+"""
+
+import json
+import sys
+import timeit
+
+from starlette.responses import JSONResponse
+
+from app.core.responses import SanitizedJSONResponse
+from app.core.xss_protection import sanitize_response_data
+
+
+def make_rows(count: int):
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "title": f"Feature {i}" if i % 10 else f"<b>Feature {i}</b>",
+            "link": "https://example.com/features?id=1&ref=list",
+            "price_estimate": i + 0.99,
+            "votes": i % 50,
+            "created_at": "2025-10-13T15:30:00",
+            "updated_at": "2025-10-13T15:30:00",
+        }
+        for i in range(count)
+    ]
+
+
+def three_pass(rows) -> bytes:
+    body = JSONResponse(rows).body
+    return JSONResponse(sanitize_response_data(json.loads(body))).body
+
+
+def one_pass(rows) -> bytes:
+    return SanitizedJSONResponse(rows).body
+
+
+def main(count: int, repeat: int) -> None:
+    rows = make_rows(count)
+    assert three_pass(rows) == one_pass(rows)
+    for name, func in (
+        ("render+loads+sanitize+render", three_pass),
+        ("one pass", one_pass),
+    ):
+        seconds = min(timeit.repeat(lambda: func(rows), number=1, repeat=repeat))
+        print(f"{name:30s} {seconds * 1000:8.2f} ms for {count} rows")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
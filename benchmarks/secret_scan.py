@@ -0,0 +1,65 @@
+"""Cost of scanning a source tree for hardcoded secrets
+
+Builds a synthetic tree of Python modules, a few with credentials, and
+scans it with the detect_secrets_in_code loop the CI script used to run,
+then with SecretScanner serially, in a process pool and from a warm cache.
+
+Usage: python -m benchmarks.secret_scan [files] [repeat]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+from app.core.secret_scanner import SecretScanner, iter_files
+from app.core.secrets import SecretsManager
+
+
+def make_tree(root: str, count: int) -> None:
+    body = "".join(f"def handler_{i}(request):\n    return {i}\n\n" for i in range(60))
+    for i in range(count):
+        directory = os.path.join(root, f"pkg{i % 16}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"mod{i}.py"), "w") as handle:
+            if i % 50 == 0:
+                handle.write(f"API_KEY = 'sk-{i:08d}'\n")
+            handle.write(body)
+
+
+def legacy_scan(manager: SecretsManager, paths):
+    return sum(
+        item["matches"]
+        for path in paths
+        for item in manager.detect_secrets_in_code(path)
+    )
+
+
+def main(count: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, count)
+        paths = list(iter_files([root]))
+        manager = SecretsManager()
+        cache = os.path.join(root, "cache.json")
+        total = legacy_scan(manager, paths)
+        assert len(SecretScanner(workers=1).scan(paths).findings) == total
+
+        def warm():
+            SecretScanner(cache_path=cache, workers=1).scan(paths)
+
+        warm()
+        for name, func in (
+            ("detect_secrets_in_code", lambda: legacy_scan(manager, paths)),
+            ("scanner, 1 worker", lambda: SecretScanner(workers=1).scan(paths)),
+            ("scanner, all CPUs", lambda: SecretScanner().scan(paths)),
+            ("scanner, warm cache", warm),
+        ):
+            seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+            print(f"{name:24s} {seconds * 1000:8.1f} ms for {count} files")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
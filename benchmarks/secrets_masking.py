@@ -0,0 +1,72 @@
+"""Cost of SecretsManager masking, pattern-per-pass vs prefiltered matcher
+
+Masks a batch of log records, mostly clean with a few carrying credentials,
+with the loop over raw pattern strings the manager used to run (kept inline
+here), with mask_data_for_logs per record and with mask_records.
+
+Usage: python -m benchmarks.secrets_masking [records] [repeat]
+"""
+
+import re
+import sys
+import timeit
+
+from app.core.secrets import FORBIDDEN_PATTERNS, SecretsManager
+
+manager = SecretsManager()
+PATTERNS = [pattern for _, pattern in FORBIDDEN_PATTERNS]
+
+
+def legacy_mask_string(text: str) -> str:
+    for pattern in PATTERNS:
+        text = re.sub(
+            pattern,
+            lambda m: manager.mask_secret(m.group(0)),
+            text,
+            flags=re.IGNORECASE,
+        )
+    return text
+
+
+def legacy_mask(data):
+    if isinstance(data, str):
+        return legacy_mask_string(data)
+    if isinstance(data, dict):
+        return {k: legacy_mask(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [legacy_mask(item) for item in data]
+    return data
+
+
+def make_records(count: int):
+    records = []
+    for i in range(count):
+        if i % 20 == 0:
+            records.append(f"db connect failed: user=app password=s3cr3t{i} host=db")
+        elif i % 20 == 1:
+            records.append({"event": "login", "detail": f"jwt: eyJhbGciOi.{i}.sig"})
+        else:
+            records.append(f"GET /feature/{i} 200 3.2ms correlation_id=abc-{i}")
+    return records
+
+
+def main(count: int, repeat: int) -> None:
+    records = make_records(count)
+    assert manager.mask_records(records) == [legacy_mask(r) for r in records]
+    for name, func in (
+        ("per-pattern re.sub", lambda: [legacy_mask(r) for r in records]),
+        (
+            "mask_data_for_logs",
+            lambda: [manager.mask_data_for_logs(r) for r in records],
+        ),
+        ("mask_records", lambda: manager.mask_records(records)),
+    ):
+        seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name:22s} {seconds * 1000:8.2f} ms for {count} records")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
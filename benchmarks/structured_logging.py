@@ -0,0 +1,91 @@
+"""Cost of a log call on the request thread, inline vs queued handler
+
+Logs records carrying a request payload through a handler that masks and
+encodes inline (what a plain StreamHandler with JsonLineFormatter does)
+and through AsyncBatchHandler, which leaves that to its writer thread.
+Reports the time spent in logger.info and the time until all is written.
+The queued writer is held back until the loop ends: in a tight loop it
+would share the GIL with the caller, while in the app it runs during the
+I/O waits of request threads.
+
+Usage: python -m benchmarks.structured_logging [records]
+"""
+
+import io
+import logging
+import sys
+import threading
+import time
+
+from app.core.structured_logging import AsyncBatchHandler, JsonLineFormatter
+
+
+class InlineHandler(logging.Handler):
+    def __init__(self, sink):
+        super().__init__()
+        self.sink = sink
+        self.formatter = JsonLineFormatter()
+
+    def emit(self, record):
+        self.sink.write(self.formatter.encode(record) + b"\n")
+
+
+class GatedSink(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.open = threading.Event()
+        self.writing = threading.Event()
+
+    def write(self, data):
+        self.writing.set()
+        self.open.wait()
+        return super().write(data)
+
+
+PAYLOAD = {
+    "method": "POST",
+    "path": "/feature",
+    "user": {"email": "user@example.com", "password": "hunter2"},
+    "body": {"title": "Dark mode", "link": "https://example.com/", "price": 9.99},
+}
+
+
+def run(handler, count: int, sink):
+    logger = logging.getLogger("bench.structured")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    if isinstance(sink, GatedSink):
+        # Park the writer on a first record so it stays off the GIL
+        logger.info("start")
+        sink.writing.wait()
+    started = time.perf_counter()
+    for i in range(count):
+        logger.info("created feature %d", i, extra={"data": PAYLOAD})
+    emitted = time.perf_counter() - started
+    if isinstance(sink, GatedSink):
+        sink.open.set()
+    handler.flush()
+    return emitted, time.perf_counter() - started
+
+
+def main(count: int) -> None:
+    inline_sink, queued_sink = io.BytesIO(), GatedSink()
+    queued = AsyncBatchHandler(queued_sink, queue_size=count + 2, sample_above=1)
+    for name, handler, sink in (
+        ("inline mask + encode", InlineHandler(inline_sink), inline_sink),
+        ("queued, writer thread", queued, queued_sink),
+    ):
+        emitted, total = run(handler, count, sink)
+        print(
+            f"{name:22s} {emitted / count * 1e6:6.1f} us per call on the caller, "
+            f"{total * 1000:7.1f} ms until written"
+        )
+    queued.close()
+    assert (
+        queued_sink.getvalue().count(b"\n") == count + 1 == queued.metrics()["written"]
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,104 @@
+"""Microbenchmarks of the copy-on-write sanitizer against the previous one
+
+Usage: python -m benchmarks.xss_sanitize [rows]
+"""
+
+import html
+import sys
+import timeit
+from typing import Any, Callable, Dict, List
+
+from app.core import xss_protection
+
+
+def legacy_escape_html(text: str) -> str:
+    return html.escape(text, quote=True)
+
+
+def legacy_sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    sanitized = {}
+    for key, value in data.items():
+        if isinstance(value, str):
+            sanitized[key] = legacy_escape_html(value)
+        elif isinstance(value, dict):
+            sanitized[key] = legacy_sanitize_dict(value)
+        elif isinstance(value, list):
+            sanitized[key] = legacy_sanitize_list(value)
+        else:
+            sanitized[key] = value
+    return sanitized
+
+
+def legacy_sanitize_list(data: List[Any]) -> List[Any]:
+    sanitized = []
+    for item in data:
+        if isinstance(item, str):
+            sanitized.append(legacy_escape_html(item))
+        elif isinstance(item, dict):
+            sanitized.append(legacy_sanitize_dict(item))
+        elif isinstance(item, list):
+            sanitized.append(legacy_sanitize_list(item))
+        else:
+            sanitized.append(item)
+    return sanitized
+
+
+def make_rows(count: int, dirty_every: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "title": f"<b>Feature {i}</b>" if i % dirty_every == 0 else f"Feature {i}",
+            "link": "https://example.com/features/1",
+            "price_estimate": i + 0.99,
+            "votes": i % 50,
+            "created_at": "2025-10-13T15:30:00",
+            "updated_at": "2025-10-13T15:30:00",
+        }
+        for i in range(count)
+    ]
+
+
+def best(func: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def report(name: str, before: float, after: float) -> None:
+    print(
+        f"{name:38s} before {before * 1e6:10.2f} us  after {after * 1e6:10.2f} us"
+        f"  x{before / after:5.1f}"
+    )
+
+
+def main(count: int) -> None:
+    clean = "A perfectly ordinary feature title"
+    dirty = "<script>alert('x')</script>"
+    report(
+        "escape_html, clean string",
+        best(lambda: legacy_escape_html(clean), 200_000),
+        best(lambda: xss_protection.escape_html(clean), 200_000),
+    )
+    report(
+        "escape_html, dirty string",
+        best(lambda: legacy_escape_html(dirty), 200_000),
+        best(lambda: xss_protection.escape_html(dirty), 200_000),
+    )
+
+    for label, dirty_every in (("all clean", count + 1), ("10% dirty", 10)):
+        rows = make_rows(count, dirty_every)
+        assert xss_protection.sanitize_records(rows) == legacy_sanitize_list(rows)
+        before = best(lambda: legacy_sanitize_list(rows), 5)
+        report(
+            f"{count} rows, {label}, sanitize_response_data",
+            before,
+            best(lambda: xss_protection.sanitize_response_data(rows), 5),
+        )
+        report(
+            f"{count} rows, {label}, sanitize_records",
+            before,
+            best(lambda: xss_protection.sanitize_records(rows), 5),
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Find the log lines of one request by correlation ID in compressed segments.
+
+Reads the .idx sidecars written next to each segment and decompresses only
+the blocks listed for the ID; --scan decompresses everything instead.
+
+Usage:  python scripts/query_logs.py <correlation_id> [--dir DIR] [--scan]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core import log_segments  # noqa: E402
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Query log segments by correlation ID")
+    parser.add_argument("correlation_id", help="correlation ID of the request")
+    parser.add_argument(
+        "--dir",
+        default=os.getenv("LOG_SEGMENT_DIR", "logs/segments"),
+        help="segment directory (default: LOG_SEGMENT_DIR or logs/segments)",
+    )
+    parser.add_argument(
+        "--scan", action="store_true", help="decompress every segment, ignore the index"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Основная функция"""
+    args = parse_args(argv)
+    started = time.perf_counter()
+    stats = log_segments.LookupStats()
+    if args.scan:
+        entries = log_segments.scan_by_correlation_id(args.dir, args.correlation_id)
+    else:
+        entries = log_segments.find_by_correlation_id(
+            args.dir, args.correlation_id, stats
+        )
+
+    found = 0
+    for entry in entries:
+        found += 1
+        print(json.dumps(entry, ensure_ascii=False))
+
+    elapsed = time.perf_counter() - started
+    summary = f"{found} lines in {elapsed * 1000:.1f} ms"
+    if not args.scan:
+        summary += (
+            f", read {stats.blocks_read} of {stats.blocks} blocks"
+            f" in {stats.segments} segments ({stats.bytes_read} bytes)"
+        )
+    print(summary, file=sys.stderr)
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Scan the repository for hardcoded secrets with the SecretsManager patterns.
+
+Scans in a process pool and caches results by file content hash, so only
+new or changed files cost anything on the next run.
+
+Usage:  python scripts/scan_secrets.py [paths ...] [--since REV]
+Output: EVIDENCE/P10/secrets_scan.sarif
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core import secret_scanner  # noqa: E402
+
+SARIF_PATH = Path("EVIDENCE/P10/secrets_scan.sarif")
+CACHE_PATH = Path(".secrets_scan_cache.json")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Scan files for hardcoded secrets")
+    parser.add_argument("paths", nargs="*", default=["."], help="files or directories")
+    parser.add_argument(
+        "--since", metavar="REV", help="only scan files changed since a git revision"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="scanner processes (default: CPUs)"
+    )
+    parser.add_argument("--cache", type=Path, default=CACHE_PATH, help="cache file")
+    parser.add_argument("--no-cache", action="store_true", help="rescan everything")
+    parser.add_argument("--sarif", type=Path, default=SARIF_PATH, help="SARIF output")
+    parser.add_argument(
+        "--fail-on-findings", action="store_true", help="exit 1 if anything is found"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Основная функция"""
+    args = parse_args(argv)
+    started = time.perf_counter()
+
+    if args.since:
+        files = [
+            path
+            for path in secret_scanner.changed_files(args.since)
+            if any(
+                os.path.commonpath([os.path.abspath(path), os.path.abspath(root)])
+                == os.path.abspath(root)
+                for root in args.paths
+            )
+        ]
+    else:
+        files = list(secret_scanner.iter_files(args.paths))
+    # The tool's own outputs hold masked findings, not secrets
+    outputs = {os.path.abspath(args.sarif), os.path.abspath(args.cache)}
+    files = [path for path in files if os.path.abspath(path) not in outputs]
+
+    scanner = secret_scanner.SecretScanner(
+        cache_path=None if args.no_cache else str(args.cache), workers=args.workers
+    )
+    result = scanner.scan(files, prune_cache=not args.since)
+
+    args.sarif.parent.mkdir(parents=True, exist_ok=True)
+    with args.sarif.open("w", encoding="utf-8") as handle:
+        json.dump(secret_scanner.to_sarif(result, scanner.rules), handle, indent=2)
+
+    elapsed = time.perf_counter() - started
+    print(f"✓ SARIF written to {args.sarif}")
+    print(
+        f"  - Files: {len(files)} ({result.scanned} scanned, {result.cached} cached, "
+        f"{result.skipped} skipped) in {elapsed:.2f}s"
+    )
+    print(f"  - Findings: {len(result.findings)}")
+    for finding in result.findings[:20]:
+        print(f"    {finding.path}:{finding.line}:{finding.column} {finding.rule}")
+
+    return 1 if args.fail_on_findings and result.findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Shared test fixtures"""
+
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def make_row():
+    """Factory for feature rows as repositories store them"""
+
+    def make(**overrides):
+        now = datetime(2025, 10, 13, 15, 30, 0)
+        row = {
+            "user_id": 1,
+            "title": "Feature",
+            "link": None,
+            "price_estimate": 10.0,
+            "votes": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        row.update(overrides)
+        return row
+
+    return make
+
+
+class FakeClock:
+    """Callable clock that only moves when a test sets or advances `now`"""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Fake clock for code that takes a `clock` callable"""
+    return FakeClock()
@@ -0,0 +1,149 @@
+"""Tests for ETags, conditional GET and the response cache"""
+
+from fastapi.testclient import TestClient
+
+from app.core.response_cache import ResponseCache
+from app.core.store import FeatureStore
+from app.main import app
+
+client = TestClient(app)
+
+
+def create(title="Cached"):
+    return client.post("/feature", json={"title": title}).json()["id"]
+
+
+class TestConditionalGet:
+    """Test ETag and If-None-Match handling on feature reads"""
+
+    def test_row_not_modified(self):
+        """Test a matching If-None-Match gets 304 with the same ETag"""
+        feature_id = create()
+        first = client.get(f"/feature/{feature_id}")
+        etag = first.headers["etag"]
+
+        second = client.get(f"/feature/{feature_id}", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert second.content == b""
+
+    def test_row_etag_changes_on_update_and_vote(self):
+        """Test row mutations produce a new ETag and fresh body"""
+        feature_id = create()
+        etag = client.get(f"/feature/{feature_id}").headers["etag"]
+
+        client.put(f"/feature/{feature_id}", json={"title": "Renamed"})
+        response = client.get(f"/feature/{feature_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["title"] == "Renamed"
+
+        etag = response.headers["etag"]
+        client.post(f"/feature/{feature_id}/vote")
+        response = client.get(f"/feature/{feature_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["votes"] == 1
+
+    def test_row_etag_ignores_other_rows(self):
+        """Test changing one row keeps another row's ETag valid"""
+        feature_id = create()
+        etag = client.get(f"/feature/{feature_id}").headers["etag"]
+        create("Unrelated")
+
+        response = client.get(f"/feature/{feature_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_list_etag_changes_on_any_mutation(self):
+        """Test the list ETag follows the table version"""
+        etag = client.get("/feature").headers["etag"]
+        assert (
+            client.get("/feature", headers={"If-None-Match": etag}).status_code == 304
+        )
+
+        create()
+        response = client.get("/feature", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_weak_and_wildcard_validators_match(self):
+        """Test If-None-Match uses weak comparison and accepts *"""
+        feature_id = create()
+        etag = client.get(f"/feature/{feature_id}").headers["etag"]
+        for header in (f'"other", W/{etag}', "*"):
+            response = client.get(
+                f"/feature/{feature_id}", headers={"If-None-Match": header}
+            )
+            assert response.status_code == 304
+
+    def test_cached_page_keeps_cursor_header(self):
+        """Test the next cursor is served from cache along with the body"""
+        create()
+        create()
+        first = client.get("/feature", params={"limit": 1})
+        second = client.get("/feature", params={"limit": 1})
+        assert second.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+        assert second.json() == first.json()
+
+    def test_missing_row_is_not_found(self):
+        """Test unknown ids still return 404"""
+        response = client.get("/feature/99999", headers={"If-None-Match": "*"})
+        assert response.status_code == 404
+
+    def test_body_is_sanitized(self):
+        """Test rendered bodies are HTML-escaped"""
+        feature_id = create("<i>x</i>")
+        assert (
+            client.get(f"/feature/{feature_id}").json()["title"]
+            == "&lt;i&gt;x&lt;/i&gt;"
+        )
+
+
+class TestStoreVersions:
+    """Test store version counters"""
+
+    def test_versions_bump_on_mutation(self):
+        """Test table and row versions move only when they should"""
+        store = FeatureStore()
+        row = store.insert({"title": "A", "votes": 0})
+        other = store.insert({"title": "B", "votes": 0})
+        table, row_version = store.version(), store.row_version(row["id"])
+
+        store.apply_votes({other["id"]: 1})
+        assert store.version() != table
+        assert store.row_version(row["id"]) == row_version
+
+        store.update(row["id"], {"title": "C"})
+        assert store.row_version(row["id"]) != row_version
+
+        table = store.version()
+        store.delete(other["id"])
+        assert store.version() != table
+        assert store.row_version(other["id"]) is None
+
+    def test_versions_distinct_across_instances(self):
+        """Test tokens from a restarted store never collide"""
+        assert FeatureStore().version() != FeatureStore().version()
+
+
+class TestResponseCache:
+    """Test LRU eviction of rendered bodies"""
+
+    def test_evicts_least_recently_used(self):
+        """Test the entry limit evicts the oldest untouched entry"""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", (b"a", {}))
+        cache.put("b", (b"b", {}))
+        cache.get("a")
+        cache.put("c", (b"c", {}))
+        assert cache.get("b") is None
+        assert cache.get("a") == (b"a", {})
+        assert len(cache) == 2
+
+    def test_byte_limit(self):
+        """Test total body size is bounded and oversized bodies are skipped"""
+        cache = ResponseCache(max_bytes=10)
+        cache.put("big", (b"x" * 11, {}))
+        assert cache.get("big") is None
+        cache.put("a", (b"x" * 6, {}))
+        cache.put("b", (b"x" * 6, {}))
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
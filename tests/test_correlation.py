@@ -0,0 +1,156 @@
+"""Tests for correlation ID propagation"""
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.correlation import (
+    CorrelationIdFilter,
+    bind_context,
+    get_correlation_id,
+    new_correlation_id,
+    reset_correlation_id,
+    set_correlation_id,
+    submit_with_context,
+    valid_correlation_id,
+)
+from app.main import app
+from app.middleware.correlation import CorrelationMiddleware
+from app.middleware.security import SecurityMiddleware
+
+client = TestClient(app)
+
+
+def make_client(middleware):
+    """App exposing the correlation ID seen by sync, async and background code"""
+    test_app = FastAPI()
+    seen = {}
+
+    @test_app.get("/sync")
+    def sync_endpoint():
+        return {"id": get_correlation_id()}
+
+    @test_app.get("/async")
+    async def async_endpoint(background: BackgroundTasks):
+        background.add_task(lambda: seen.update(background=get_correlation_id()))
+        return {"id": get_correlation_id()}
+
+    test_app.add_middleware(middleware)
+    return TestClient(test_app), seen
+
+
+class TestIdGenerator:
+    """Test the fast correlation ID generator"""
+
+    def test_ids_are_uuid4_shaped(self):
+        """Test IDs parse as version 4, RFC 4122 variant UUIDs"""
+        parsed = uuid.UUID(new_correlation_id())
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
+
+    def test_ids_unique_across_threads(self):
+        """Test concurrent generation never repeats an ID"""
+        results = []
+
+        def generate():
+            results.extend(new_correlation_id() for _ in range(2000))
+
+        threads = [threading.Thread(target=generate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(set(results)) == len(results) == 8000
+
+
+class TestIncomingHeader:
+    """Test client-supplied correlation IDs"""
+
+    def test_valid_id_is_propagated(self):
+        """Test a valid incoming ID is echoed and used in problem details"""
+        response = client.get("/feature/99999", headers={"X-Correlation-ID": "req-42"})
+        assert response.headers["X-Correlation-ID"] == "req-42"
+        assert response.json()["correlation_id"] == "req-42"
+
+    @pytest.mark.parametrize("value", ["", "bad id", "x" * 200, "-leading", "a\tb"])
+    def test_invalid_id_is_replaced(self, value):
+        """Test unsafe incoming IDs are replaced with a generated one"""
+        response = client.get("/health", headers={"X-Correlation-ID": value})
+        uuid.UUID(response.headers["X-Correlation-ID"])
+        assert valid_correlation_id(value) is None
+
+
+@pytest.mark.parametrize("middleware", [SecurityMiddleware, CorrelationMiddleware])
+class TestPropagation:
+    """Test the ID reaches code running on behalf of the request"""
+
+    def test_sync_endpoint_in_thread_pool(self, middleware):
+        """Test sync endpoints run in the thread pool see the ID"""
+        test_client, _ = make_client(middleware)
+        response = test_client.get("/sync")
+        assert response.json()["id"] == response.headers["X-Correlation-ID"]
+
+    def test_async_endpoint_and_background_task(self, middleware):
+        """Test async endpoints and their background tasks see the ID"""
+        test_client, seen = make_client(middleware)
+        response = test_client.get("/async")
+        correlation_id = response.headers["X-Correlation-ID"]
+        assert response.json()["id"] == correlation_id
+        assert seen["background"] == correlation_id
+
+    def test_reset_after_request(self, middleware):
+        """Test the ID does not leak past the request"""
+        test_client, _ = make_client(middleware)
+        test_client.get("/sync")
+        assert get_correlation_id() is None
+
+
+class TestContextHelpers:
+    """Test executor, thread and logging helpers"""
+
+    def test_submit_with_context(self):
+        """Test executor jobs see the submitter's ID"""
+        token = set_correlation_id("job-1")
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                plain = executor.submit(get_correlation_id).result()
+                bound = submit_with_context(executor, get_correlation_id).result()
+        finally:
+            reset_correlation_id(token)
+        assert plain is None
+        assert bound == "job-1"
+
+    def test_bind_context_for_threads(self):
+        """Test a bound callable carries the ID into a new thread"""
+        seen = []
+        token = set_correlation_id("thread-1")
+        try:
+            target = bind_context(lambda: seen.append(get_correlation_id()))
+        finally:
+            reset_correlation_id(token)
+        threads = [threading.Thread(target=target) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert seen == ["thread-1", "thread-1"]
+
+    def test_log_filter(self):
+        """Test log records get the current ID, or a dash outside requests"""
+        log_filter = CorrelationIdFilter()
+        record = logging.LogRecord("t", logging.INFO, __file__, 1, "m", None, None)
+        log_filter.filter(record)
+        assert record.correlation_id == "-"
+
+        token = set_correlation_id("log-1")
+        try:
+            record = logging.LogRecord("t", logging.INFO, __file__, 1, "m", None, None)
+            log_filter.filter(record)
+        finally:
+            reset_correlation_id(token)
+        assert record.correlation_id == "log-1"
@@ -0,0 +1,187 @@
+"""Tests for masking sensitive data in error details and logs"""
+
+import json
+
+import pytest
+
+from app.core.data_masking import (
+    ASSIGNMENT,
+    CREDIT_CARD,
+    EMAIL,
+    MaskingEngine,
+    classify_key,
+    iter_sanitized_json,
+    mask_credit_card,
+    mask_email,
+    mask_password,
+    mask_sensitive_data,
+    sanitize_dict_for_logging,
+    sanitize_error_detail,
+)
+
+
+class TestMaskSensitiveData:
+    """Test each detector and their combination in one scan"""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("contact admin@example.com now", "contact a***@example.com now"),
+            ("password=hunter2", "password=***"),
+            ("PASSWORD: 'hunter2' ok", "PASSWORD: '***' ok"),
+            ('{"api_key": "abc", "x": 1}', '{"api_key": "***", "x": 1}'),
+            ("auth-token=abc", "auth-token=***"),
+            ("card 4111-1111-1111-1234", "card ****-****-****-1234"),
+            (
+                "user a@b.io token='t1' card 4111 1111 1111 9876",
+                "user a***@b.io token='***' card ****-****-****-9876",
+            ),
+        ],
+    )
+    def test_masks(self, text, expected):
+        """Test sensitive values are masked and the rest is kept"""
+        assert mask_sensitive_data(text) == expected
+
+    def test_value_inside_key_not_replaced(self):
+        """Test only the value is masked even if it also occurs in the key"""
+        assert mask_sensitive_data("password=d") == "password=***"
+
+    def test_unquoted_value_runs_to_next_quote(self):
+        """Test an unquoted value swallows later assignments like before"""
+        assert mask_sensitive_data("password=a; token=b") == "password=***"
+
+    def test_clean_text_returned_as_is(self):
+        """Test text no detector can match is not rebuilt"""
+        text = "Feature not found"
+        assert mask_sensitive_data(text) is text
+
+    def test_non_ascii_digits(self):
+        """Test card numbers in non-ASCII digits still reach the regex"""
+        digits = "٤١١١" * 4
+        assert mask_sensitive_data(digits) == "****-****-****-٤١١١"
+
+    def test_non_ascii_keyword(self):
+        """Test case folding beyond ASCII still reaches the assignment regex"""
+        assert mask_sensitive_data("ſecret=hunter22") == "ſecret=***"
+
+
+class TestSanitizeErrorDetail:
+    """Test error details lose locations, tracebacks and secrets"""
+
+    def test_file_location(self):
+        """Test file paths and line numbers are hidden"""
+        detail = 'error in File "/srv/app/main.py", line 12'
+        assert sanitize_error_detail(detail) == "error in File ***, line ***"
+
+    def test_traceback_removed_up_to_blank_line(self):
+        """Test the traceback block is replaced and what follows is kept"""
+        detail = (
+            "boom\n\nTraceback (most recent call last):\n"
+            '  File "/srv/x.py", line 1, in f\nKeyError: 1\n\nmail me@example.com'
+        )
+        assert sanitize_error_detail(detail) == (
+            "boom\n\nTraceback removed\n\nmail m***@example.com"
+        )
+
+    def test_secrets_masked(self):
+        """Test sanitizing also masks sensitive data"""
+        detail = str({"input": {"password": "hunter2"}})
+        assert "hunter2" not in sanitize_error_detail(detail)
+
+
+class TestMaskingEngine:
+    """Test the combined-pattern engine"""
+
+    def test_leftmost_match_wins(self):
+        """Test overlapping matches resolve to the one starting first"""
+        engine = MaskingEngine([EMAIL, CREDIT_CARD])
+        assert engine.mask("1234 5678 1234 5678.x@a.co") == (
+            "****-****-****-5678.***@a.co"
+        )
+
+    def test_listed_first_wins_at_same_position(self):
+        """Test detector order breaks ties between matches at one position"""
+        text = "x 1234567812345678@mail.com"
+        assert MaskingEngine([EMAIL, CREDIT_CARD]).mask(text) == "x 1***@mail.com"
+        assert MaskingEngine([CREDIT_CARD, EMAIL]).mask(text) == (
+            "x ****-****-****-5678@mail.com"
+        )
+
+    def test_patterns_built_per_detector_combination(self):
+        """Test each combination of possible detectors is compiled once"""
+        engine = MaskingEngine([EMAIL, ASSIGNMENT])
+        engine.mask("a@b.io")
+        engine.mask("c@d.io")
+        engine.mask("a@b.io token=1")
+        assert len(engine._combined) == 2
+
+
+class TestSanitizeDictForLogging:
+    """Test masking of log payloads"""
+
+    def test_masks_by_key_and_value(self):
+        """Test sensitive keys and email-like values are masked at any depth"""
+        data = {
+            "User_Email": "john@example.com",
+            "credit_card": "4111 1111 1111 1234",
+            "API_KEY": "abc",
+            "ssn": 123,
+            "contact": "jane@example.com",
+            "nested": {"items": [{"token": "t"}, "x@y.z", ["a@b.c"]]},
+            "auth_token": {"value": "t"},
+        }
+        assert sanitize_dict_for_logging(data) == {
+            "User_Email": "j***@example.com",
+            "credit_card": "****-****-****-1234",
+            "API_KEY": "***",
+            "ssn": "***",
+            "contact": "j***@example.com",
+            "nested": {"items": [{"token": "***"}, "x@y.z", ["a@b.c"]]},
+            "auth_token": "***",
+        }
+
+    def test_copies_only_modified_branches(self):
+        """Test clean input is returned as is and clean branches are shared"""
+        clean = {"id": 1, "rows": [{"title": "x"}], "meta": {"a": 1}}
+        assert sanitize_dict_for_logging(clean) is clean
+
+        data = {"meta": {"a": 1}, "user": {"password": "p"}}
+        result = sanitize_dict_for_logging(data)
+        assert result["meta"] is data["meta"]
+        assert result["user"] == {"password": "***"}
+        assert data["user"] == {"password": "p"}
+
+    def test_deep_nesting(self):
+        """Test nesting deeper than the recursion limit is walked"""
+        data = leaf = {}
+        for _ in range(5000):
+            leaf["child"] = {}
+            leaf = leaf["child"]
+        leaf["password"] = "p"
+        result = sanitize_dict_for_logging(data)
+        for _ in range(5000):
+            result = result["child"]
+        assert result == {"password": "***"}
+
+    def test_circular_reference(self):
+        """Test a payload containing itself is refused"""
+        data = {"rows": []}
+        data["rows"].append(data)
+        with pytest.raises(ValueError):
+            sanitize_dict_for_logging(data)
+
+    def test_key_classifier(self):
+        """Test keys map to a masking function, cached"""
+        assert classify_key("Contact_Email") is mask_email
+        assert classify_key("card_token") is mask_credit_card
+        assert classify_key("secret") is mask_password
+        assert classify_key("title") is None
+        assert classify_key(1) is None
+        assert classify_key.cache_info().maxsize is not None
+
+    def test_streaming_json(self):
+        """Test the chunks join to the sanitized JSON"""
+        data = {"rows": [{"id": i, "email": "a@b.io"} for i in range(100)]}
+        chunks = list(iter_sanitized_json(data, chunk_size=256))
+        assert len(chunks) > 1
+        assert json.loads("".join(chunks)) == sanitize_dict_for_logging(data)
@@ -0,0 +1,97 @@
+"""Tests for escape-once storage"""
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import features
+from app.core.store import FeatureStore
+from app.main import app
+
+client = TestClient(app)
+
+ROWS = [
+    {
+        "id": 1,
+        "user_id": 1,
+        "title": "<script>alert('x')</script>",
+        "link": 'https://a.b/?q="1"&r=2',
+        "price_estimate": 5,
+        "votes": 2,
+        "created_at": datetime(2025, 10, 13, 15, 30, 0, 120000),
+        "updated_at": datetime(2025, 10, 13, 15, 30, 0),
+    },
+    {
+        "id": 2,
+        "user_id": 7,
+        "title": "Plain title",
+        "link": None,
+        "price_estimate": None,
+        "votes": 0,
+        "created_at": datetime(2025, 1, 1),
+        "updated_at": datetime(2025, 1, 2, 3, 4, 5, 6),
+    },
+]
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    """Serve the endpoints from a plain and an escape-once store in turn"""
+    plain = FeatureStore(ROWS)
+    escaped = FeatureStore(ROWS, escape_once=True)
+
+    def use(store):
+        monkeypatch.setattr(features, "get_feature_store", lambda: store)
+
+    return plain, escaped, use
+
+
+class TestEscapedRecords:
+    """Test pre-escaped rows match the sanitizing serializer"""
+
+    @pytest.mark.parametrize("feature_id", [1, 2])
+    def test_same_as_dump_row(self, feature_id):
+        """Test escaped rows serialize to the same bytes as per-request escaping"""
+        store = FeatureStore(ROWS, escape_once=True)
+        escaped = features._dump_escaped(store.get_escaped(feature_id))
+        assert escaped == features._dump_row(store.get(feature_id))
+
+    def test_writes_keep_escaped_forms_current(self):
+        """Test inserts, updates and votes refresh or carry the escaped strings"""
+        store = FeatureStore(ROWS, escape_once=True)
+        row = store.insert({**ROWS[1], "title": "a & b"})
+        assert store.get_escaped(row["id"])["title"] == "a &amp; b"
+
+        store.update(row["id"], {"title": "<new>"})
+        assert store.get_escaped(row["id"])["title"] == "&lt;new&gt;"
+
+        store.apply_votes({row["id"]: 3})
+        escaped = store.get_escaped(row["id"])
+        assert escaped["title"] == "&lt;new&gt;" and escaped["votes"] == 3
+        assert store.get(row["id"])["title"] == "<new>"
+
+    def test_select_escaped_pages_like_select(self):
+        """Test select_escaped returns the same ids as select"""
+        store = FeatureStore(ROWS, escape_once=True)
+        assert [r["id"] for r in store.select_escaped(after=1, limit=5)] == [2]
+
+
+class TestEscapeOnceEndpoints:
+    """Test read endpoints give identical bodies with escape-once storage"""
+
+    @pytest.mark.parametrize(
+        "path, params",
+        [("/feature", {}), ("/feature", {"limit": 1}), ("/feature/1", {})],
+    )
+    def test_identical_bodies(self, stores, path, params):
+        """Test escape-once responses match per-request sanitization"""
+        plain, escaped, use = stores
+        use(plain)
+        expected = client.get(path, params=params)
+        use(escaped)
+        response = client.get(path, params=params)
+
+        assert response.status_code == expected.status_code == 200
+        assert response.content == expected.content
+        assert "&lt;script&gt;" in response.text
@@ -0,0 +1,276 @@
+"""Tests for indexed feature store"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.store import FeatureStore, PriceRange
+from app.main import app
+
+client = TestClient(app)
+
+
+class TestFeatureStore:
+    """Test store indexing and id allocation"""
+
+    def test_insert_assigns_monotonic_ids(self, make_row):
+        """Test ids grow and are not reused after delete"""
+        store = FeatureStore()
+        first = store.insert(make_row())
+        second = store.insert(make_row())
+        assert (first["id"], second["id"]) == (1, 2)
+
+        assert store.delete(second["id"])
+        assert store.insert(make_row())["id"] == 3
+
+    def test_seed_rows_advance_allocator(self, make_row):
+        """Test preloaded rows keep their ids"""
+        store = FeatureStore([{"id": 7, **make_row()}])
+        assert store.get(7)["title"] == "Feature"
+        assert store.insert(make_row())["id"] == 8
+
+    def test_get_update_delete_missing(self):
+        """Test operations on unknown ids"""
+        store = FeatureStore()
+        assert store.get(42) is None
+        assert store.update(42, {"title": "x"}) is None
+        assert store.delete(42) is False
+
+    def test_update_changes_row(self, make_row):
+        """Test partial update"""
+        store = FeatureStore()
+        row = store.insert(make_row())
+        store.update(row["id"], {"votes": 5})
+        assert store.get(row["id"])["votes"] == 5
+        assert store.get(row["id"])["title"] == "Feature"
+
+    def test_all_in_id_order(self, make_row):
+        """Test listing returns rows ordered by id"""
+        store = FeatureStore()
+        for _ in range(5):
+            store.insert(make_row())
+        store.delete(3)
+        assert [row["id"] for row in store.all()] == [1, 2, 4, 5]
+        assert len(store) == 4
+        assert 3 not in store
+
+
+class TestFeatureEndpoints:
+    """Test feature endpoints on top of the store"""
+
+    def test_crud_roundtrip(self):
+        """Test create, read, update and delete through the API"""
+        created = client.post("/feature", json={"title": "Roundtrip"})
+        assert created.status_code == 201
+        feature_id = created.json()["id"]
+
+        assert client.get(f"/feature/{feature_id}").json()["title"] == "Roundtrip"
+
+        updated = client.put(f"/feature/{feature_id}", json={"votes": 3})
+        assert updated.status_code == 200
+        assert updated.json()["votes"] == 3
+
+        assert client.delete(f"/feature/{feature_id}").status_code == 200
+        assert client.get(f"/feature/{feature_id}").status_code == 404
+        assert client.delete(f"/feature/{feature_id}").status_code == 404
+
+    def test_update_missing_feature(self):
+        """Test update of unknown feature returns 404"""
+        response = client.put("/feature/999999", json={"votes": 1})
+        assert response.status_code == 404
+
+
+class TestPriceIndex:
+    """Test sorted price index and range queries"""
+
+    @pytest.fixture
+    def store(self, make_row):
+        store = FeatureStore()
+        for price in (50.0, 10.0, None, 30.0, 10.0, 70.0):
+            store.insert(make_row(price_estimate=price))
+        return store
+
+    def ids(self, store, **bounds):
+        return [row["id"] for row in store.select(price=PriceRange(**bounds))]
+
+    def test_range_bounds(self, store):
+        """Test inclusive and exclusive bounds"""
+        assert self.ids(store, high=30.0, include_high=False) == [2, 5]
+        assert self.ids(store, low=10.0, high=30.0) == [2, 4, 5]
+        assert self.ids(store, low=30.0, include_low=False) == [1, 6]
+        assert self.ids(store) == [1, 2, 4, 5, 6]
+
+    def test_index_follows_update_and_delete(self, store):
+        """Test index stays consistent after mutations"""
+        store.update(2, {"price_estimate": 100.0})
+        store.update(3, {"price_estimate": 5.0})
+        store.update(6, {"price_estimate": None})
+        store.delete(5)
+        assert self.ids(store, high=20.0) == [3]
+        assert self.ids(store, low=60.0) == [2]
+
+    def test_pages_in_price_range(self, store):
+        """Test keyset pages over a price range keep id order"""
+        price = PriceRange(low=10.0)
+
+        def page(after):
+            return [r["id"] for r in store.select(price, after=after, limit=2)]
+
+        assert page(None) == [1, 2]
+        assert page(2) == [4, 5]
+        assert page(5) == [6]
+        assert page(6) == []
+        batches = store.iter_batches(price, after=2, batch_size=2)
+        assert [[r["id"] for r in batch] for batch in batches] == [[4, 5], [6]]
+
+    def test_intersect(self):
+        """Test combining ranges picks the tighter bound"""
+        price = PriceRange(high=30.0, include_high=False).intersect(
+            PriceRange(10.0, 30.0)
+        )
+        assert price == PriceRange(10.0, 30.0, True, False)
+
+    def test_endpoint_filters(self):
+        """Test price filters on GET /feature"""
+        created = [
+            client.post(
+                "/feature", json={"title": "Priced", "price_estimate": price}
+            ).json()["id"]
+            for price in (123456.0, 123457.0, 123458.0)
+        ]
+
+        response = client.get("/feature", params={"price_between": "123456,123457"})
+        assert [f["id"] for f in response.json()] == created[:2]
+
+        response = client.get(
+            "/feature", params={"price_gt": 123456.0, "price_lt": 123458.0}
+        )
+        assert [f["id"] for f in response.json()] == created[1:2]
+
+    def test_endpoint_rejects_bad_range(self):
+        """Test malformed price_between returns RFC 7807 error"""
+        response = client.get("/feature", params={"price_between": "abc"})
+        assert response.status_code == 422
+        assert response.headers["content-type"] == "application/problem+json"
+
+        response = client.get("/feature", params={"price_between": "10,1"})
+        assert response.status_code == 422
+
+
+class TestKeysetPagination:
+    """Test keyset pagination and streamed output"""
+
+    def test_select_pages_skip_deleted(self, make_row):
+        """Test keyset pages continue after the cursor"""
+        store = FeatureStore()
+        for _ in range(6):
+            store.insert(make_row())
+        store.delete(2)
+        store.delete(5)
+
+        first = store.select(limit=2)
+        assert [row["id"] for row in first] == [1, 3]
+        second = store.select(after=first[-1]["id"], limit=2)
+        assert [row["id"] for row in second] == [4, 6]
+        assert store.select(after=6, limit=2) == []
+
+    def test_select_with_price_and_cursor(self, make_row):
+        """Test cursor applies on top of price filter"""
+        store = FeatureStore()
+        for price in (5.0, 50.0, 6.0, 7.0):
+            store.insert(make_row(price_estimate=price))
+        page = store.select(PriceRange(high=10.0), after=1, limit=1)
+        assert [row["id"] for row in page] == [3]
+
+    def test_iter_batches(self, make_row):
+        """Test batched iteration yields every row once"""
+        store = FeatureStore()
+        for _ in range(7):
+            store.insert(make_row())
+        batches = list(store.iter_batches(batch_size=3))
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+
+    def test_endpoint_cursor_header(self):
+        """Test next cursor header walks the whole table"""
+        seen = []
+        after = None
+        while True:
+            params = {"limit": 2}
+            if after is not None:
+                params["after"] = after
+            response = client.get("/feature", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page) <= 2
+            seen.extend(f["id"] for f in page)
+            after = response.headers.get("X-Next-Cursor")
+            if after is None:
+                break
+
+        assert seen == [f["id"] for f in client.get("/feature").json()]
+
+    def test_endpoint_stream_ndjson(self):
+        """Test NDJSON streaming is sanitized and matches the JSON list"""
+        client.post("/feature", json={"title": "<b>stream</b>"})
+        expected = client.get("/feature").json()
+
+        response = client.get("/feature", params={"stream": "ndjson"})
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines == expected
+        assert "&lt;b&gt;stream&lt;/b&gt;" in response.text
+
+    def test_endpoint_stream_json_array_with_limit(self):
+        """Test JSON array streaming honours limit"""
+        response = client.get("/feature", params={"stream": "json", "limit": 1})
+        assert response.json() == client.get("/feature", params={"limit": 1}).json()
+
+    def test_endpoint_rejects_bad_limit(self):
+        """Test limit bounds are validated"""
+        assert client.get("/feature", params={"limit": 0}).status_code == 422
+        assert client.get("/feature", params={"stream": "xml"}).status_code == 422
+
+
+class TestBulkEndpoints:
+    """Test batch create, update and delete"""
+
+    def test_bulk_roundtrip(self):
+        """Test bulk create, patch and delete with per-item results"""
+        created = client.post(
+            "/feature/bulk",
+            json=[{"title": "Bulk A"}, {"title": "Bulk B", "price_estimate": 5.0}],
+        )
+        assert created.status_code == 201
+        ids = [item["id"] for item in created.json()]
+        assert [item["status"] for item in created.json()] == [201, 201]
+        assert client.get(f"/feature/{ids[1]}").json()["title"] == "Bulk B"
+
+        updated = client.patch(
+            "/feature/bulk",
+            json=[{"id": ids[0], "votes": 3}, {"id": 999999, "votes": 1}],
+        )
+        assert updated.status_code == 200
+        assert [item["status"] for item in updated.json()] == [200, 404]
+        assert updated.json()[1]["error"] == "Feature not found"
+        assert client.get(f"/feature/{ids[0]}").json()["votes"] == 3
+
+        deleted = client.delete("/feature/bulk", params={"ids": ids + [999999]})
+        assert [item["status"] for item in deleted.json()] == [200, 200, 404]
+        assert client.get(f"/feature/{ids[0]}").status_code == 404
+
+    def test_bulk_validation_is_all_or_nothing(self):
+        """Test negative scenario: one invalid item rejects the whole batch"""
+        before = len(client.get("/feature").json())
+        response = client.post(
+            "/feature/bulk", json=[{"title": "Valid"}, {"title": ""}]
+        )
+        assert response.status_code == 422
+        assert response.headers["content-type"] == "application/problem+json"
+        assert len(client.get("/feature").json()) == before
+
+    def test_bulk_size_limits(self):
+        """Test negative scenario: empty and oversized batches"""
+        assert client.post("/feature/bulk", json=[]).status_code == 422
+        too_many = [{"title": "x"}] * 1001
+        assert client.post("/feature/bulk", json=too_many).status_code == 422
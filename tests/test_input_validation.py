@@ -88,3 +88,16 @@ class TestInputValidation:
             },
         )
         assert response.status_code in [201, 422]
+
+    def test_update_null_title_validation(self):
+        """Негативный тест: null в обязательном поле при обновлении"""
+        feature_id = client.post("/feature", json={"title": "Keep me"}).json()["id"]
+        for body in ({"title": None}, {"votes": None}):
+            response = client.put(f"/feature/{feature_id}", json=body)
+            assert response.status_code == 422
+            response = client.patch("/feature/bulk", json=[{"id": feature_id, **body}])
+            assert response.status_code == 422
+        assert client.get(f"/feature/{feature_id}").json()["title"] == "Keep me"
+
+        response = client.put(f"/feature/{feature_id}", json={"link": None})
+        assert response.status_code == 200
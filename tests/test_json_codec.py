@@ -0,0 +1,141 @@
+"""Tests for the pluggable JSON response encoder"""
+
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core import json_codec
+from app.core.currency_utils import CurrencyNormalizer
+from app.core.datetime_utils import DateTimeNormalizer
+from app.core.json_codec import OrjsonCodec, StdlibCodec, load_codec
+from app.core.responses import SanitizedJSONResponse
+from app.core.xss_protection import sanitize_response_data
+
+requires_orjson = pytest.mark.skipif(
+    json_codec.orjson is None, reason="orjson is not installed"
+)
+
+CODECS = [
+    pytest.param(StdlibCodec, id="stdlib"),
+    pytest.param(OrjsonCodec, id="orjson", marks=requires_orjson),
+]
+
+CLEAN = {
+    "id": 1,
+    "title": "Dark mode",
+    "tags": ["ui", "Ünïcødé"],
+    "price_estimate": 99.5,
+    "votes": 0,
+    "archived": False,
+    "link": None,
+}
+DIRTY = {
+    "title": "<script>alert('x')</script>",
+    "nested": {"link": 'https://a.b/?q="1"&r=2', "items": ["<i>", 1, None, True]},
+    "rows": [{"name": "Ünïcødé & co"}, [2.5, "plain"]],
+}
+
+
+def reference(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+@pytest.mark.parametrize("codec_cls", CODECS)
+class TestCodecs:
+    """Test every encoder produces the same bytes"""
+
+    @pytest.mark.parametrize("data", [CLEAN, DIRTY, [CLEAN, DIRTY], "<b>", 42, []])
+    def test_dumps(self, codec_cls, data):
+        """Test compact UTF-8 output like json.dumps"""
+        assert codec_cls().dumps(data) == reference(data)
+
+    @pytest.mark.parametrize("data", [CLEAN, DIRTY, [CLEAN, DIRTY], "<b>", 42, []])
+    def test_dumps_sanitized(self, codec_cls, data):
+        """Test sanitized output equals sanitizing first and encoding after"""
+        expected = reference(sanitize_response_data(data))
+        assert codec_cls().dumps_sanitized(data) == expected
+
+    def test_keys_not_escaped(self, codec_cls):
+        """Test object keys stay raw like sanitize_response_data leaves them"""
+        data = {"<k>": "<v>", "rows": [{"a&b": 1, "c": "'"}]}
+        expected = b'{"<k>":"&lt;v&gt;","rows":[{"a&b":1,"c":"&#x27;"}]}'
+        assert codec_cls().dumps_sanitized(data) == expected
+        assert expected == reference(sanitize_response_data(data))
+        assert codec_cls().dumps_sanitized({"<k>": 1}) == b'{"<k>":1}'
+
+    def test_unsafe_key_with_tuple(self, codec_cls):
+        """Test tuples are still escaped when a key forces the sanitizing path"""
+        data = {"<k>": ("<v>", ["&"]), "rows": ({"t": "'"},)}
+        expected = b'{"<k>":["&lt;v&gt;",["&amp;"]],"rows":[{"t":"&#x27;"}]}'
+        assert codec_cls().dumps_sanitized(data) == expected
+
+    def test_datetime(self, codec_cls):
+        """Test datetimes from DateTimeNormalizer encode as ISO 8601"""
+        value = DateTimeNormalizer.parse_iso("2025-10-13T15:30:00.123456")
+        data = {"at": value, "day": date(2025, 10, 13)}
+        assert json.loads(codec_cls().dumps(data)) == {
+            "at": "2025-10-13T15:30:00.123456+00:00",
+            "day": "2025-10-13",
+        }
+
+    def test_naive_and_aware_datetime(self, codec_cls):
+        """Test both kinds of datetime match isoformat()"""
+        naive = datetime(2025, 1, 2, 3, 4, 5)
+        aware = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        encoded = codec_cls().dumps_sanitized([naive, aware])
+        assert json.loads(encoded) == [naive.isoformat(), aware.isoformat()]
+
+    def test_decimal_keeps_exact_value(self, codec_cls):
+        """Test amounts from CurrencyNormalizer encode as exact strings"""
+        amount = CurrencyNormalizer.normalize_amount("19.999")
+        assert codec_cls().dumps({"amount": amount}) == b'{"amount":"20.00"}'
+
+    def test_unknown_type_rejected(self, codec_cls):
+        """Test objects without an encoding raise TypeError"""
+        with pytest.raises(TypeError):
+            codec_cls().dumps({"value": object()})
+
+    def test_wide_integers(self, codec_cls):
+        """Test integers wider than 64 bits still encode"""
+        data = {"id": 2**70, "title": "<b>"}
+        assert (
+            codec_cls().dumps_sanitized(data)
+            == b'{"id":1180591620717411303424,"title":"&lt;b&gt;"}'
+        )
+
+
+class TestLoadCodec:
+    """Test encoder selection"""
+
+    def test_stdlib(self):
+        """Test stdlib is used when asked for"""
+        assert load_codec("stdlib").name == "stdlib"
+
+    @requires_orjson
+    def test_auto_prefers_orjson(self):
+        """Test auto picks orjson when it is installed"""
+        assert load_codec("auto").name == "orjson"
+        assert load_codec("").name == "orjson"
+
+    def test_missing_orjson_falls_back(self, monkeypatch, caplog):
+        """Test a missing orjson falls back to stdlib with a warning"""
+        monkeypatch.setattr(json_codec, "orjson", None)
+        assert load_codec("auto").name == "stdlib"
+        assert load_codec("ORJSON").name == "stdlib"
+        assert "orjson is not installed" in caplog.text
+
+    def test_unknown_name(self):
+        """Test an unknown encoder name is a configuration error"""
+        with pytest.raises(ValueError):
+            load_codec("ujson")
+
+
+class TestResponse:
+    """Test SanitizedJSONResponse renders with the selected encoder"""
+
+    def test_renders_with_codec(self, monkeypatch):
+        """Test the response body comes from get_json_codec()"""
+        monkeypatch.setattr(json_codec, "_CODEC", StdlibCodec())
+        response = SanitizedJSONResponse({"at": date(2025, 1, 1), "t": "<i>"})
+        assert response.body == b'{"at":"2025-01-01","t":"&lt;i&gt;"}'
@@ -0,0 +1,162 @@
+"""Tests for compressed log segments and the correlation_id index"""
+
+import gzip
+import io
+import json
+import logging
+
+from app.core.correlation import reset_correlation_id, set_correlation_id
+from app.core.log_segments import (
+    INDEX_SUFFIX,
+    LookupStats,
+    SegmentedLogWriter,
+    find_by_correlation_id,
+    iter_segments,
+    read_index,
+    scan_by_correlation_id,
+)
+from app.core.structured_logging import AsyncBatchHandler
+
+
+def line(correlation_id, message):
+    entry = {"level": "INFO", "message": message, "correlation_id": correlation_id}
+    return json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+
+
+def write_requests(writer, requests, lines_each):
+    for i in range(lines_each):
+        writer.write(b"".join(line(f"req-{r}", f"step {i}") for r in range(requests)))
+
+
+class TestSegmentedLogWriter:
+    """Test blocks, rotation and the index"""
+
+    def test_segments_read_as_plain_gzip(self, tmp_path):
+        """Test a segment of many blocks decompresses as one file"""
+        writer = SegmentedLogWriter(str(tmp_path), block_bytes=200)
+        write_requests(writer, 3, 10)
+        writer.close()
+        (segment,) = iter_segments(str(tmp_path))
+        assert len(read_index(segment)) > 1
+        with gzip.open(segment, "rb") as handle:
+            assert len(handle.read().splitlines()) == 30
+
+    def test_index_lists_ids_per_block(self, tmp_path):
+        """Test index entries point at blocks holding the listed IDs"""
+        writer = SegmentedLogWriter(str(tmp_path), block_bytes=10**6)
+        writer.write(line("req-a", "one") + line("-", "startup"))
+        writer.flush(force=True)
+        writer.write(line("req-b", "two"))
+        writer.close()
+        (segment,) = iter_segments(str(tmp_path))
+        entries = read_index(segment)
+        assert [e["ids"] for e in entries] == [["req-a"], ["req-b"]]
+        with open(segment, "rb") as handle:
+            handle.seek(entries[1]["offset"])
+            block = gzip.decompress(handle.read(entries[1]["length"]))
+        assert block == line("req-b", "two")
+
+    def test_blocks_cut_by_age(self, tmp_path, clock):
+        """Test flush() only writes a block once the buffer is old enough"""
+        writer = SegmentedLogWriter(str(tmp_path), block_seconds=1, clock=clock)
+        writer.write(line("req-a", "one"))
+        writer.flush()
+        assert writer.segment_path is None
+        clock.now += 1
+        writer.flush()
+        assert len(read_index(writer.segment_path)) == 1
+        writer.close()
+
+    def test_rotation_by_size_and_age(self, tmp_path, clock):
+        """Test new segments start after segment_bytes or segment_seconds"""
+        writer = SegmentedLogWriter(
+            str(tmp_path), block_bytes=1, segment_bytes=100, clock=clock
+        )
+        write_requests(writer, 1, 6)
+        by_size = len(iter_segments(str(tmp_path)))
+        assert by_size > 1
+
+        writer._segment_bytes = 10**9
+        writer._segment_seconds = 60
+        clock.now += 61
+        writer.write(line("req-late", "after an hour"))
+        writer.close()
+        assert len(iter_segments(str(tmp_path))) == by_size + 1
+
+    def test_torn_index_line_ignored(self, tmp_path):
+        """Test a partially written last index line does not break lookups"""
+        writer = SegmentedLogWriter(str(tmp_path), block_bytes=1)
+        write_requests(writer, 2, 3)
+        writer.close()
+        (segment,) = iter_segments(str(tmp_path))
+        with open(segment + INDEX_SUFFIX, "ab") as handle:
+            handle.write(b'{"offset":12')
+        assert len(list(find_by_correlation_id(str(tmp_path), "req-1"))) == 3
+
+
+class TestLookup:
+    """Test correlation ID lookups"""
+
+    def test_reads_only_matching_blocks(self, tmp_path):
+        """Test a lookup decompresses only the blocks of that request"""
+        writer = SegmentedLogWriter(str(tmp_path), block_bytes=1, segment_bytes=500)
+        for r in range(20):
+            for i in range(3):
+                writer.write(line(f"req-{r}", f"step {i}"))
+        writer.close()
+
+        stats = LookupStats()
+        found = list(find_by_correlation_id(str(tmp_path), "req-7", stats))
+        assert [e["message"] for e in found] == ["step 0", "step 1", "step 2"]
+        assert stats.blocks_read == 3
+        assert stats.blocks == 60
+        assert stats.segments > 1
+        assert found == list(scan_by_correlation_id(str(tmp_path), "req-7"))
+
+    def test_id_prefix_does_not_match(self, tmp_path):
+        """Test a lookup for req-1 does not return req-10"""
+        writer = SegmentedLogWriter(str(tmp_path))
+        writer.write(line("req-10", "other") + line("req-1", "mine"))
+        writer.close()
+        found = list(find_by_correlation_id(str(tmp_path), "req-1"))
+        assert [e["message"] for e in found] == ["mine"]
+
+    def test_missing_directory(self, tmp_path):
+        """Test lookups in a directory without segments find nothing"""
+        assert list(find_by_correlation_id(str(tmp_path / "none"), "req-1")) == []
+
+
+class TestWithAsyncBatchHandler:
+    """Test segments as the sink of the logging pipeline"""
+
+    def test_handler_writes_indexed_segments(self, tmp_path):
+        """Test logged records can be found by their correlation ID"""
+        writer = SegmentedLogWriter(str(tmp_path / "segments"))
+        handler = AsyncBatchHandler(writer, close_sink=True)
+        logger = logging.getLogger("test.segments")
+        logger.propagate = False
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        for r in range(5):
+            token = set_correlation_id(f"corr-{r}")
+            try:
+                logger.info("handled request %d", r)
+            finally:
+                reset_correlation_id(token)
+        handler.close()
+        found = list(find_by_correlation_id(str(tmp_path / "segments"), "corr-3"))
+        assert [e["message"] for e in found] == ["handled request 3"]
+
+    def test_query_cli(self, tmp_path, capsys):
+        """Test the query script prints matching lines and read statistics"""
+        from scripts.query_logs import main
+
+        writer = SegmentedLogWriter(str(tmp_path), block_bytes=1)
+        write_requests(writer, 4, 2)
+        writer.close()
+        assert main(["req-2", "--dir", str(tmp_path)]) == 0
+        out, err = capsys.readouterr()
+        found = [json.loads(text) for text in io.StringIO(out)]
+        assert [e["correlation_id"] for e in found] == ["req-2", "req-2"]
+        assert "read 2 of 2 blocks" in err
+        assert main(["missing", "--dir", str(tmp_path), "--scan"]) == 1
@@ -0,0 +1,101 @@
+"""Tests for write-ahead log and snapshot persistence"""
+
+import os
+import threading
+
+from app.core.persistence import SNAPSHOT_FILE, WriteAheadLog
+
+
+def state(store):
+    return {row["id"]: row for row in store.all()}
+
+
+class TestWriteAheadLog:
+    """Test journaling, replay and compaction"""
+
+    def test_replay_restores_all_mutations(self, tmp_path, make_row):
+        """Test store state survives a restart"""
+        store = WriteAheadLog(str(tmp_path)).recover()
+        first, second, third = store.insert_many([make_row(), make_row(), make_row()])
+        store.update(first["id"], {"title": "Renamed", "price_estimate": 99.0})
+        store.delete(second["id"])
+        store.apply_votes({third["id"]: 4})
+        expected = state(store)
+        store.close()
+
+        restored = WriteAheadLog(str(tmp_path)).recover()
+        assert state(restored) == expected
+        assert restored.top(1)[0]["id"] == third["id"]
+        assert restored.insert(make_row())["id"] == 4
+        restored.close()
+
+    def test_seed_only_on_empty_directory(self, tmp_path, make_row):
+        """Test seed rows are loaded once and not resurrected after delete"""
+        seed = [{"id": 1, **make_row(title="Seed")}]
+        store = WriteAheadLog(str(tmp_path)).recover(seed)
+        assert store.get(1)["title"] == "Seed"
+        store.delete(1)
+        store.close()
+
+        restored = WriteAheadLog(str(tmp_path)).recover(seed)
+        assert len(restored) == 0
+        restored.close()
+
+    def test_snapshot_compacts_segments(self, tmp_path, make_row):
+        """Test snapshot replaces journal segments it covers"""
+        journal = WriteAheadLog(str(tmp_path))
+        store = journal.recover()
+        for _ in range(10):
+            store.insert(make_row())
+        journal.snapshot()
+        store.update(1, {"votes": 7})
+        store.close()
+
+        segments = sorted(p.name for p in tmp_path.glob("wal-*.log"))
+        assert len(segments) == 1
+        assert (tmp_path / SNAPSHOT_FILE).exists()
+
+        restored = WriteAheadLog(str(tmp_path)).recover()
+        assert len(restored) == 10
+        assert restored.get(1)["votes"] == 7
+        restored.close()
+
+    def test_torn_tail_is_ignored(self, tmp_path, make_row):
+        """Test negative scenario: partially written last record"""
+        store = WriteAheadLog(str(tmp_path)).recover()
+        store.insert(make_row(title="Kept"))
+        store.close()
+
+        segment = sorted(tmp_path.glob("wal-*.log"))[-1]
+        with segment.open("a", encoding="utf-8") as handle:
+            handle.write('{"op":"insert","rows":[{"id":')
+
+        restored = WriteAheadLog(str(tmp_path)).recover()
+        assert [row["title"] for row in restored.all()] == ["Kept"]
+        restored.close()
+
+    def test_group_commit_batches_fsync(self, tmp_path, monkeypatch, make_row):
+        """Test concurrent writers share fsync calls"""
+        store = WriteAheadLog(str(tmp_path)).recover()
+        calls = []
+        real_fsync = os.fsync
+
+        def counting_fsync(fd):
+            calls.append(fd)
+            real_fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", counting_fsync)
+
+        def writer():
+            for _ in range(50):
+                store.insert(make_row())
+
+        threads = [threading.Thread(target=writer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(store) == 400
+        assert len(calls) < 400
+        store.close()
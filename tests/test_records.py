@@ -0,0 +1,149 @@
+"""Tests for the compact feature record layout"""
+
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.records import FeatureRecord, feature_json, from_epoch_us, to_epoch_us
+from app.core.store import FeatureStore
+from app.main import app
+from app.schemas.feature import Feature
+
+
+@pytest.fixture
+def make_row(make_row):
+    """Rows with an id, a link and microsecond timestamps"""
+    now = datetime(2025, 10, 13, 15, 30, 0, 123456)
+    return partial(
+        make_row,
+        id=1,
+        link="https://example.com/",
+        price_estimate=10.5,
+        votes=3,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class TestFeatureRecord:
+    """Test record conversion to and from row dicts"""
+
+    def test_round_trip_preserves_row(self, make_row):
+        """Test to_dict gives back the row the record was built from"""
+        row = make_row()
+        assert FeatureRecord.from_dict(row).to_dict() == row
+
+    def test_to_dict_key_order(self, make_row):
+        """Test rows keep the column order the API serializes"""
+        keys = list(FeatureRecord.from_dict(make_row()).to_dict())
+        assert keys == [
+            "id",
+            "user_id",
+            "title",
+            "link",
+            "price_estimate",
+            "votes",
+            "created_at",
+            "updated_at",
+        ]
+
+    def test_epoch_conversion_is_exact(self):
+        """Test microsecond timestamps survive conversion"""
+        value = datetime(1969, 12, 31, 23, 59, 59, 1)
+        assert from_epoch_us(to_epoch_us(value)) == value
+        assert to_epoch_us(None) is None
+
+    def test_aware_datetime_normalized_to_utc(self):
+        """Test aware timestamps are stored as naive UTC"""
+        aware = datetime(2025, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=3)))
+        assert from_epoch_us(to_epoch_us(aware)) == datetime(2025, 1, 1, 9, 0)
+
+    def test_strings_are_interned(self, make_row):
+        """Test equal titles share one string object"""
+        first = FeatureRecord.from_dict(make_row(title="".join(["Dark", " mode"])))
+        second = FeatureRecord.from_dict(make_row(title="".join(["Dark ", "mode"])))
+        assert first.title is second.title
+
+    def test_replace_and_with_votes_return_new_records(self, make_row):
+        """Test records are never changed in place"""
+        record = FeatureRecord.from_dict(make_row())
+        renamed = record.replace({"title": "Renamed", "id": 99})
+        voted = record.with_votes(7)
+        assert record.title == "Feature" and record.votes == 3
+        assert renamed.title == "Renamed" and renamed.id == 1
+        assert voted.votes == 7 and voted.created_us == record.created_us
+
+    def test_unknown_keys_dropped_and_no_instance_dict(self, make_row):
+        """Test records carry only the schema fields"""
+        record = FeatureRecord.from_dict(make_row(extra="ignored"))
+        assert "extra" not in record.to_dict()
+        assert not hasattr(record, "__dict__")
+
+
+class TestStoreRecords:
+    """Test the store keeps records but hands out row dicts"""
+
+    def test_reads_return_independent_dicts(self, make_row):
+        """Test mutating a returned row does not change the store"""
+        store = FeatureStore([make_row()])
+        row = store.get(1)
+        row["title"] = "Changed"
+        assert store.get(1)["title"] == "Feature"
+        assert isinstance(store.all()[0], dict)
+
+    def test_update_keeps_timestamps(self, make_row):
+        """Test partial updates keep untouched fields"""
+        store = FeatureStore([make_row()])
+        updated = store.update(1, {"price_estimate": None})
+        assert updated == make_row(price_estimate=None)
+
+
+class TestFeatureJson:
+    """Test the unvalidated dump matches the Feature schema dump"""
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {},
+            {"price_estimate": 3, "link": None},
+            {"price_estimate": None, "votes": 0},
+            {"created_at": datetime(2025, 1, 1, tzinfo=timezone.utc)},
+            {
+                "updated_at": datetime(
+                    2025, 1, 1, 1, tzinfo=timezone(timedelta(hours=3))
+                )
+            },
+        ],
+    )
+    def test_matches_model_dump(self, overrides, make_row):
+        """Test values and key order equal Feature.model_dump(mode="json")"""
+        row = make_row(**overrides)
+        expected = Feature.model_validate(row).model_dump(mode="json")
+        assert list(feature_json(row).items()) == list(expected.items())
+
+    def test_endpoints_skip_response_model_but_keep_schema(self):
+        """Test responses match the schema dump and OpenAPI still names Feature"""
+        client = TestClient(app)
+        created = client.post(
+            "/feature", json={"title": "<b>Trusted</b>", "price_estimate": 5}
+        )
+        assert created.status_code == 201
+        body = created.json()
+        assert body["title"] == "&lt;b&gt;Trusted&lt;/b&gt;"
+        assert body["price_estimate"] == 5.0
+        assert set(body) == set(Feature.model_fields)
+
+        voted = client.post(f"/feature/{body['id']}/vote").json()
+        assert voted["votes"] == body["votes"] + 1
+        assert (
+            client.get("/feature/top", params={"n": 1}).headers["content-type"]
+            == "application/json"
+        )
+
+        paths = client.get("/openapi.json").json()["paths"]
+        schema = paths["/feature"]["post"]["responses"]["201"]["content"]
+        assert schema["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/Feature"
+        }
@@ -0,0 +1,197 @@
+"""Tests for pluggable feature repositories"""
+
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.core.config import create_feature_repository
+from app.core.exceptions import ApiError
+from app.core.store import FeatureStore
+from app.repositories.base import PriceRange
+from app.repositories.pool import ConnectionPool
+from app.repositories.sql import SQLiteFeatureRepository, _numbered_params
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    if request.param == "memory":
+        repo = FeatureStore()
+    else:
+        repo = SQLiteFeatureRepository(str(tmp_path / "features.db"))
+    yield repo
+    repo.close()
+
+
+class TestRepositoryContract:
+    """Same behaviour is expected from every backend"""
+
+    def test_insert_and_get(self, repository, make_row):
+        """Test inserted row is readable with its types intact"""
+        row = repository.insert(make_row(title="Stored"))
+        fetched = repository.get(row["id"])
+        assert fetched["title"] == "Stored"
+        assert fetched["created_at"] == datetime(2025, 10, 13, 15, 30, 0)
+        assert len(repository) == 1
+
+    def test_update_and_delete(self, repository, make_row):
+        """Test update returns new state and delete removes the row"""
+        row = repository.insert(make_row())
+        updated = repository.update(row["id"], {"votes": 4, "link": "https://x.io"})
+        assert (updated["votes"], updated["link"]) == (4, "https://x.io")
+
+        assert repository.delete(row["id"]) is True
+        assert repository.get(row["id"]) is None
+        assert repository.delete(row["id"]) is False
+        assert repository.update(row["id"], {"votes": 1}) is None
+
+    def test_ids_not_reused(self, repository, make_row):
+        """Test ids stay monotonic after deleting the newest row"""
+        first = repository.insert(make_row())
+        repository.delete(first["id"])
+        assert repository.insert(make_row())["id"] > first["id"]
+
+    def test_select_price_and_cursor(self, repository, make_row):
+        """Test range filter combined with keyset pagination"""
+        ids = [
+            repository.insert(make_row(price_estimate=price))["id"]
+            for price in (5.0, None, 15.0, 25.0, 15.0)
+        ]
+        price = PriceRange(low=5.0, high=25.0, include_low=False)
+        assert [r["id"] for r in repository.select(price)] == [ids[2], ids[3], ids[4]]
+        page = repository.select(price, after=ids[2], limit=1)
+        assert [r["id"] for r in page] == [ids[3]]
+
+    def test_votes_and_top(self, repository, make_row):
+        """Test vote deltas feed the leaderboard"""
+        ids = [repository.insert(make_row(votes=v))["id"] for v in (2, 7, 2)]
+        repository.apply_votes({ids[2]: 1, 999: 5})
+        assert [r["id"] for r in repository.top(2)] == [ids[1], ids[2]]
+        assert repository.get(ids[2])["votes"] == 3
+
+    def test_iter_batches(self, repository, make_row):
+        """Test batched iteration covers every row"""
+        for _ in range(5):
+            repository.insert(make_row())
+        batches = list(repository.iter_batches(batch_size=2))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+class TestSQLiteTransactions:
+    """Test batch operations run in a single transaction"""
+
+    def test_failed_batch_rolls_back(self, tmp_path, make_row):
+        """Test negative scenario: constraint failure discards the whole batch"""
+        repo = SQLiteFeatureRepository(str(tmp_path / "features.db"))
+        with pytest.raises(sqlite3.IntegrityError):
+            repo.insert_many([make_row(), make_row(title=None)])
+        assert len(repo) == 0
+        repo.close()
+
+    def test_batch_results(self, tmp_path, make_row):
+        """Test per-item results of bulk update and delete"""
+        repo = SQLiteFeatureRepository(str(tmp_path / "features.db"))
+        ids = [row["id"] for row in repo.insert_many([make_row(), make_row()])]
+        updated = repo.update_many([(ids[0], {"votes": 2}), (999, {"votes": 1})])
+        assert updated[0]["votes"] == 2 and updated[1] is None
+        assert repo.delete_many([ids[1], 999]) == [True, False]
+        repo.close()
+
+
+class TestConnectionPool:
+    """Test bounded connection pool"""
+
+    class FakeConnection:
+        def __init__(self):
+            self.commits = 0
+            self.rollbacks = 0
+            self.closed = False
+
+        def commit(self):
+            self.commits += 1
+
+        def rollback(self):
+            self.rollbacks += 1
+
+        def close(self):
+            self.closed = True
+
+    def test_reuses_connections(self):
+        """Test returned connections are handed out again"""
+        created = []
+
+        def connect():
+            created.append(self.FakeConnection())
+            return created[-1]
+
+        pool = ConnectionPool(connect)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        assert first is second
+        assert len(created) == 1
+        assert first.commits == 2
+
+    def test_rolls_back_on_error(self):
+        """Test failed unit of work is rolled back"""
+        conn = self.FakeConnection()
+        pool = ConnectionPool(lambda: conn)
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                raise RuntimeError("boom")
+        assert conn.rollbacks == 1
+        assert conn.commits == 0
+
+    def test_bounded_size(self):
+        """Test pool refuses to exceed max_size and times out"""
+        pool = ConnectionPool(self.FakeConnection, max_size=1, timeout=0.05)
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with pool.connection():
+                acquired.set()
+                release.wait(1)
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        acquired.wait(1)
+        try:
+            with pytest.raises(ApiError) as exc_info:
+                with pool.connection():
+                    pass
+            assert exc_info.value.status == 503
+        finally:
+            release.set()
+            worker.join()
+
+    def test_invalid_size(self):
+        """Test negative scenario: empty pool is rejected"""
+        with pytest.raises(ValueError):
+            ConnectionPool(self.FakeConnection, max_size=0)
+
+
+class TestRepositoryFactory:
+    """Test backend selection from DATABASE_URL"""
+
+    def test_default_is_memory(self):
+        """Test unset DATABASE_URL keeps the in-memory store"""
+        assert isinstance(create_feature_repository(None), FeatureStore)
+
+    def test_sqlite_url(self, tmp_path):
+        """Test sqlite URL builds the SQLite repository"""
+        repo = create_feature_repository(f"sqlite:///{tmp_path / 'f.db'}")
+        assert isinstance(repo, SQLiteFeatureRepository)
+        repo.close()
+
+    def test_unknown_scheme(self):
+        """Test negative scenario: unsupported scheme"""
+        with pytest.raises(ValueError):
+            create_feature_repository("mysql://user@host/db")
+
+    def test_postgres_placeholders(self):
+        """Test prepared statement placeholder rewriting"""
+        sql = "UPDATE features SET votes = %s WHERE id = %s"
+        assert _numbered_params(sql) == "UPDATE features SET votes = $1 WHERE id = $2"
@@ -0,0 +1,74 @@
+"""Tests for sanitizing JSON serialization"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.responses import SanitizedJSONResponse
+from app.core.xss_protection import (
+    SanitizingJSONEncoder,
+    dumps_sanitized,
+    sanitize_response_data,
+)
+from app.main import app
+
+client = TestClient(app)
+
+DATA = {
+    "title": "<script>alert('x')</script>",
+    "nested": {"link": 'https://a.b/?q="1"&r=2', "items": ["<i>", 1, None, True]},
+    "rows": [{"name": "Ünïcødé & co"}, [2.5, "plain"]],
+}
+
+
+def legacy_dumps(data):
+    return json.dumps(
+        sanitize_response_data(data), ensure_ascii=False, separators=(",", ":")
+    )
+
+
+class TestSanitizingEncoder:
+    """Test escaping during serialization"""
+
+    @pytest.mark.parametrize(
+        "data",
+        [DATA, [DATA, DATA], {"<k>": DATA}, {"<k>": 1}, "<b>", 42, None, []],
+    )
+    def test_matches_sanitize_then_dump(self, data):
+        """Test output equals sanitize_response_data followed by json.dumps"""
+        assert dumps_sanitized(data) == legacy_dumps(data)
+
+    def test_default_output_escaped_with_unsafe_key(self):
+        """Test strings from default are escaped on the sanitizing path too"""
+        encoder = SanitizingJSONEncoder(default=lambda value: "<obj>")
+        expected = '{"id":"&lt;obj&gt;","items":["&lt;obj&gt;"]}'
+        assert encoder.encode({"id": object(), "items": (object(),)}) == expected
+        assert encoder.encode({"<k>": object()}) == '{"<k>":"&lt;obj&gt;"}'
+
+    def test_non_finite_floats_rejected(self):
+        """Test NaN is refused like JSONResponse does"""
+        with pytest.raises(ValueError):
+            dumps_sanitized({"value": float("nan")})
+
+    def test_response_body(self):
+        """Test the response class renders the sanitized document"""
+        response = SanitizedJSONResponse(DATA)
+        assert response.body == legacy_dumps(DATA).encode("utf-8")
+        assert response.media_type == "application/json"
+
+
+class TestSanitizedResponses:
+    """Test the app serializes through the sanitizing response class"""
+
+    def test_endpoint_escaped_once(self):
+        """Test endpoint output is escaped exactly once"""
+        response = client.post("/feature", json={"title": "Tom & Jerry"})
+        assert response.json()["title"] == "Tom &amp; Jerry"
+
+    def test_problem_details_escaped(self):
+        """Test error bodies are sanitized as well"""
+        response = client.get("/feature", params={"price_between": "<b>"})
+        assert response.status_code == 422
+        assert "<b>" not in response.text
+        assert response.headers["content-type"] == "application/problem+json"
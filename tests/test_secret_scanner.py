@@ -0,0 +1,133 @@
+"""Tests for the parallel, cached repository secret scanner"""
+
+import json
+import subprocess
+
+import pytest
+
+from app.core import secret_scanner
+from app.core.secret_scanner import SecretScanner, changed_files, iter_files, to_sarif
+from app.core.secrets import SecretsManager
+
+
+def write_tree(root):
+    (root / "pkg").mkdir()
+    (root / "pkg" / "settings.py").write_text(
+        "DEBUG = True\nDB_PASSWORD = 'hunter2hunter2'\n  token: abcdefgh\n"
+    )
+    (root / "pkg" / "clean.py").write_text("print('hello')\n")
+    (root / "logo.png").write_bytes(b"\x89PNG\r\n\x00\x00password=binary")
+    (root / "__pycache__").mkdir()
+    (root / "__pycache__" / "x.pyc").write_text("password=cached")
+
+
+class TestSecretScanner:
+    """Test finding secrets in a tree"""
+
+    def test_findings_with_locations(self, tmp_path):
+        """Test findings carry rule, line, column and a masked snippet"""
+        write_tree(tmp_path)
+        result = SecretScanner(workers=1).scan(list(iter_files([str(tmp_path)])))
+        found = [(f.rule, f.line, f.column) for f in result.findings]
+        assert found == [("hardcoded-password", 2, 4), ("hardcoded-token", 3, 3)]
+        assert all("hunter2hunter2" not in f.snippet for f in result.findings)
+        assert result.skipped == 1  # the binary; __pycache__ is never listed
+
+    def test_counts_match_detect_secrets_in_code(self, tmp_path):
+        """Test the scanner agrees with SecretsManager on a file"""
+        write_tree(tmp_path)
+        path = str(tmp_path / "pkg" / "settings.py")
+        detected = SecretsManager().detect_secrets_in_code(path)
+        result = SecretScanner(workers=1).scan([path])
+        assert len(result.findings) == sum(d["matches"] for d in detected)
+
+    def test_mmap_matches_read(self, tmp_path):
+        """Test large files scanned through mmap give the same findings"""
+        write_tree(tmp_path)
+        paths = list(iter_files([str(tmp_path)]))
+        read = SecretScanner(workers=1).scan(paths)
+        mapped = SecretScanner(workers=1, mmap_threshold=1).scan(paths)
+        assert mapped.findings == read.findings
+
+    def test_process_pool(self, tmp_path):
+        """Test a parallel scan finds the same as a serial one"""
+        write_tree(tmp_path)
+        for i in range(20):
+            (tmp_path / f"mod{i}.py").write_text(f"x = {i}\nsecret = 'value{i}'\n")
+        paths = list(iter_files([str(tmp_path)]))
+        serial = SecretScanner(workers=1).scan(paths)
+        parallel = SecretScanner(workers=2).scan(paths)
+        assert parallel.findings == serial.findings
+        assert len(parallel.findings) == 22
+
+    def test_cache_skips_unchanged_content(self, tmp_path, monkeypatch):
+        """Test unchanged files are served from the cache, changed ones rescanned"""
+        write_tree(tmp_path)
+        cache = str(tmp_path / "cache.json")
+        paths = [
+            str(tmp_path / "pkg" / "settings.py"),
+            str(tmp_path / "pkg" / "clean.py"),
+        ]
+        first = SecretScanner(cache_path=cache, workers=1).scan(paths)
+        assert (first.scanned, first.cached) == (2, 0)
+
+        def fail(*args):
+            raise AssertionError("rescanned")
+
+        monkeypatch.setattr(secret_scanner._FileScanner, "_findings", fail)
+        second = SecretScanner(cache_path=cache, workers=1).scan(paths)
+        assert (second.scanned, second.cached) == (0, 2)
+        assert second.findings == first.findings
+
+        monkeypatch.undo()
+        (tmp_path / "pkg" / "clean.py").write_text("api_key = 'abcdefgh'\n")
+        third = SecretScanner(cache_path=cache, workers=1).scan(paths)
+        assert (third.scanned, third.cached) == (1, 1)
+        assert len(third.findings) == 3
+
+    def test_cache_invalidated_by_rule_change(self, tmp_path):
+        """Test a cache written for other patterns is ignored"""
+        write_tree(tmp_path)
+        cache = tmp_path / "cache.json"
+        path = str(tmp_path / "pkg" / "settings.py")
+        SecretScanner(cache_path=str(cache), workers=1).scan([path])
+        data = json.loads(cache.read_text())
+        data["rules"] = "other"
+        cache.write_text(json.dumps(data))
+        assert SecretScanner(cache_path=str(cache), workers=1).scan([path]).scanned == 1
+
+    def test_changed_files(self, tmp_path):
+        """Test --since limits the scan to files changed in a git diff"""
+        write_tree(tmp_path)
+
+        def git(*args):
+            subprocess.run(
+                ["git", *args], cwd=tmp_path, check=True, capture_output=True
+            )
+
+        try:
+            git("init", "-q")
+        except (OSError, subprocess.CalledProcessError):
+            pytest.skip("git is not available")
+        git("add", ".")
+        git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "base")
+        (tmp_path / "pkg" / "clean.py").write_text("jwt = 'abc.def.ghi'\n")
+        (tmp_path / "new.py").write_text("x = 1\n")
+        git("add", "new.py")
+
+        changed = sorted(changed_files("HEAD", cwd=str(tmp_path)))
+        assert changed == [str(tmp_path / "new.py"), str(tmp_path / "pkg" / "clean.py")]
+
+    def test_sarif(self, tmp_path):
+        """Test SARIF output lists rules and relative locations"""
+        write_tree(tmp_path)
+        scanner = SecretScanner(workers=1)
+        result = scanner.scan(list(iter_files([str(tmp_path)])))
+        sarif = to_sarif(result, scanner.rules, base=str(tmp_path))
+        run = sarif["runs"][0]
+        assert sarif["version"] == "2.1.0"
+        rules = run["tool"]["driver"]["rules"]
+        assert rules[0]["id"] == "hardcoded-password"
+        location = run["results"][0]["locations"][0]["physicalLocation"]
+        assert location["artifactLocation"]["uri"] == "pkg/settings.py"
+        assert location["region"] == {"startLine": 2, "startColumn": 4}
@@ -1,11 +1,12 @@
 """Tests for secrets management (ADR-002)"""
 
 import os
+import threading
 from unittest.mock import patch
 
 import pytest
 
-from app.core.secrets import SecretsManager
+from app.core.secrets import EnvProvider, FileProvider, SecretMatcher, SecretsManager
 
 
 class TestSecretsManagement:
@@ -104,3 +105,154 @@ class TestSecretsManagement:
 
         assert "password=supersecret" not in masked
         assert "***" in masked
+
+
+class TestSecretMatcher:
+    """Test the prefiltered, combined secret patterns"""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("password=supersecret; user=admin", "pa***t; user=admin"),
+            ("API-KEY: 'abcdef123456' ok", "AP***6' ok"),
+            ("jwt=ab", "***"),
+            ("Token = xyz and secret:'s3cr3t!!'", "To***yz and se***!'"),
+        ],
+    )
+    def test_masks_like_per_pattern_passes(self, text, expected):
+        """Test matches are masked whole, as the per-pattern loop did"""
+        assert SecretsManager().mask_data_for_logs(text) == expected
+
+    def test_prefilter(self):
+        """Test only patterns whose keyword occurs are candidates"""
+        matcher = SecretMatcher()
+        assert matcher.candidates("GET /feature 200") == ()
+        assert matcher.candidates("Bearer TOKEN=1") == (2,)
+        text = "no secrets here"
+        assert matcher.sub(lambda m: "***", "nothing to see") == "nothing to see"
+        assert SecretsManager()._mask_string(text) is text
+
+    def test_non_ascii_skips_prefilter(self):
+        """Test case folds lower() misses still reach the regex"""
+        assert SecretsManager().mask_data_for_logs("ſecret=abcdefgh") == "ſe***gh"
+
+    def test_clean_structures_not_copied(self):
+        """Test data without secrets comes back as the same object"""
+        data = {"rows": [{"title": "x"}, "y"], "n": 1}
+        assert SecretsManager().mask_data_for_logs(data) is data
+
+    def test_mask_records(self):
+        """Test batch masking equals masking each record"""
+        manager = SecretsManager()
+        records = [
+            "user=app password=s3cr3t",
+            "password=",
+            "plain\n'\nline",
+            {"detail": "token: abcdefgh"},
+            "jwt:",
+            "secret='xyz123456'",
+            42,
+        ]
+        expected = [manager.mask_data_for_logs(record) for record in records]
+        assert manager.mask_records(records) == expected
+        assert manager.mask_records(records[:2] + records[4:]) == (
+            expected[:2] + expected[4:]
+        )
+
+    def test_detect_secrets_in_code(self, tmp_path):
+        """Test matches are counted per pattern"""
+        source = tmp_path / "settings.py"
+        source.write_text("PASSWORD = 'hunter22'\ntoken='a'\ntoken='b'\n")
+        detected = SecretsManager().detect_secrets_in_code(str(source))
+        assert [d["matches"] for d in detected] == [1, 2]
+        assert detected[0]["pattern"].startswith("password")
+
+
+class TestSecretProviders:
+    """Test providers, TTL and background refresh"""
+
+    def test_file_provider(self, tmp_path):
+        """Test mounted secret files are read, lowercase names included"""
+        (tmp_path / "DB_PASSWORD").write_text("from-file-123\n")
+        (tmp_path / "jwt_secret_key").write_text("k" * 32)
+        provider = FileProvider(str(tmp_path))
+        assert provider.get("DB_PASSWORD") == "from-file-123"
+        assert provider.get("JWT_SECRET_KEY") == "k" * 32
+        assert provider.get("MISSING") is None
+        assert provider.get("../DB_PASSWORD") is None
+
+    def test_providers_tried_in_order(self, tmp_path):
+        """Test the first provider holding a key wins"""
+        (tmp_path / "DB_PASSWORD").write_text("from-file-123")
+        (tmp_path / "ENCRYPTION_KEY").write_text("e" * 32)
+        manager = SecretsManager(providers=[EnvProvider(), FileProvider(str(tmp_path))])
+        with patch.dict(os.environ, {"DB_PASSWORD": "from-env-123"}):
+            assert manager.get_db_password() == "from-env-123"
+            assert manager.get_encryption_key() == b"e" * 32
+
+    def test_cached_forever_by_default(self):
+        """Test without a TTL the first value is kept"""
+        manager = SecretsManager()
+        with patch.dict(os.environ, {"TEST_SECRET": "first_value"}):
+            assert manager.get_secret("TEST_SECRET") == "first_value"
+        with patch.dict(os.environ, {"TEST_SECRET": "second_value"}):
+            assert manager.get_secret("TEST_SECRET") == "first_value"
+
+    def test_refresh_picks_up_rotation(self, tmp_path):
+        """Test refresh() re-reads a rotated secret"""
+        secret = tmp_path / "API_TOKEN"
+        secret.write_text("old-token-1")
+        manager = SecretsManager(providers=[FileProvider(str(tmp_path))])
+        assert manager.get_secret("API_TOKEN") == "old-token-1"
+        secret.write_text("new-token-2")
+        assert manager.refresh("API_TOKEN") == "new-token-2"
+        assert manager.get_secret("API_TOKEN") == "new-token-2"
+
+    def test_stale_value_served_while_refreshing(self, tmp_path, clock):
+        """Test an expired secret is returned at once and refreshed in background"""
+        secret = tmp_path / "API_TOKEN"
+        secret.write_text("old-token-1")
+        refreshed = threading.Event()
+        provider = FileProvider(str(tmp_path))
+
+        class Tracking:
+            name = "tracking"
+
+            def get(self, key):
+                value = provider.get(key)
+                if value == "new-token-2":
+                    refreshed.set()
+                return value
+
+        manager = SecretsManager(
+            providers=[Tracking()], ttl=60, key_ttls={"OTHER": 1}, clock=clock
+        )
+        assert manager.get_secret("API_TOKEN") == "old-token-1"
+        secret.write_text("new-token-2")
+        clock.now += 59
+        assert manager.get_secret("API_TOKEN") == "old-token-1"
+        assert not refreshed.is_set()
+
+        clock.now += 2
+        assert manager.get_secret("API_TOKEN") == "old-token-1"
+        assert refreshed.wait(5)
+        manager._refresher.shutdown(wait=True)
+        assert manager.get_secret("API_TOKEN") == "new-token-2"
+
+    def test_vanished_secret_keeps_cached_value(self, tmp_path, clock):
+        """Test a secret removed from its provider keeps serving the last value"""
+        secret = tmp_path / "API_TOKEN"
+        secret.write_text("old-token-1")
+        manager = SecretsManager(providers=[FileProvider(str(tmp_path))], clock=clock)
+        manager.get_secret("API_TOKEN")
+        secret.unlink()
+        assert manager.refresh("API_TOKEN") == "old-token-1"
+
+    def test_invalidate(self):
+        """Test invalidate() drops cached values"""
+        manager = SecretsManager()
+        with patch.dict(os.environ, {"TEST_SECRET": "first_value"}):
+            manager.get_secret("TEST_SECRET")
+        manager.invalidate("TEST_SECRET")
+        with pytest.raises(ValueError):
+            manager.get_secret("TEST_SECRET")
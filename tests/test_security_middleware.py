@@ -0,0 +1,165 @@
+"""Tests for the pure-ASGI security middleware"""
+
+import uuid
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.exceptions import unhandled_exception_handler
+from app.core.security_headers import DEFAULT_CSP, build_security_headers
+from app.main import app
+from app.middleware.correlation import CorrelationMiddleware
+from app.middleware.security import SecurityMiddleware
+from app.middleware.security_headers import SecurityHeadersMiddleware
+from app.middleware.xss_sanitizer import XSSSanitizerMiddleware
+
+client = TestClient(app)
+
+PAYLOAD = {"title": "<b>bold</b>", "tags": ["a&b"], "count": 1}
+
+
+def make_app(*middleware, **options):
+    """Tiny app with JSON, text, streaming and pre-sanitized endpoints"""
+    test_app = FastAPI()
+
+    @test_app.get("/json")
+    def json_endpoint(request: Request):
+        correlation_id = getattr(request.state, "correlation_id", None)
+        return {**PAYLOAD, "correlation_id": correlation_id}
+
+    @test_app.get("/text")
+    def text_endpoint():
+        return PlainTextResponse("<b>raw</b>")
+
+    @test_app.get("/stream")
+    def stream_endpoint():
+        return StreamingResponse(
+            iter(['{"a":', '"<b>"}']), media_type="application/json"
+        )
+
+    @test_app.get("/marked")
+    def marked_endpoint(request: Request):
+        request.state.xss_sanitized = True
+        return {"title": "&lt;b&gt;"}
+
+    for cls in middleware:
+        test_app.add_middleware(cls, **options)
+    return TestClient(test_app)
+
+
+class TestSecurityMiddleware:
+    """Test the fused middleware used by the app"""
+
+    def test_security_headers_present(self):
+        """Test every response carries the security headers"""
+        response = client.get("/health")
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert "default-src 'self'" in response.headers["Content-Security-Policy"]
+        assert "Strict-Transport-Security" not in response.headers
+
+    def test_hsts_only_over_https(self):
+        """Test HSTS is added for https requests"""
+        https = TestClient(app, base_url="https://testserver")
+        assert "max-age" in https.get("/health").headers["Strict-Transport-Security"]
+
+    def test_correlation_id_shared_with_problem_details(self):
+        """Test error bodies and headers carry one correlation ID"""
+        response = client.get("/feature/99999")
+        correlation_ids = response.headers.get_list("X-Correlation-ID")
+        assert correlation_ids == [response.json()["correlation_id"]]
+        uuid.UUID(correlation_ids[0])
+
+    def test_json_body_sanitized_with_content_length(self):
+        """Test JSON bodies are escaped and Content-Length matches"""
+        response = client.post("/feature", json={"title": "<b>bold</b>"})
+        assert response.json()["title"] == "&lt;b&gt;bold&lt;/b&gt;"
+        assert int(response.headers["content-length"]) == len(response.content)
+
+    def test_can_disable_parts(self):
+        """Test each stage of the fused middleware can be switched off"""
+        test_client = make_app(
+            SecurityMiddleware, correlation=False, headers=False, sanitize=False
+        )
+        response = test_client.get("/json")
+        assert response.json() == {**PAYLOAD, "correlation_id": None}
+        assert "X-Frame-Options" not in response.headers
+        assert "X-Correlation-ID" not in response.headers
+
+
+@pytest.mark.parametrize(
+    "middleware",
+    [
+        (SecurityMiddleware,),
+        (CorrelationMiddleware, XSSSanitizerMiddleware, SecurityHeadersMiddleware),
+    ],
+    ids=["fused", "separate"],
+)
+class TestMiddlewareBehaviour:
+    """Test the fused and separate middleware behave the same"""
+
+    def test_json_sanitized(self, middleware):
+        """Test nested strings in JSON bodies are escaped"""
+        response = make_app(*middleware).get("/json")
+        data = response.json()
+        assert data["title"] == "&lt;b&gt;bold&lt;/b&gt;"
+        assert data["tags"] == ["a&amp;b"]
+        assert data["correlation_id"] == response.headers["X-Correlation-ID"]
+        assert response.headers["X-Frame-Options"] == "DENY"
+
+    def test_non_json_untouched(self, middleware):
+        """Test non-JSON bodies pass through"""
+        assert make_app(*middleware).get("/text").text == "<b>raw</b>"
+
+    def test_streamed_json_untouched(self, middleware):
+        """Test multi-message bodies are not buffered"""
+        assert make_app(*middleware).get("/stream").json() == {"a": "<b>"}
+
+    def test_marked_response_not_escaped_twice(self, middleware):
+        """Test responses flagged as sanitized are left alone"""
+        assert make_app(*middleware).get("/marked").json() == {"title": "&lt;b&gt;"}
+
+
+class TestSecurityHeaderBlock:
+    """Test the precomputed header block"""
+
+    def test_each_header_sent_once(self):
+        """Test the block is appended once per response"""
+        response = client.get("/feature/99999")
+        for name in ("X-Frame-Options", "Content-Security-Policy", "X-Correlation-ID"):
+            assert len(response.headers.get_list(name)) == 1
+
+    def test_custom_csp_and_hsts(self):
+        """Test configured policies end up in the raw blocks"""
+        blocks = build_security_headers(csp="default-src 'none'", hsts="max-age=60")
+        assert (b"content-security-policy", b"default-src 'none'") in blocks["http"]
+        assert (b"strict-transport-security", b"max-age=60") in blocks["https"]
+        assert all(name != b"strict-transport-security" for name, _ in blocks["http"])
+
+    def test_header_injection_rejected(self):
+        """Test policies with line breaks are refused at startup"""
+        with pytest.raises(ValueError):
+            build_security_headers(csp=DEFAULT_CSP + "\r\nSet-Cookie: x=1")
+
+    def test_unhandled_error_has_headers(self):
+        """Test 500 responses built outside the middleware still carry the block"""
+        test_app = FastAPI()
+        test_app.add_middleware(SecurityMiddleware)
+        test_app.add_exception_handler(Exception, unhandled_exception_handler)
+
+        @test_app.get("/boom")
+        def boom():
+            raise RuntimeError("secret details")
+
+        test_client = TestClient(
+            test_app, base_url="https://testserver", raise_server_exceptions=False
+        )
+        response = test_client.get("/boom")
+        assert response.status_code == 500
+        assert response.headers["content-type"] == "application/problem+json"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert "Strict-Transport-Security" in response.headers
+        assert response.headers["X-Correlation-ID"] == response.json()["correlation_id"]
+        assert "secret details" not in response.text
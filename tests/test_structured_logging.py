@@ -0,0 +1,217 @@
+"""Tests for the queued JSON-lines logging pipeline"""
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import structured_logging
+from app.core.config import get_feature_store, get_vote_buffer
+from app.core.correlation import reset_correlation_id, set_correlation_id
+from app.core.structured_logging import AsyncBatchHandler, JsonLineFormatter
+from app.main import app
+
+
+class BlockingSink(io.BytesIO):
+    """BytesIO whose writes wait until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.writing = threading.Event()
+
+    def write(self, data):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(data)
+
+
+@pytest.fixture
+def make_logger():
+    handlers = []
+
+    def make(sink, **kwargs):
+        handler = AsyncBatchHandler(sink, **kwargs)
+        handlers.append(handler)
+        logger = logging.getLogger(f"test.structured.{len(handlers)}")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.handlers = [handler]
+        return logger, handler
+
+    yield make
+    for handler in handlers:
+        handler.close()
+
+
+def lines(sink):
+    return [json.loads(line) for line in sink.getvalue().splitlines()]
+
+
+class TestJsonLineFormatter:
+    """Test the log line layout and masking"""
+
+    def test_layout_and_masking(self):
+        """Test fields follow logs/app.log and sensitive values are masked"""
+        record = logging.LogRecord(
+            "app",
+            logging.INFO,
+            __file__,
+            1,
+            "login %s password=%s",
+            ("bob", "x1"),
+            None,
+        )
+        record.correlation_id = "abc-1"
+        record.data = {"user": {"email": "bob@example.com"}, "id": 7}
+        entry = JsonLineFormatter().to_dict(record)
+        assert list(entry) == [
+            "timestamp",
+            "level",
+            "logger",
+            "message",
+            "correlation_id",
+            "module",
+            "function",
+            "data",
+        ]
+        assert entry["message"] == "login bob password=***"
+        assert entry["correlation_id"] == "abc-1"
+        assert entry["data"] == {"user": {"email": "b***@example.com"}, "id": 7}
+
+    def test_unencodable_data_falls_back_to_str(self):
+        """Test objects the codec rejects are written with str()"""
+        record = logging.LogRecord("app", logging.INFO, __file__, 1, "x", None, None)
+        record.data = {"value": object()}
+        assert json.loads(JsonLineFormatter().encode(record))["data"]["value"]
+
+
+class TestAsyncBatchHandler:
+    """Test queued writing, backpressure and metrics"""
+
+    def test_writes_json_lines(self, make_logger):
+        """Test records end up as one JSON line each with the correlation ID"""
+        sink = io.BytesIO()
+        logger, handler = make_logger(sink)
+        token = set_correlation_id("req-42")
+        try:
+            for i in range(100):
+                logger.info("event %d", i)
+        finally:
+            reset_correlation_id(token)
+        assert handler.flush()
+        written = lines(sink)
+        assert [e["message"] for e in written] == [f"event {i}" for i in range(100)]
+        assert {e["correlation_id"] for e in written} == {"req-42"}
+        metrics = handler.metrics()
+        assert metrics["written"] == metrics["enqueued"] == 100
+        assert metrics["batches"] <= 100
+
+    def test_args_frozen_at_emit(self, make_logger):
+        """Test later mutation of arguments does not change the line"""
+        sink = BlockingSink()
+        logger, handler = make_logger(sink)
+        values = ["before"]
+        logger.info("first")
+        sink.writing.wait(5)
+        logger.info("values %s", values)
+        values[0] = "after"
+        sink.release.set()
+        handler.flush()
+        assert lines(sink)[1]["message"] == "values ['before']"
+
+    def test_backpressure_samples_then_drops(self, make_logger):
+        """Test a stuck writer never blocks logging and losses are counted"""
+        sink = BlockingSink()
+        logger, handler = make_logger(
+            sink, queue_size=10, sample_above=0.5, sample_every=2, report_interval=0
+        )
+        logger.info("first")
+        sink.writing.wait(5)
+        for i in range(8):
+            logger.info("info %d", i)
+        logger.error("kept while sampling")
+        for i in range(50):
+            logger.info("flood %d", i)
+        metrics = handler.metrics()
+        assert metrics["sampled_out"] > 0
+        assert metrics["dropped"] > 0
+        assert metrics["queue_depth"] == 10
+
+        sink.release.set()
+        assert handler.flush()
+        written = lines(sink)
+        assert "kept while sampling" in [e["message"] for e in written]
+        report = [e for e in written if e["message"] == "Log queue overflow"][-1]
+        assert report["level"] == "WARNING"
+        assert report["data"]["dropped"] == metrics["dropped"]
+
+    def test_close_writes_pending(self):
+        """Test close() drains the queue before stopping"""
+        sink = io.BytesIO()
+        handler = AsyncBatchHandler(sink)
+        for i in range(10):
+            handler.handle(logging.makeLogRecord({"msg": f"m{i}"}))
+        handler.close()
+        assert len(lines(sink)) == 10
+
+
+class TestConfigureLogging:
+    """Test root logger setup"""
+
+    def test_configure_and_shutdown(self, tmp_path):
+        """Test root logging goes to the configured file until shutdown"""
+        root = logging.getLogger()
+        level = root.level
+        path = tmp_path / "logs" / "app.log"
+        try:
+            handler = structured_logging.configure_logging(str(path), "warning")
+            assert structured_logging.configure_logging() is handler
+            logging.getLogger("app.test").warning("token=abcdef")
+            assert handler.flush()
+            assert structured_logging.get_logging_metrics()["written"] == 1
+        finally:
+            structured_logging.shutdown_logging()
+            root.setLevel(level)
+        assert handler not in root.handlers
+        assert structured_logging.get_logging_metrics() is None
+        assert lines(io.BytesIO(path.read_bytes()))[0]["message"] == "token=***"
+
+    def test_default_is_stdout(self, monkeypatch):
+        """Test nothing is written to the tracked logs/app.log by default"""
+        monkeypatch.delenv("LOG_FILE", raising=False)
+        monkeypatch.delenv("LOG_SEGMENT_DIR", raising=False)
+        root = logging.getLogger()
+        level = root.level
+        try:
+            handler = structured_logging.configure_logging()
+            assert not handler._close_sink
+        finally:
+            structured_logging.shutdown_logging()
+            root.setLevel(level)
+
+    def test_app_lifespan(self, tmp_path, monkeypatch):
+        """Test the app runs the log writer and vote flusher while it serves"""
+        path = tmp_path / "app.log"
+        monkeypatch.setenv("LOG_FILE", str(path))
+        monkeypatch.delenv("LOG_SEGMENT_DIR", raising=False)
+        root = logging.getLogger()
+        level = root.level
+        feature_id = get_feature_store().insert({"title": "Lifespan", "votes": 0})["id"]
+        try:
+            with TestClient(app) as client:
+                assert get_vote_buffer()._thread is not None
+                assert client.post(f"/feature/{feature_id}/vote").status_code == 200
+                logging.getLogger("app.test").warning("served")
+                health = client.get("/health").json()
+                assert health["status"] == "ok"
+                assert health["logging"]["enqueued"] >= 1
+        finally:
+            root.setLevel(level)
+        assert get_vote_buffer()._thread is None
+        assert get_feature_store().get(feature_id)["votes"] == 1
+        assert structured_logging.get_logging_metrics() is None
+        assert "served" in [e["message"] for e in lines(io.BytesIO(path.read_bytes()))]
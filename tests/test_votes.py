@@ -0,0 +1,170 @@
+"""Tests for atomic vote endpoint and write coalescing"""
+
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.core.store import FeatureStore
+from app.core.votes import VoteBuffer
+from app.main import app
+
+client = TestClient(app)
+
+
+class CountingStore(FeatureStore):
+    """Store that records how many batches were applied"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = 0
+
+    def apply_votes(self, deltas):
+        self.batches += 1
+        super().apply_votes(deltas)
+
+
+class TestVoteBuffer:
+    """Test striped buffering of vote increments"""
+
+    def make_buffer(self, **kwargs):
+        store = CountingStore()
+        feature = store.insert({"title": "Hot", "votes": 5})
+        return store, feature["id"], VoteBuffer(store, **kwargs)
+
+    def test_vote_returns_pending_count(self):
+        """Test vote result includes buffered increments"""
+        store, feature_id, buffer = self.make_buffer(batch_size=100)
+        assert buffer.vote(feature_id)["votes"] == 6
+        assert buffer.vote(feature_id)["votes"] == 7
+        assert store.get(feature_id)["votes"] == 5
+
+        buffer.flush()
+        assert store.get(feature_id)["votes"] == 7
+        assert store.batches == 1
+
+    def test_batches_are_coalesced(self):
+        """Test increments are folded into the store per batch"""
+        store, feature_id, buffer = self.make_buffer(stripes=1, batch_size=10)
+        for _ in range(25):
+            buffer.vote(feature_id)
+        assert store.batches == 2
+        buffer.flush()
+        assert store.get(feature_id)["votes"] == 30
+        assert store.batches == 3
+
+    def test_flush_without_votes_is_noop(self):
+        """Test flush does not touch the store when nothing is pending"""
+        store, _, buffer = self.make_buffer()
+        buffer.flush()
+        assert store.batches == 0
+
+    def test_flush_is_one_batch(self):
+        """Test votes spread over every stripe are applied in one call"""
+        store, _, buffer = self.make_buffer(stripes=4, batch_size=100)
+        ids = [store.insert({"title": f"F{i}"})["id"] for i in range(8)]
+        for feature_id in ids:
+            buffer.vote(feature_id)
+        buffer.flush()
+        assert store.batches == 1
+        assert [store.get(feature_id)["votes"] for feature_id in ids] == [1] * 8
+
+    def test_has_pending(self):
+        """Test has_pending tracks buffered votes per feature"""
+        store, feature_id, buffer = self.make_buffer(batch_size=100)
+        assert not buffer.has_pending(feature_id)
+        buffer.vote(feature_id)
+        assert buffer.has_pending(feature_id)
+        assert not buffer.has_pending(feature_id + 1)
+        buffer.flush()
+        assert not buffer.has_pending(feature_id)
+
+    def test_missing_feature(self):
+        """Test negative scenario: vote for unknown feature"""
+        store, _, buffer = self.make_buffer()
+        assert buffer.vote(999) is None
+        buffer.flush()
+        assert store.batches == 0
+
+    def test_concurrent_votes_are_not_lost(self):
+        """Test parallel voters never lose increments"""
+        store, feature_id, buffer = self.make_buffer(batch_size=64)
+
+        def voter():
+            for _ in range(500):
+                buffer.vote(feature_id)
+
+        threads = [threading.Thread(target=voter) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        buffer.flush()
+        assert store.get(feature_id)["votes"] == 5 + 8 * 500
+
+    def test_background_flush(self):
+        """Test stop flushes the remaining votes"""
+        store, feature_id, buffer = self.make_buffer()
+        buffer.start(interval=0.01)
+        buffer.vote(feature_id)
+        buffer.stop()
+        assert store.get(feature_id)["votes"] == 6
+
+
+class TestVoteEndpoint:
+    """Test POST /feature/{id}/vote"""
+
+    def test_vote_increments(self):
+        """Test each vote adds one and is visible to readers"""
+        feature_id = client.post("/feature", json={"title": "Vote me"}).json()["id"]
+
+        first = client.post(f"/feature/{feature_id}/vote")
+        second = client.post(f"/feature/{feature_id}/vote")
+        assert first.status_code == 200
+        assert (first.json()["votes"], second.json()["votes"]) == (1, 2)
+        assert client.get(f"/feature/{feature_id}").json()["votes"] == 2
+
+    def test_vote_unknown_feature(self):
+        """Test negative scenario: vote for missing feature returns 404"""
+        response = client.post("/feature/999999/vote")
+        assert response.status_code == 404
+        assert response.headers["content-type"] == "application/problem+json"
+
+
+class TestLeaderboard:
+    """Test incrementally maintained top-N ranking"""
+
+    def ids(self, rows):
+        return [row["id"] for row in rows]
+
+    def test_ranking_follows_mutations(self):
+        """Test ranking reflects create, update, vote and delete"""
+        store = FeatureStore()
+        for votes in (3, 9, 3, 1):
+            store.insert({"title": "Ranked", "votes": votes})
+        assert self.ids(store.top(3)) == [2, 1, 3]
+
+        store.update(4, {"votes": 20})
+        store.apply_votes({3: 10})
+        assert self.ids(store.top(2)) == [4, 3]
+
+        store.delete(4)
+        assert self.ids(store.top(10)) == [3, 2, 1]
+
+    def test_top_endpoint(self):
+        """Test GET /feature/top sees buffered votes"""
+        feature_id = client.post(
+            "/feature", json={"title": "Leader", "votes": 10_000}
+        ).json()["id"]
+        client.post(f"/feature/{feature_id}/vote")
+
+        response = client.get("/feature/top", params={"n": 1})
+        assert response.status_code == 200
+        assert [(f["id"], f["votes"]) for f in response.json()] == [
+            (feature_id, 10_001)
+        ]
+
+    def test_top_endpoint_bounds(self):
+        """Test negative scenario: n outside allowed range"""
+        assert client.get("/feature/top", params={"n": 0}).status_code == 422
+        assert client.get("/feature/top", params={"n": 1000}).status_code == 422
@@ -0,0 +1,103 @@
+"""Tests for the copy-on-write XSS sanitizer"""
+
+import html
+
+import pytest
+
+from app.core.xss_protection import (
+    escape_html,
+    sanitize_dict,
+    sanitize_list,
+    sanitize_records,
+    sanitize_response_data,
+)
+from app.middleware.xss_sanitizer import sanitize_body
+
+
+def reference(value):
+    """Always-copying sanitizer the fast path must agree with"""
+    if isinstance(value, str):
+        return html.escape(value, quote=True)
+    if isinstance(value, dict):
+        return {k: reference(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [reference(v) for v in value]
+    return value
+
+
+CASES = [
+    "plain",
+    "",
+    "<b>\"q\" & 'a'</b>",
+    {"title": "clean", "votes": 1, "link": None},
+    {"title": "<i>", "nested": {"deep": ["ok", "&"]}, "tuple": ("<",)},
+    [{"id": 1, "title": "a"}, {"id": 2, "title": "b>c"}, ["x", ["y'"]]],
+]
+
+
+class TestCopyOnWrite:
+    """Test clean input is returned untouched and dirty input is copied"""
+
+    @pytest.mark.parametrize("value", CASES)
+    def test_matches_html_escape(self, value):
+        """Test output equals escaping every string"""
+        assert sanitize_response_data(value) == reference(value)
+
+    def test_clean_string_is_same_object(self):
+        """Test clean strings skip html.escape entirely"""
+        text = "".join(["nothing", " special"])
+        assert escape_html(text) is text
+
+    def test_clean_containers_are_same_object(self):
+        """Test clean dicts and lists are returned as is"""
+        data = {"a": "x", "b": [1, "y", {"c": None}]}
+        assert sanitize_dict(data) is data
+        assert sanitize_list(data["b"]) is data["b"]
+
+    def test_dirty_input_not_mutated(self):
+        """Test only changed paths are copied and the input stays intact"""
+        clean = {"c": "ok"}
+        data = {"a": "<", "clean": clean, "items": ["&"]}
+        result = sanitize_dict(data)
+        assert data == {"a": "<", "clean": clean, "items": ["&"]}
+        assert result["a"] == "&lt;" and result["items"] == ["&amp;"]
+        assert result["clean"] is clean
+
+
+class TestSanitizeRecords:
+    """Test batch sanitization of row dicts"""
+
+    def test_only_dirty_rows_copied(self):
+        """Test clean rows are shared and dirty rows replaced"""
+        rows = [{"id": 1, "title": "a"}, {"id": 2, "title": "<b>"}, {"id": 3}]
+        result = sanitize_records(rows)
+        assert result == reference(rows)
+        assert result[0] is rows[0] and result[2] is rows[2]
+        assert rows[1]["title"] == "<b>"
+
+    def test_clean_batch_is_same_list(self):
+        """Test a clean batch comes back as the same list"""
+        rows = [{"id": 1, "title": "a", "tags": ["x"]}]
+        assert sanitize_records(rows) is rows
+
+    def test_nested_values(self):
+        """Test non-string values still go through the recursive sanitizer"""
+        rows = [{"meta": {"note": "<x>"}, "tags": ["&"]}]
+        assert sanitize_records(rows) == reference(rows)
+
+
+class TestSanitizeBody:
+    """Test the raw JSON pre-check in the middleware"""
+
+    @pytest.mark.parametrize(
+        "body, expected",
+        [
+            (b'{"a":"x"}', b'{"a":"x"}'),
+            (b'{"a":"<"}', b'{"a":"&lt;"}'),
+            (b'{"a":"\\u003c"}', b'{"a":"&lt;"}'),
+            (b'{"a":"\\""}', b'{"a":"&quot;"}'),
+        ],
+    )
+    def test_escapes_only_when_needed(self, body, expected):
+        """Test clean bodies pass unparsed and escapes are still caught"""
+        assert sanitize_body(body) == expected